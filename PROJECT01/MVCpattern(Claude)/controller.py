@@ -1,84 +1,190 @@
+from contextlib import contextmanager
+
+from executor import InlineExecutor
+from tradingcore.alerts import parse_alert
+
+
 class TradingCalculatorController:
     def __init__(self, model):
         self.model = model
         self.view = None  # 명시적으로 view 속성 초기화
+        
+        # transaction() 안에서 모아둔 입력 변경
+        self._transaction_depth = 0
+        self._pending = {}
+        self._portfolio_dirty = False  # 트랜잭션 중 장부 가격이 바뀜
+        
+        # 현재 입력으로 등록하는 알림의 종목 (실시간 피드에서 따라가는 종목)
+        self.alert_symbol = "BTCUSDT"
+        
+        # 무거운 작업 실행기 (뷰가 TkExecutor 로 바꾸기 전에는 바로 실행)
+        self.executor = InlineExecutor()
     
     def calculate_profit(self):
         success = self.model.calculate_profit()
-        if hasattr(self, 'view') and self.view is not None:  # view 속성 존재 확인
-            self.view.update_results(
-                self.model.leveraged_percent,
-                self.model.actual_profit_usd,
-                self.model.actual_profit_krw,
-                self.model.calculation_error
-            )
+        self._notify_view()
         return success
     
     def set_view(self, view):
         self.view = view
     
-    def update_entry_price(self, value):
-        success = self.model.update_entry_price(value)
-        if hasattr(self, 'view') and self.view is not None:
+    def set_executor(self, executor):
+        self.executor.shutdown()
+        self.executor = executor
+    
+    def submit_job(self, key, func, *args, on_done=None, on_error=None, on_progress=None, context=False, **kwargs):
+        # 무거운 계산을 실행기로 보낸다. 같은 key 의 이전 작업은 취소되고,
+        # 콜백은 Tk 스레드에서 호출된다 (context=True 면 func 의 첫 인자로 JobContext 전달)
+        return self.executor.submit(func, *args, key=key, on_done=on_done, on_error=on_error,
+                                    on_progress=on_progress, context=context, **kwargs)
+    
+    def cancel_jobs(self, key=None):
+        self.executor.cancel(key)
+    
+    def _notify_view(self):
+        if hasattr(self, 'view') and self.view is not None:  # view 속성 존재 확인
             self.view.update_results(
                 self.model.leveraged_percent,
                 self.model.actual_profit_usd,
                 self.model.actual_profit_krw,
                 self.model.calculation_error
             )
+            if hasattr(self.view, 'update_margin'):
+                self.view.update_margin(self.model.liquidation_price, self.model.margin_ratio)
+            if self.model.order_book is not None and hasattr(self.view, 'update_slippage'):
+                self.view.update_slippage(self.model.slippage_result)
+            if len(self.model.portfolio) or self._portfolio_dirty:
+                # 환율이 바뀌면 장부의 KRW 합계도 바뀐다
+                self._notify_portfolio()
+    
+    def set_order_book(self, book):
+        # 슬리피지 계산에 쓸 호가창 스냅샷 (None 이면 끔)
+        self.model.order_book = book
+        self._notify_view()
+    
+    def add_position(self, symbol=""):
+        # 현재 입력을 포지션 장부에 추가. 잘못된 입력이면 None
+        try:
+            position_id = self.model.add_to_portfolio(symbol)
+        except ValueError:
+            return None
+        self._notify_portfolio()
+        return position_id
+    
+    def remove_position(self, position_id):
+        self.model.remove_from_portfolio(position_id)
+        self._notify_portfolio()
+    
+    def add_alert(self, text):
+        # "10%" / "-5%" / "$50" / "청산 2%" / "@61000" 을 현재 입력에 대한 알림으로 등록. 잘못된 입력이면 None
+        try:
+            kind, threshold = parse_alert(text)
+            alert_id = self.model.add_alert(self.alert_symbol, kind, threshold)
+        except (ValueError, ZeroDivisionError):
+            return None
+        self._notify_alerts([])
+        return alert_id
+    
+    def _notify_alerts(self, fired):
+        if self.view is not None and hasattr(self.view, 'update_alerts'):
+            self.view.update_alerts(fired, len(self.model.alerts))
+    
+    def update_market_prices(self, prices):
+        # prices: {종목: 가격}. 해당 종목 포지션만 다시 계산하고 바뀐 포지션 수를 반환
+        # 알림은 넘어선 조건 가격만 힙에서 꺼내므로 대기 중인 알림 수와 무관하게 가볍다
+        if len(self.model.alerts):
+            fired = self.model.alerts.on_ticks(prices)
+            if fired:
+                self._notify_alerts(fired)
+        portfolio = self.model.portfolio
+        updated = 0
+        for symbol, price in prices.items():
+            updated += portfolio.set_symbol_price(symbol, price)
+        if updated:
+            if self._transaction_depth > 0:
+                self._portfolio_dirty = True
+            else:
+                self._notify_portfolio()
+        return updated
+    
+    def _notify_portfolio(self):
+        self._portfolio_dirty = False
+        if self.view is not None and hasattr(self.view, 'update_portfolio'):
+            self.view.update_portfolio(self.model.portfolio_totals())
+    
+    def solve_target(self, text):
+        # "10%" / "10" -> 수익률, "$50" / "50$" -> 달러 수익. 목표 가격 또는 None
+        text = text.strip().replace(",", "")
+        try:
+            if text.startswith("$") or text.endswith("$"):
+                return self.model.target_for_profit_usd(float(text.strip("$")))
+            return self.model.target_for_percent(float(text.rstrip("%")))
+        except (ValueError, ZeroDivisionError):
+            return None
+    
+    def apply_target(self, target_price):
+        # 역계산한 목표 가격을 입력값으로 적용
+        return self._update("target_price", target_price)
+    
+    def solve_max_leverage(self, text):
+        # 버틸 가격 변동폭(%) -> 최대 레버리지 (잘못된 입력이면 None, 1배로도 못 버티면 0)
+        try:
+            return self.model.max_leverage_for_move(float(text.strip().rstrip("%")))
+        except ValueError:
+            return None
+    
+    def _update(self, name, value):
+        # 트랜잭션 중에는 값만 모아두고 종료 시 한 번에 계산/표시
+        if self._transaction_depth > 0:
+            self._pending[name] = value
+            return True
+        success = getattr(self.model, "update_" + name)(value)
+        self._notify_view()
         return success
     
-    def update_target_price(self, value):
-        success = self.model.update_target_price(value)
-        if hasattr(self, 'view') and self.view is not None:
-            self.view.update_results(
-                self.model.leveraged_percent,
-                self.model.actual_profit_usd,
-                self.model.actual_profit_krw,
-                self.model.calculation_error
-            )
+    def update_many(self, **fields):
+        # 여러 입력을 적용한 뒤 계산과 화면 갱신은 한 번만 수행
+        if self._transaction_depth > 0:
+            self._pending.update(fields)
+            return True
+        success = self.model.update_many(**fields)
+        self._notify_view()
         return success
     
+    @contextmanager
+    def transaction(self):
+        # with controller.transaction(): 블록 안의 update_* 호출을 모아 한 번에 반영
+        # 블록에서 예외가 발생하면 모아둔 변경은 버린다
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._pending = {}
+                self._portfolio_dirty = False
+            raise
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0 and self._pending:
+            pending, self._pending = self._pending, {}
+            self.update_many(**pending)
+        elif self._transaction_depth == 0 and self._portfolio_dirty:
+            self._notify_portfolio()
+    
+    def update_entry_price(self, value):
+        return self._update("entry_price", value)
+    
+    def update_target_price(self, value):
+        return self._update("target_price", value)
+    
     def update_leverage(self, value):
-        success = self.model.update_leverage(value)
-        if hasattr(self, 'view') and self.view is not None:
-            self.view.update_results(
-                self.model.leveraged_percent,
-                self.model.actual_profit_usd,
-                self.model.actual_profit_krw,
-                self.model.calculation_error
-            )
-        return success
+        return self._update("leverage", value)
     
     def update_position(self, value):
-        success = self.model.update_position(value)
-        if hasattr(self, 'view') and self.view is not None:
-            self.view.update_results(
-                self.model.leveraged_percent,
-                self.model.actual_profit_usd,
-                self.model.actual_profit_krw,
-                self.model.calculation_error
-            )
-        return success
+        return self._update("position", value)
     
     def update_capital(self, value):
-        success = self.model.update_capital(value)
-        if hasattr(self, 'view') and self.view is not None:
-            self.view.update_results(
-                self.model.leveraged_percent,
-                self.model.actual_profit_usd,
-                self.model.actual_profit_krw,
-                self.model.calculation_error
-            )
-        return success
+        return self._update("capital", value)
     
     def update_exchange_rate(self, value):
-        success = self.model.update_exchange_rate(value)
-        if hasattr(self, 'view') and self.view is not None:
-            self.view.update_results(
-                self.model.leveraged_percent,
-                self.model.actual_profit_usd,
-                self.model.actual_profit_krw,
-                self.model.calculation_error
-            )
-        return success
\ No newline at end of file
+        return self._update("exchange_rate", value)
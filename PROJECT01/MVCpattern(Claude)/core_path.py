@@ -0,0 +1,8 @@
+# core_path.py
+# 상위 폴더(PROJECT01)의 tradingcore 패키지를 불러올 수 있도록 sys.path 에 추가
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
@@ -0,0 +1,214 @@
+# executor.py
+# 무거운 작업을 작업 스레드(또는 프로세스)에서 돌리고 결과를 Tk 루프로 돌려주는 실행기
+# - 같은 key 로 새 작업을 내면 이전 작업은 취소된다 (슬라이더를 계속 끄는 동안 쌓이지 않음)
+#   아직 시작하지 않은 작업은 실행하지 않고, 이미 도는 작업은 결과를 버린다
+# - 작업 함수는 context=True 로 내면 첫 인자로 JobContext 를 받아 진행률 보고/취소 확인을 할 수 있다
+# - 완료/오류/진행률 콜백은 항상 Tk 스레드에서 root.after 로 호출된다
+#   (작업 스레드는 큐에 넣기만 하고, Tk 쪽이 poll_ms 마다 큐를 비운다)
+import queue
+import threading
+import traceback
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    # 작업 함수 안에서 사용 (스레드 모드 전용)
+    def __init__(self, job, events):
+        self._job = job
+        self._events = events
+
+    @property
+    def cancelled(self):
+        return self._job.cancelled
+
+    def check(self):
+        # 취소되었으면 JobCancelled 를 던져 작업을 끝낸다
+        if self._job.cancelled:
+            raise JobCancelled()
+
+    def progress(self, fraction, message=None):
+        # 진행률은 Tk 쪽에서 작업별 마지막 값만 전달된다
+        self._events.put(("progress", self._job, (fraction, message)))
+
+
+class Job:
+    def __init__(self, key, on_done, on_error, on_progress):
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future = None
+        self.done = False
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TkExecutor:
+    def __init__(self, root, max_workers=2, use_processes=False, poll_ms=16):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.use_processes = use_processes
+        if use_processes:
+            # 프로세스 모드: 작업 함수/인자는 pickle 가능해야 하고 JobContext 는 쓸 수 없다
+            self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tk-job")
+        self._events = queue.SimpleQueue()
+        self._active = {}  # key -> 가장 최근 Job
+        self._running = set()
+        self._job = None
+
+        # 통계
+        self.submitted = 0
+        self.superseded = 0  # 새 작업 때문에 취소된 작업 수
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, func, *args, key=None, on_done=None, on_error=None, on_progress=None,
+               context=False, **kwargs):
+        if key is not None and key in self._active:
+            self._active[key].cancel()
+            self.superseded += 1
+        job = Job(key, on_done, on_error, on_progress)
+        if context:
+            if self.use_processes:
+                raise ValueError("프로세스 모드에서는 JobContext 를 사용할 수 없습니다")
+            args = (JobContext(job, self._events),) + args
+        self.submitted += 1
+        job.future = self._pool.submit(func, *args, **kwargs)
+        job.future.add_done_callback(lambda future, job=job: self._events.put(("done", job, future)))
+        if key is not None:
+            self._active[key] = job
+        self._running.add(job)
+        if self._job is None:
+            self._job = self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def cancel(self, key=None):
+        # key 가 없으면 모든 작업 취소
+        jobs = list(self._running) if key is None else [job for job in self._running if job.key == key]
+        for job in jobs:
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        # 작업 스레드가 보낸 완료/진행률을 Tk 스레드에서 처리
+        self._job = None
+        progress = {}
+        finished = []
+        while True:
+            try:
+                kind, job, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                progress[job] = payload
+            else:
+                finished.append((job, payload))
+
+        for job, (fraction, message) in progress.items():
+            if not job.cancelled and not job.done and job.on_progress is not None:
+                job.on_progress(fraction, message)
+        for job, future in finished:
+            self._finish(job, future)
+
+        if self._running:
+            self._job = self.root.after(self.poll_ms, self._poll)
+
+    def _finish(self, job, future):
+        job.done = True
+        self._running.discard(job)
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+        if job.cancelled:
+            return  # 취소된 작업의 결과/오류는 버린다
+        try:
+            result = future.result()
+        except (CancelledError, JobCancelled):
+            return
+        except Exception as e:
+            self.failed += 1
+            if job.on_error is not None:
+                job.on_error(e)
+            else:
+                traceback.print_exception(type(e), e, e.__traceback__)
+            return
+        self.completed += 1
+        if job.on_done is not None:
+            job.on_done(result)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "superseded": self.superseded,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": len(self._running),
+        }
+
+
+class _InlineEvents:
+    # InlineExecutor 용: 진행률을 큐에 넣지 않고 바로 콜백
+    def put(self, event):
+        kind, job, (fraction, message) = event
+        if job.on_progress is not None and not job.cancelled:
+            job.on_progress(fraction, message)
+
+
+class InlineExecutor:
+    # TkExecutor 와 같은 인터페이스로 호출 즉시 현재 스레드에서 실행 (화면 없는 실행/테스트용)
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, func, *args, key=None, on_done=None, on_error=None, on_progress=None,
+               context=False, **kwargs):
+        job = Job(key, on_done, on_error, on_progress)
+        if context:
+            args = (JobContext(job, _InlineEvents()),) + args
+        self.submitted += 1
+        try:
+            result = func(*args, **kwargs)
+        except JobCancelled:
+            return job
+        except Exception as e:
+            self.failed += 1
+            job.done = True
+            if on_error is None:
+                raise
+            on_error(e)
+            return job
+        job.done = True
+        self.completed += 1
+        if on_done is not None:
+            on_done(result)
+        return job
+
+    def cancel(self, key=None):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def stats(self):
+        return {"submitted": self.submitted, "superseded": 0, "completed": self.completed,
+                "failed": self.failed, "running": 0}
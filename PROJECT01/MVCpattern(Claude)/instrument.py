@@ -0,0 +1,105 @@
+# instrument.py
+# 입력 한 번이 화면에 반영되기까지 단계별 지연 측정 (main.py --latency 일 때만 설치)
+#   input    : 첫 입력 이벤트(<KeyRelease>, 슬라이더 등 scheduler.schedule) -> 병합된 콜백 실행 시작
+#              (scheduler 의 latency_ms 만큼 기다리는 시간이 포함된다)
+#   dispatch : 병합된 콜백 실행 전체 (컨트롤러 -> 모델 -> 뷰)
+#   model    : 모델 update_* / update_many / calculate_profit (결과값 계산)
+#   view     : controller._notify_view (결과/청산/슬리피지/장부 표시. 게으른 파생값 계산도 여기서 일어남)
+#   paint    : 콜백이 끝난 뒤 Tk 가 다시 그리기를 마칠 때까지 (그 사이 예약된 idle 작업 뒤에 측정)
+#   work     : dispatch + paint. UI 를 실제로 붙잡고 있는 시간으로 프레임 예산(16 ms)과 비교할 값
+#   frame    : 첫 입력 이벤트 -> paint 끝 (사용자가 느끼는 지연)
+# 설치하지 않으면 원래 메서드를 그대로 쓰므로 비용이 전혀 없다. uninstall() 하면 원래 메서드로 돌아가지만
+# CPython 은 인스턴스 속성을 한 번 추가한 객체의 속성 접근이 조금 느려지므로, 끈 상태를 잴 때는 아예 설치하지 않는다.
+#
+# 단축키: F12 = 통계 출력, Shift+F12 = cProfile + tracemalloc 기록 시작/저장
+import core_path  # noqa: F401
+from tradingcore.latency import LatencyRecorder, ProfileSession
+
+MODEL_METHODS = ("update_many", "update_entry_price", "update_target_price", "update_leverage",
+                 "update_position", "update_capital", "update_exchange_rate", "calculate_profit")
+
+
+class LatencyInstrument:
+    def __init__(self, root, view, controller, budget_ms=16.0, profile_prefix="latency-profile"):
+        self.root = root
+        self.view = view
+        self.controller = controller
+        self.recorder = LatencyRecorder(budget_ms)
+        self.profile = ProfileSession(profile_prefix)
+        self.installed = False
+        self._first_event = None  # 이번 병합 묶음의 첫 입력 시각 (ns)
+
+    def install(self):
+        if self.installed:
+            return
+        recorder = self.recorder
+        clock = recorder.clock
+        scheduler = self.view.scheduler
+        schedule = scheduler.schedule
+        run = scheduler._run  # 감싸기 전 원래 메서드
+        input_hist = recorder.histogram("input")
+        dispatch_hist = recorder.histogram("dispatch")
+        for name in ("model", "view", "paint", "work", "frame"):
+            recorder.histogram(name)  # 보고서 순서를 단계 순서대로
+
+        def timed_schedule(key, callback):
+            if self._first_event is None:
+                self._first_event = clock()
+            return schedule(key, callback)
+
+        def timed_run():
+            start = clock()
+            first, self._first_event = self._first_event, None
+            if first is not None:
+                input_hist.record(start - first)
+            try:
+                run()
+            finally:
+                end = clock()
+                dispatch_hist.record(end - start)
+                # 콜백 중 위젯 변경으로 예약된 다시 그리기(idle) 뒤에 실행된다
+                self.root.after_idle(self._painted, first, start, end)
+
+        # scheduler 는 root.after(..., self._run) 로 예약할 때 인스턴스 속성을 읽으므로 감싼 것이 쓰인다
+        recorder.replace(scheduler, "schedule", timed_schedule)
+        recorder.replace(scheduler, "_run", timed_run)
+
+        model = self.controller.model
+        for method in MODEL_METHODS:
+            recorder.wrap(model, method, "model")
+        recorder.wrap(self.controller, "_notify_view", "view")
+
+        self.root.bind_all("<F12>", self.dump, add="+")
+        self.root.bind_all("<Shift-F12>", self.toggle_profile, add="+")
+        self.installed = True
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        self.recorder.unwrap_all()
+        self.root.unbind_all("<F12>")
+        self.root.unbind_all("<Shift-F12>")
+        self._first_event = None
+        self.installed = False
+
+    def _painted(self, first, start, end):
+        now = self.recorder.clock()
+        self.recorder.record("paint", now - end)
+        self.recorder.record("work", now - start)
+        if first is not None:
+            self.recorder.record("frame", now - first)
+
+    def report(self):
+        return self.recorder.report()
+
+    def dump(self, event=None):
+        print(self.report(), flush=True)
+
+    def toggle_profile(self, event=None):
+        # 기록 중이면 멈추고 파일로 저장, 아니면 기록 시작
+        if self.profile.running:
+            prof_path, text_path = self.profile.stop()
+            print(f"프로파일 저장: {prof_path}, {text_path}", flush=True)
+        else:
+            self.profile.start()
+            print("프로파일 기록 시작 (Shift+F12 로 저장)", flush=True)
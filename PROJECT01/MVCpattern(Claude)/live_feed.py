@@ -0,0 +1,86 @@
+# live_feed.py
+# 실시간 가격 피드를 Tk 루프에 연결
+# 피드 스레드(tradingcore.feed.FeedClient)는 종목별 최신 틱만 버퍼에 남기고,
+# 이 어댑터가 root.after 로 최대 fps 번/초 버퍼를 비워 목표 가격과 포지션 장부에 반영한다.
+# 피드가 초당 수천 틱을 보내도 Tk 쪽 작업은 프레임당 한 번뿐이다.
+import time
+
+import core_path  # noqa: F401
+from tradingcore.feed import LagStats
+
+
+class LiveFeedAdapter:
+    def __init__(self, root, controller, client, symbol, fps=30, status_interval_ms=1000):
+        self.root = root
+        self.controller = controller
+        self.client = client
+        self.symbol = symbol  # 목표 가격으로 따라갈 종목
+        self.interval_ms = max(1, int(1000 / fps))
+        self.status_interval_ms = status_interval_ms
+        self._job = None
+        self._last_status = 0.0
+
+        # 지연 통계 (ms)
+        self.network_lag = LagStats()  # 보낸 시각 -> 피드 스레드가 받은 시각
+        self.ui_lag = LagStats()       # 받은 시각 -> 화면에 반영한 시각
+        self.total_lag = LagStats()    # 보낸 시각 -> 화면에 반영한 시각
+        self.frames = 0                # 틱을 반영한 프레임 수
+
+    def start(self):
+        self.client.start()
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._poll)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self.client.stop()
+
+    def _poll(self):
+        self._job = self.root.after(self.interval_ms, self._poll)
+        latest = self.client.ticks.drain()
+        if latest:
+            self.apply(latest)
+        now = time.monotonic()
+        if (now - self._last_status) * 1000 >= self.status_interval_ms:
+            self._last_status = now
+            view = self.controller.view
+            if view is not None and hasattr(view, 'update_feed_status'):
+                view.update_feed_status(self.stats())
+
+    def apply(self, latest):
+        # latest: {symbol: (price, 보낸 시각 ms, 받은 시각 ms)}
+        now_ms = time.time() * 1000
+        self.frames += 1
+        tick = latest.get(self.symbol)
+        if tick is not None:
+            price, sent_ms, received_ms = tick
+            self.network_lag.add(received_ms - sent_ms)
+            self.ui_lag.add(now_ms - received_ms)
+            self.total_lag.add(now_ms - sent_ms)
+        # 사용자가 목표 가격을 입력 중이면 목표 가격은 따라가지 않는다
+        # (모델만 피드 가격으로 바뀌면 결과가 칸에 보이는 입력값과 어긋남). 장부 시세는 계속 반영
+        view = self.controller.view
+        follow = tick is not None and not (view is not None and hasattr(view, 'is_editing_target_price')
+                                           and view.is_editing_target_price())
+        with self.controller.transaction():
+            self.controller.update_market_prices({symbol: tick[0] for symbol, tick in latest.items()})
+            if follow:
+                self.controller.update_target_price(tick[0])
+        if follow and view is not None and hasattr(view, 'set_target_price_text'):
+            view.set_target_price_text(tick[0])
+
+    def stats(self):
+        ticks = self.client.ticks
+        return {
+            "connected": self.client.connected,
+            "received": ticks.received,
+            "dropped": ticks.dropped,
+            "parse_errors": ticks.parse_errors,
+            "overruns": self.client.overruns,
+            "frames": self.frames,
+            "network_lag": self.network_lag.summary(),
+            "ui_lag": self.ui_lag.summary(),
+            "total_lag": self.total_lag.summary(),
+        }
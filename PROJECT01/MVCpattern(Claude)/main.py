@@ -1,17 +1,65 @@
+import argparse
 import tkinter as tk
 from model import TradingCalculatorModel
 from view import TradingCalculatorView
 from controller import TradingCalculatorController
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="트레이딩 수익/손실 바로미터")
+    parser.add_argument("--feed", metavar="HOST:PORT", help="목표 가격을 따라갈 실시간 가격 피드 (JSON lines over TCP)")
+    parser.add_argument("--symbol", default="BTCUSDT", help="피드에서 따라갈 종목")
+    parser.add_argument("--fps", type=int, default=30, help="피드 가격을 화면에 반영하는 최대 횟수 (초당)")
+    parser.add_argument("--book", metavar="JSON", help="슬리피지 계산에 쓸 호가창 스냅샷 ({\"bids\": [...], \"asks\": [...]})")
+    parser.add_argument("--latency", action="store_true",
+                        help="입력 -> 컨트롤러 -> 모델 -> 뷰 -> 다시 그리기 단계별 지연 측정 (F12: 통계, Shift+F12: 프로파일)")
+    parser.add_argument("--latency-report", metavar="PATH", help="종료할 때 지연 통계를 저장할 파일 (--latency 포함)")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="실행 내내 cProfile + tracemalloc 기록 후 종료 시 PREFIX.prof / PREFIX.txt 로 저장")
+    args = parser.parse_args(argv)
+    
     # MVC 패턴 구성
     model = TradingCalculatorModel()
     controller = TradingCalculatorController(model)
+    controller.alert_symbol = args.symbol
     
     root = tk.Tk()
     view = TradingCalculatorView(root, controller)
     
+    if args.book:
+        from tradingcore.slippage import load_order_book
+        controller.set_order_book(load_order_book(args.book))
+    
+    instrument = None
+    if args.latency or args.latency_report or args.profile:
+        from instrument import LatencyInstrument
+        instrument = LatencyInstrument(root, view, controller, profile_prefix=args.profile or "latency-profile")
+        if args.latency or args.latency_report:
+            instrument.install()
+        if args.profile:
+            instrument.profile.start()
+    
+    feed = None
+    if args.feed:
+        from tradingcore.feed import FeedClient
+        from live_feed import LiveFeedAdapter
+        host, _, port = args.feed.rpartition(":")
+        # 포지션 장부의 다른 종목도 갱신하도록 종목을 거르지 않는다
+        feed = LiveFeedAdapter(root, controller, FeedClient(host or "127.0.0.1", int(port)), args.symbol, args.fps)
+        feed.start()
+    
     root.mainloop()
+    if feed is not None:
+        feed.stop()
+    controller.executor.shutdown()
+    if instrument is not None:
+        if instrument.profile.running:
+            print("프로파일 저장: {}, {}".format(*instrument.profile.stop()))
+        if instrument.installed:
+            report = instrument.report()
+            print(report)
+            if args.latency_report:
+                with open(args.latency_report, "w", encoding="utf-8") as f:
+                    f.write(report + "\n")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,102 @@
 # model.py
+# 입력값과 파생값을 작은 의존성 그래프로 관리한다.
+# 입력이 바뀌면 그 입력에 의존하는 파생값만 무효화되고,
+# 파생값은 읽을 때(lazy) 계산되어 다음 무효화 전까지 캐시된다.
+
+import core_path  # noqa: F401
+from tradingcore.alerts import AlertEngine
+from tradingcore.fees import fee_impact_percent
+from tradingcore import formula
+from tradingcore.margin import default_engine
+from tradingcore.portfolio import Portfolio
+from tradingcore import slippage, solve
+
+_MISSING = object()
+
+
+class _Input:
+    # 입력값 디스크립터: 값이 실제로 바뀐 경우에만 의존 파생값을 무효화
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj._inputs[self.name]
+    
+    def __set__(self, obj, value):
+        old = obj._inputs.get(self.name, _MISSING)
+        if old is not _MISSING and type(old) is type(value) and old == value:
+            return
+        obj._inputs[self.name] = value
+        obj._invalidate(self.name)
+
+
+class _Derived:
+    # 파생값 디스크립터: 처음 읽을 때 계산 후 캐시
+    # 0으로 나누기 등 계산 오류는 nan 으로 캐시하고 실패로 표시 (의존 파생값에도 전파)
+    def __init__(self, func, deps):
+        self.func = func
+        self.deps = deps
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        cache = obj._cache
+        if self.name in cache:
+            return cache[self.name]
+        try:
+            value = self.func(obj)
+            failed = any(dep in obj._failed for dep in self.deps)
+        except (ArithmeticError, ValueError, TypeError):
+            value = float("nan")
+            failed = True
+        cache[self.name] = value
+        if failed:
+            obj._failed.add(self.name)
+        return value
+
+
+def _derived(*deps):
+    def decorator(func):
+        return _Derived(func, deps)
+    return decorator
+
+
 class TradingCalculatorModel:
+    # update_many 에서 사용하는 입력 이름 -> (모델 속성, 변환 함수)
+    FIELDS = {
+        "entry_price": ("entry_price", float),
+        "target_price": ("target_price", float),
+        "leverage": ("leverage", int),
+        "position": ("position", str),
+        "capital": ("capital_usd", float),
+        "exchange_rate": ("exchange_rate", float),
+    }
+    
+    # 화면에 표시하는 결과값 (calculation_error 판단 기준)
+    RESULTS = ("leveraged_percent", "actual_profit_usd", "actual_profit_krw")
+    
+    entry_price = _Input()
+    target_price = _Input()
+    leverage = _Input()
+    capital_usd = _Input()
+    exchange_rate = _Input()
+    position = _Input()
+    fee_rate = _Input()
+    order_book = _Input()  # tradingcore.slippage.OrderBook (없으면 None)
+    
+    # 청산 가격 / 마진 비율 계산에 사용하는 유지증거금 구간 엔진
+    margin_engine = default_engine
+    
     def __init__(self):
+        self._inputs = {}
+        self._cache = {}
+        self._failed = set()
+        
         self.entry_price = 0.0
         self.target_price = 0.0
         self.leverage = 10
@@ -8,33 +104,176 @@ class TradingCalculatorModel:
         self.exchange_rate = 1450.0
         self.position = "Long"
         self.fee_rate = 0.0005  # 거래소 수수료 (0.05%)
+        self.order_book = None
         
-        # 결과 저장
-        self.leveraged_percent = 0.0
-        self.actual_profit_usd = 0.0
-        self.actual_profit_krw = 0.0
+        # 마지막 calculate_profit 결과
         self.calculation_error = False
         
+        # 여러 포지션 장부 (현재 입력을 목표 가격 기준으로 추가)
+        self.portfolio = Portfolio(self.exchange_rate, self.fee_rate)
+        
+        # 실시간 가격 알림 (손익 조건은 등록할 때 가격 조건으로 바뀐다)
+        self.alerts = AlertEngine(self.fee_rate, fee_sides=1, margin_engine=self.margin_engine)
+    
+    # --- 파생값 (연산 순서는 tradingcore.formula.calculate 와 동일) ---
+    
+    @_derived("entry_price", "target_price", "position")
+    def profit_percent(self):
+        # 기본 수익률
+        return formula.profit_percent(self.entry_price, self.target_price, self.position)
+    
+    @_derived("leverage", "fee_rate")
+    def fee_impact(self):
+        # 레버리지가 반영된 수수료 (%)
+        return fee_impact_percent(self.leverage, self.fee_rate)
+    
+    @_derived("profit_percent", "leverage", "fee_impact")
+    def leveraged_percent(self):
+        # 수수료 반영한 레버리지 수익률
+        return (self.profit_percent * self.leverage) - self.fee_impact
+    
+    @_derived("capital_usd", "leveraged_percent")
+    def actual_profit_usd(self):
+        return self.capital_usd * (self.leveraged_percent / 100)
+    
+    @_derived("actual_profit_usd", "exchange_rate")
+    def actual_profit_krw(self):
+        return self.actual_profit_usd * self.exchange_rate
+    
+    @_derived("capital_usd", "actual_profit_usd")
+    def final_capital_usd(self):
+        return self.capital_usd + self.actual_profit_usd
+    
+    @_derived("final_capital_usd", "exchange_rate")
+    def final_capital_krw(self):
+        return self.final_capital_usd * self.exchange_rate
+    
+    @_derived("entry_price", "leverage", "capital_usd", "position")
+    def liquidation_price(self):
+        # 격리 마진 청산 가격 (목표 가격과 무관)
+        return self.margin_engine.liquidation_price(
+            self.entry_price, self.leverage, self.capital_usd, self.position)
+    
+    @_derived("entry_price", "target_price", "leverage", "capital_usd", "position")
+    def margin_ratio(self):
+        # 목표 가격을 현재가로 보았을 때의 마진 비율 (1 이상이면 청산)
+        return self.margin_engine.margin_ratio(
+            self.entry_price, self.target_price, self.leverage, self.capital_usd, self.position)
+    
+    @_derived("entry_price", "position", "fee_rate")
+    def break_even_price(self):
+        # 수수료를 포함해 손익이 0 이 되는 목표 가격 (이 모델은 수수료 1회)
+        return solve.break_even_price(self.entry_price, self.position, self.fee_rate, fee_sides=1)
+    
+    @_derived("entry_price", "target_price", "leverage", "capital_usd", "exchange_rate", "position", "fee_rate",
+              "order_book")
+    def slippage_result(self):
+        # 호가창 기준 슬리피지 반영 결과 (수익률, USD, KRW, 진입 체결가, 청산 체결가)
+        # 호가창이 없으면 None, 호가 잔량을 넘는 주문이면 nan
+        if self.order_book is None:
+            return None
+        return slippage.calculate_with_slippage(self.order_book, self.entry_price, self.target_price, self.leverage,
+                                                self.capital_usd, self.exchange_rate, self.position,
+                                                self.fee_rate, fee_sides=1)
+    
+    # --- 역계산 (원하는 결과 -> 입력값) ---
+    
+    def target_for_percent(self, percent):
+        # 수수료 반영 레버리지 수익률이 percent(%) 가 되는 목표 가격 (불가능하면 ValueError)
+        return solve.target_for_percent(self.entry_price, self.leverage, percent, self.position,
+                                        self.fee_rate, fee_sides=1)
+    
+    def target_for_profit_usd(self, profit_usd):
+        return solve.target_for_profit_usd(self.entry_price, self.leverage, self.capital_usd, profit_usd,
+                                           self.position, self.fee_rate, fee_sides=1)
+    
+    def max_leverage_for_move(self, adverse_move_percent):
+        # 가격이 adverse_move_percent(%) 불리하게 움직여도 청산되지 않는 최대 레버리지 (없으면 0)
+        return solve.max_leverage(adverse_move_percent, self.capital_usd, self.position, self.margin_engine)
+    
+    def _invalidate(self, name):
+        # name 에 (직간접적으로) 의존하는 캐시된 파생값만 제거
+        for dependent in _dependents(type(self), name):
+            self._cache.pop(dependent, None)
+            self._failed.discard(dependent)
+        if name == "fee_rate" and "alerts" in self.__dict__:
+            # 장부와 알림은 수수료를 따로 들고 있으므로 바뀐 값을 바로 넘긴다 (환율은 portfolio_totals 에서)
+            self.portfolio.set_fee_rate(self.fee_rate)
+            self.alerts.set_fee_rate(self.fee_rate)
+    
+    def calculate(self, entry, target, leverage, capital, rate, position):
+        # 순수 계산 함수 (모델 상태를 변경하지 않음)
+        return formula.calculate(entry, target, leverage, capital, rate, position, self.fee_rate)
+    
     def calculate_profit(self):
-        try:
-            # 기본 수익률 계산
-            if self.position == 'Long':
-                profit_percent = ((self.target_price - self.entry_price) / self.entry_price * 100)
-            else:  # Short
-                profit_percent = ((self.entry_price - self.target_price) / self.entry_price * 100)
-            
-            # 수수료 반영한 레버리지 수익률
-            self.leveraged_percent = (profit_percent * self.leverage) - (self.leverage * self.fee_rate * 100)
-            
-            # 실제 수익 계산
-            self.actual_profit_usd = self.capital_usd * (self.leveraged_percent / 100)
-            self.actual_profit_krw = self.actual_profit_usd * self.exchange_rate
-            
-            self.calculation_error = False
-            return True
-        except Exception:
+        # 결과값을 평가 (바뀌지 않은 부분은 캐시 사용)
+        for name in self.RESULTS:
+            getattr(self, name)
+        self.calculation_error = any(name in self._failed for name in self.RESULTS)
+        return not self.calculation_error
+
+    def calculate_batch(self, entry_price, target_price, leverage, position, capital_usd=None, exchange_rate=None):
+        # 여러 포지션을 한 번에 계산 (numpy 필요, 모델 상태는 변경하지 않음)
+        # 반환: (leveraged_percent, actual_profit_usd, actual_profit_krw, calculation_error) 배열
+        from tradingcore.batch import calculate_batch
+
+        if capital_usd is None:
+            capital_usd = self.capital_usd
+        if exchange_rate is None:
+            exchange_rate = self.exchange_rate
+        return calculate_batch(entry_price, target_price, leverage, position,
+                               capital_usd, exchange_rate, self.fee_rate)
+
+    def liquidation_price_batch(self, entry_price, leverage, position, capital_usd=None):
+        # 여러 포지션의 청산 가격 (numpy 필요, 잘못된 행은 nan)
+        import numpy as np
+        
+        if capital_usd is None:
+            capital_usd = self.capital_usd
+        position = np.asarray(position)
+        is_long = position if position.dtype == np.bool_ else position == "Long"
+        return self.margin_engine.liquidation_price_batch(entry_price, leverage, capital_usd, is_long)
+    
+    def add_to_portfolio(self, symbol=""):
+        # 현재 입력을 장부에 추가하고 포지션 id 반환 (잘못된 입력이면 ValueError)
+        # 목표 가격을 아직 입력하지 않았으면(0) 진입 가격을 현재 가격으로 쓴다 (0 으로 넣으면 손익이 -100% x 레버리지)
+        mark_price = self.target_price if self.target_price else None
+        return self.portfolio.add(self.entry_price, self.leverage, self.position, self.capital_usd,
+                                  mark_price=mark_price, symbol=symbol)
+    
+    def remove_from_portfolio(self, position_id):
+        self.portfolio.remove(position_id)
+        self.alerts.cancel_position(position_id)
+    
+    def add_alert(self, symbol, kind, threshold):
+        # 현재 입력(진입 가격, 레버리지, 투자금, 방향)에 대한 알림을 등록하고 id 반환 (잘못된 조건이면 ValueError)
+        return self.alerts.add(symbol, kind, threshold, self.entry_price, self.leverage, self.position,
+                               self.capital_usd)
+    
+    def portfolio_totals(self):
+        # 장부 합계 (KRW 는 현재 환율 기준)
+        self.portfolio.set_exchange_rate(self.exchange_rate)
+        return self.portfolio.totals()
+    
+    def update_many(self, **fields):
+        # 여러 입력을 한 번에 적용하고 계산은 한 번만 수행
+        # 잘못된 값은 건너뛰고(기존 값 유지) 오류로 표시한다
+        unknown = [name for name in fields if name not in self.FIELDS]
+        if unknown:
+            raise TypeError(f"알 수 없는 입력: {', '.join(unknown)}")
+        
+        valid = True
+        for name, value in fields.items():
+            attr, convert = self.FIELDS[name]
+            try:
+                setattr(self, attr, convert(value))
+            except ValueError:
+                valid = False
+        
+        if not valid:
             self.calculation_error = True
             return False
+        return self.calculate_profit()
     
     def update_entry_price(self, value):
         try:
@@ -78,4 +317,28 @@ class TradingCalculatorModel:
             return self.calculate_profit()
         except ValueError:
             self.calculation_error = True
-            return False
\ No newline at end of file
+            return False
+
+
+_DEPENDENTS = {}
+
+
+def _dependents(cls, name):
+    # 입력/파생값 이름 -> 그 값에 의존하는 모든 파생값 (클래스별로 한 번만 계산)
+    key = (cls, name)
+    if key not in _DEPENDENTS:
+        direct = {}
+        for attr in dir(cls):
+            node = getattr(cls, attr)
+            if isinstance(node, _Derived):
+                for dep in node.deps:
+                    direct.setdefault(dep, []).append(attr)
+        result = []
+        stack = [name]
+        while stack:
+            for dependent in direct.get(stack.pop(), []):
+                if dependent not in result:
+                    result.append(dependent)
+                    stack.append(dependent)
+        _DEPENDENTS[key] = tuple(result)
+    return _DEPENDENTS[key]
@@ -0,0 +1,191 @@
+# positions_table.py
+# 포지션 장부를 보여 주는 가상화 표 (수만 행)
+# - 행마다 위젯을 만들지 않고 Canvas 텍스트 항목을 "보이는 행 수 + 1" 줄만 만든다
+# - 스크롤 영역은 전체 행 높이로 잡아 스크롤바/휠은 Canvas 가 그대로 처리하고,
+#   화면에 새로 들어온 행만 슬롯(행 번호 % 슬롯 수)을 재활용해 그 위치로 옮긴다
+# - 다시 그릴 때는 글자/색이 바뀐 칸만 itemconfig 한다 (실시간 가격으로 손익만 바뀌면 그 칸만)
+#
+# 사용 예:
+#   table = VirtualTable(window, POSITION_COLUMNS, lambda: len(portfolio), lambda row: position_cells(portfolio, row))
+#   table.pack(fill="both", expand=True)
+#   table.refresh()   # 장부가 바뀔 때마다 (보이는 행만 다시 읽는다)
+import tkinter as tk
+
+import core_path  # noqa: F401
+from tradingcore.formatting import format_percent
+
+# (제목, 너비 px, 정렬) - 정렬은 Canvas anchor (숫자는 오른쪽 "e")
+POSITION_COLUMNS = [
+    ("ID", 60, "e"),
+    ("종목", 90, "w"),
+    ("방향", 50, "w"),
+    ("레버리지", 70, "e"),
+    ("진입가", 100, "e"),
+    ("현재가", 100, "e"),
+    ("손익 (USD)", 110, "e"),
+    ("수익률", 90, "e"),
+    ("노출 (USD)", 110, "e"),
+]
+
+TEXT_COLOR = "white"
+PROFIT_COLOR = "#4CAF50"
+LOSS_COLOR = "#FF5252"
+
+
+def position_cells(portfolio, row):
+    # 장부의 row 번째 행 -> [(글자, 색)] (portfolio.Portfolio 의 열 배열을 바로 읽는다)
+    pnl = portfolio.pnl_usd[row]
+    capital = portfolio.capital_usd[row]
+    color = PROFIT_COLOR if pnl > 0 else LOSS_COLOR if pnl < 0 else TEXT_COLOR
+    return [
+        (str(portfolio.ids[row]), TEXT_COLOR),
+        (portfolio.symbols[row] or "-", TEXT_COLOR),
+        ("롱" if portfolio.is_long[row] else "숏", TEXT_COLOR),
+        (f"{portfolio.leverage[row]:g}x", TEXT_COLOR),
+        (f"{portfolio.entry_price[row]:,.2f}", TEXT_COLOR),
+        (f"{portfolio.mark_price[row]:,.2f}", TEXT_COLOR),
+        (f"{pnl:+,.2f}", color),
+        (format_percent(pnl / capital * 100), color),
+        (f"{portfolio.exposure[row]:,.0f}", TEXT_COLOR),
+    ]
+
+
+class VirtualTable:
+    def __init__(self, parent, columns, row_count, get_row, row_height=22, visible_rows=20, bg="#1C1C1C",
+                 header_bg="#3A3A3C", font=("Segoe UI", 10), header_font=("Malgun Gothic", 10, "bold")):
+        # row_count() -> 전체 행 수, get_row(i) -> 열마다 (글자, 색)
+        self.columns = columns
+        self.row_count = row_count
+        self.get_row = get_row
+        self.row_height = row_height
+        self.font = font
+        self.width = sum(width for _, width, _ in columns)
+
+        # 글자를 놓을 x 좌표 (왼쪽 정렬은 칸 왼쪽, 오른쪽 정렬은 칸 오른쪽에서 여백만큼 안쪽)
+        self._text_x = []
+        x = 0
+        for _, width, anchor in columns:
+            self._text_x.append(x + 6 if anchor == "w" else x + width - 6)
+            x += width
+
+        self.frame = tk.Frame(parent, bg=bg)
+        header = tk.Canvas(self.frame, width=self.width, height=row_height + 4, bg=header_bg, highlightthickness=0)
+        for (title, _, anchor), text_x in zip(columns, self._text_x):
+            header.create_text(text_x, (row_height + 4) // 2, text=title, anchor=anchor, fill=TEXT_COLOR,
+                               font=header_font)
+        header.grid(row=0, column=0, sticky='ew')
+
+        self.canvas = tk.Canvas(self.frame, width=self.width, height=visible_rows * row_height, bg=bg,
+                                highlightthickness=0, yscrollincrement=row_height)
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.grid(row=1, column=0, sticky='nsew')
+        self.scrollbar.grid(row=1, column=1, sticky='ns')
+        self.frame.rowconfigure(1, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-3, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.yview_scroll(3, "units"))
+
+        # 슬롯 = 화면의 한 줄. 슬롯 k 는 행 번호 % 슬롯 수 == k 인 행을 맡는다
+        self._slot_items = []   # 슬롯 -> 열마다 Canvas 항목 id
+        self._slot_row = []     # 슬롯 -> 지금 보여 주는 행 번호 (-1 = 비어 있음)
+        self._slot_cells = []   # 슬롯 -> 마지막으로 그린 (글자, 색) 목록
+        self._rows = -1         # 스크롤 영역을 잡을 때의 전체 행 수
+        self._first = 0         # 보이는 첫 행 / 끝 행(제외)
+        self._last = 0
+
+        # 통계 (마지막 refresh)
+        self.last_changed_cells = 0
+        self.last_moved_rows = 0
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def _ensure_slots(self, count):
+        # 창이 커지면 슬롯을 더 만든다 (줄지는 않음). 슬롯 수가 바뀌면 행 -> 슬롯 대응이 바뀌므로 모두 비운다
+        if count <= len(self._slot_items):
+            return
+        for slot in range(len(self._slot_items)):
+            self._clear_slot(slot)
+        for _ in range(count - len(self._slot_items)):
+            self._slot_items.append([
+                self.canvas.create_text(text_x, -self.row_height, text="", anchor=anchor, fill=TEXT_COLOR,
+                                        font=self.font)
+                for (_, _, anchor), text_x in zip(self.columns, self._text_x)
+            ])
+            self._slot_row.append(-1)
+            self._slot_cells.append([("", TEXT_COLOR)] * len(self.columns))
+
+    def _clear_slot(self, slot):
+        self._slot_row[slot] = -1
+        drawn = self._slot_cells[slot]
+        for col, item in enumerate(self._slot_items[slot]):
+            if drawn[col][0]:
+                self.canvas.itemconfig(item, text="")
+                drawn[col] = ("", drawn[col][1])
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._update_rows(refresh_all=False)
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-event.delta / 120) * 3, "units")
+
+    def refresh(self):
+        # 전체 행 수가 바뀌었으면 스크롤 영역을 다시 잡고, 보이는 행을 모두 다시 읽는다 (바뀐 칸만 그림)
+        rows = self.row_count()
+        if rows != self._rows:
+            self._rows = rows
+            self.canvas.configure(scrollregion=(0, 0, self.width, rows * self.row_height))
+        self._update_rows(refresh_all=True)
+
+    def _update_rows(self, refresh_all):
+        canvas = self.canvas
+        row_height = self.row_height
+        height = max(canvas.winfo_height(), row_height)
+        top = int(canvas.canvasy(0))
+        first = top // row_height
+        last = min(self._rows, (top + height) // row_height + 1)
+        self._ensure_slots(height // row_height + 2)
+        if not refresh_all and first == self._first and last == self._last:
+            return  # 같은 행 범위 안에서의 스크롤은 Canvas 가 옮겨 준다
+        self._first, self._last = first, last
+
+        n_slots = len(self._slot_items)
+        changed = moved = 0
+        itemconfig = canvas.itemconfig
+        for row in range(first, last):
+            slot = row % n_slots
+            items = self._slot_items[slot]
+            drawn = self._slot_cells[slot]
+            if self._slot_row[slot] != row:
+                # 새로 화면에 들어온 행: 슬롯을 그 행 위치로 옮긴다
+                self._slot_row[slot] = row
+                y = row * row_height + row_height // 2
+                for item, text_x in zip(items, self._text_x):
+                    canvas.coords(item, text_x, y)
+                moved += 1
+            elif not refresh_all:
+                continue
+            for col, cell in enumerate(self.get_row(row)):
+                if cell != drawn[col]:
+                    text, color = cell
+                    if drawn[col][1] != color:
+                        itemconfig(items[col], text=text, fill=color)
+                    else:
+                        itemconfig(items[col], text=text)
+                    drawn[col] = cell
+                    changed += 1
+
+        # 범위를 벗어났는데 남아 있는 슬롯(행이 줄었거나 창 끝)은 비운다
+        for slot, row in enumerate(self._slot_row):
+            if row != -1 and not first <= row < last:
+                self._clear_slot(slot)
+        self.last_changed_cells = changed
+        self.last_moved_rows = moved
@@ -0,0 +1,183 @@
+# scenario_grid.py
+# 목표 가격 × 레버리지 시나리오 히트맵
+# 전체 격자를 tradingcore.batch.calculate_batch 한 번으로 계산하고,
+# 다시 그릴 때는 색이 바뀐 칸만 itemconfig 한다.
+# submit(컨트롤러의 submit_job) 을 주면 격자 계산은 작업 스레드에서 하고 결과만 Tk 스레드에서 그린다.
+import tkinter as tk
+
+import numpy as np
+
+import core_path  # noqa: F401
+from tradingcore.batch import calculate_batch
+
+MIN_LEVERAGE = 1
+MAX_LEVERAGE = 125
+
+# 색 단계 (수익률을 LEVEL_STEP % 단위로 양자화, ±100% 에서 포화)
+LEVELS = 10
+LEVEL_STEP = 100 / LEVELS
+NEUTRAL_COLOR = (0x2A, 0x2A, 0x2A)
+POSITIVE_COLOR = (0x4C, 0xAF, 0x50)
+NEGATIVE_COLOR = (0xFF, 0x52, 0x52)
+ERROR_COLOR = "#111111"
+
+
+def _blend(a, b, t):
+    return "#%02X%02X%02X" % tuple(int(round(x + (y - x) * t)) for x, y in zip(a, b))
+
+
+# 인덱스 0 = 계산 불가, 1..2*LEVELS+1 = -LEVELS..+LEVELS
+PALETTE = [ERROR_COLOR] + [
+    _blend(NEUTRAL_COLOR, NEGATIVE_COLOR if level < 0 else POSITIVE_COLOR, abs(level) / LEVELS)
+    for level in range(-LEVELS, LEVELS + 1)
+]
+
+
+def compute_grid(entry_price, position, fee_rate, span=0.2, n_prices=500,
+                 min_leverage=MIN_LEVERAGE, max_leverage=MAX_LEVERAGE):
+    # 행 = 목표 가격 (위쪽이 높은 가격), 열 = 레버리지
+    # 반환: (prices, leverages, leveraged_percent[n_prices, n_leverages])
+    prices = np.linspace(entry_price * (1 + span), entry_price * (1 - span), n_prices)
+    leverages = np.arange(min_leverage, max_leverage + 1)
+    # 수익률(%) 만 필요하므로 투자금/환율은 1 로 둔다
+    leveraged_percent, _, _, errors = calculate_batch(
+        entry_price, prices[:, None], leverages[None, :], position == "Long", 1.0, 1.0, fee_rate)
+    if entry_price <= 0:
+        leveraged_percent = np.full(errors.shape, np.nan)
+    return prices, leverages, leveraged_percent
+
+
+def color_levels(leveraged_percent):
+    # 수익률 행렬을 PALETTE 인덱스(uint8) 로 변환
+    with np.errstate(invalid="ignore"):
+        levels = np.clip(np.rint(leveraged_percent / LEVEL_STEP), -LEVELS, LEVELS)
+    levels = np.nan_to_num(levels, nan=-LEVELS - 1).astype(np.int16) + LEVELS + 1
+    return levels.astype(np.uint8)
+
+
+class ScenarioGridView:
+    def __init__(self, parent, model, n_prices=500, span=0.2, cell_width=4, cell_height=1, bg="#1C1C1C",
+                 submit=None):
+        self.model = model
+        self.submit = submit
+        self.n_prices = n_prices
+        self.span = span
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.n_leverages = MAX_LEVERAGE - MIN_LEVERAGE + 1
+
+        self.frame = tk.Frame(parent, bg=bg)
+        self.canvas = tk.Canvas(self.frame, width=self.n_leverages * cell_width,
+                                height=n_prices * cell_height, bg=ERROR_COLOR, highlightthickness=0)
+        self.canvas.pack(side=tk.TOP)
+        self.info_label = tk.Label(self.frame, text="-", bg=bg, fg="white", font=("Segoe UI", 10))
+        self.info_label.pack(side=tk.TOP, fill='x', pady=(6, 0))
+        self.canvas.bind("<Motion>", self._on_motion)
+
+        # 칸은 처음 한 번만 만들고 이후에는 색만 바꾼다
+        self._items = np.empty((n_prices, self.n_leverages), dtype=np.int64)
+        for i in range(n_prices):
+            y0 = i * cell_height
+            for j in range(self.n_leverages):
+                x0 = j * cell_width
+                self._items[i, j] = self.canvas.create_rectangle(
+                    x0, y0, x0 + cell_width, y0 + cell_height, fill=ERROR_COLOR, width=0)
+        self._levels = np.zeros((n_prices, self.n_leverages), dtype=np.uint8)
+        self._marker = self.canvas.create_rectangle(0, 0, 0, 0, outline="white", width=1)
+
+        self._grid_key = None
+        self._pending_key = None  # 작업 스레드에서 계산 중인 격자
+        self._pending_job = None
+        self.prices = None
+        self.leveraged_percent = None
+        self.last_changed_cells = 0
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def refresh(self):
+        m = self.model
+        # 격자는 진입가/포지션/수수료에만 의존 -> 목표가/레버리지 변경은 표시만 이동
+        key = (m.entry_price, m.position, m.fee_rate)
+        self.last_changed_cells = 0
+        if self.submit is None:
+            if key != self._grid_key:
+                self._apply_grid(key, self._compute(key))
+        elif key == self._grid_key:
+            self._pending_key = None  # 원래 값으로 돌아왔으면 진행 중인 계산 결과는 버린다
+        elif key != self._pending_key or self._pending_lost():
+            # 진입가를 계속 입력하는 동안 이전 계산은 취소된다 (같은 작업 key)
+            self._pending_key = key
+            self._pending_job = self.submit("scenario_grid", self._compute, key,
+                                            on_done=lambda result, key=key: self._on_computed(key, result),
+                                            on_error=lambda error, key=key: self._on_failed(key, error))
+        self._move_marker(m.target_price, m.leverage)
+
+    def _compute(self, key):
+        # 작업 스레드에서도 호출되므로 모델 대신 key 값만 사용
+        entry_price, position, fee_rate = key
+        prices, _, leveraged_percent = compute_grid(entry_price, position, fee_rate, self.span, self.n_prices)
+        return prices, leveraged_percent, color_levels(leveraged_percent)
+
+    def _pending_lost(self):
+        # 결과도 오류도 알리지 않고 끝난 작업 (밖에서 취소됨 등) -> 같은 key 라도 다시 계산해야 한다
+        job = self._pending_job
+        return job is not None and (job.done or job.cancelled)
+
+    def _on_failed(self, key, error):
+        if key != self._pending_key:
+            return
+        # 실패한 key 를 남겨 두면 같은 입력으로는 다시 계산하지 않으므로 비운다 (다음 refresh 에서 재시도)
+        self._pending_key = None
+        self._pending_job = None
+        self.info_label.config(text=f"격자 계산 실패: {error}")
+
+    def _on_computed(self, key, result):
+        if key != self._pending_key:
+            return
+        self._pending_key = None
+        self._pending_job = None
+        self._apply_grid(key, result)
+        self._move_marker(self.model.target_price, self.model.leverage)
+
+    def _apply_grid(self, key, result):
+        self._grid_key = key
+        self.prices, self.leveraged_percent, levels = result
+        self._apply_levels(levels)
+
+    def _apply_levels(self, levels):
+        changed = np.nonzero(levels != self._levels)
+        self.last_changed_cells = len(changed[0])
+        itemconfig = self.canvas.itemconfig
+        items = self._items[changed].tolist()
+        for item, level in zip(items, levels[changed].tolist()):
+            itemconfig(item, fill=PALETTE[level])
+        self._levels = levels
+
+    def _move_marker(self, target_price, leverage):
+        if self.prices is None or not (MIN_LEVERAGE <= leverage <= MAX_LEVERAGE):
+            self.canvas.coords(self._marker, 0, 0, 0, 0)
+            return
+        top, bottom = self.prices[0], self.prices[-1]
+        if top == bottom:
+            self.canvas.coords(self._marker, 0, 0, 0, 0)
+            return
+        row = int(round((top - target_price) / (top - bottom) * (self.n_prices - 1)))
+        row = min(max(row, 0), self.n_prices - 1)
+        col = leverage - MIN_LEVERAGE
+        x0 = col * self.cell_width
+        y0 = row * self.cell_height
+        self.canvas.coords(self._marker, x0 - 1, y0 - 1, x0 + self.cell_width + 1, y0 + self.cell_height + 1)
+        self.canvas.tag_raise(self._marker)
+
+    def _on_motion(self, event):
+        if self.leveraged_percent is None:
+            return
+        row = min(max(event.y // self.cell_height, 0), self.n_prices - 1)
+        col = min(max(event.x // self.cell_width, 0), self.n_leverages - 1)
+        pct = self.leveraged_percent[row, col]
+        if np.isnan(pct):
+            self.info_label.config(text="진입 가격을 입력하세요.")
+        else:
+            self.info_label.config(
+                text=f"목표 {self.prices[row]:,.2f} · {col + MIN_LEVERAGE}x → {pct:.2f}%")
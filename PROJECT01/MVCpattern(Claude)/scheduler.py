@@ -0,0 +1,68 @@
+# scheduler.py
+# 연속 입력 이벤트를 병합해 한 번만 실행하는 스케줄러
+# 같은 key 로 여러 번 예약하면 마지막 콜백만 남고,
+# 예약된 콜백들은 latency_ms 이후(0 이면 다음 idle 시점) 한꺼번에 실행된다.
+# batch 에 컨텍스트 매니저 팩토리(예: controller.transaction)를 주면
+# 한 번에 실행되는 콜백들을 그 안에서 묶어 실행한다.
+
+
+class CoalescingScheduler:
+    def __init__(self, root, latency_ms=16, batch=None):
+        self.root = root
+        self.batch = batch
+        self.latency_ms = latency_ms  # 입력 후 계산까지 허용하는 최대 지연 (기본 약 1프레임)
+        self._pending = {}
+        self._job = None
+
+        # 통계
+        self.requested = 0  # 예약 요청 수
+        self.merged = 0     # 이미 예약된 key 에 병합되어 버려진 요청 수
+        self.executed = 0   # 실제 실행된 콜백 수
+        self.flushes = 0    # 일괄 실행 횟수
+
+    def schedule(self, key, callback):
+        self.requested += 1
+        if key in self._pending:
+            self.merged += 1
+        self._pending[key] = callback
+        if self._job is None:
+            if self.latency_ms > 0:
+                self._job = self.root.after(self.latency_ms, self._run)
+            else:
+                self._job = self.root.after_idle(self._run)
+
+    def flush(self):
+        # 예약된 콜백을 즉시 실행 (종료 직전 등)
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._run()
+
+    def cancel(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self._pending = {}
+
+    def _run(self):
+        self._job = None
+        pending, self._pending = self._pending, {}
+        self.flushes += 1
+        if self.batch is not None and len(pending) > 1:
+            with self.batch():
+                self._call_all(pending)
+        else:
+            self._call_all(pending)
+
+    def _call_all(self, pending):
+        for callback in pending.values():
+            self.executed += 1
+            callback()
+
+    def stats(self):
+        return {
+            "requested": self.requested,
+            "merged": self.merged,
+            "executed": self.executed,
+            "flushes": self.flushes,
+            "pending": len(self._pending),
+        }
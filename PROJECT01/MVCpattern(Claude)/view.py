@@ -1,7 +1,23 @@
 import tkinter as tk
+import core_path  # noqa: F401
+from scheduler import CoalescingScheduler
+from executor import TkExecutor
+from tradingcore.formatting import format_money, format_percent
+
+def run_simulation(job, params, n_paths=200000, n_steps=96):
+    # 작업 스레드에서 실행 (numpy 가 필요하므로 여기서 불러온다)
+    from tradingcore.montecarlo import simulate
+    
+    def progress(fraction):
+        job.check()
+        job.progress(fraction, "손익 분포 계산 중")
+    
+    result = simulate(n_paths=n_paths, n_steps=n_steps, workers=1, chunk_size=n_paths // 10,
+                      progress=progress, **params)
+    return result.summary()
 
 class TradingCalculatorView:
-    def __init__(self, root, controller):
+    def __init__(self, root, controller, latency_ms=16):
         self.controller = controller
         controller.set_view(self)  # 컨트롤러에 즉시 뷰 설정
         
@@ -20,10 +36,16 @@ class TradingCalculatorView:
         self.root = root
         self.root.title("트레이딩 수익/손실 바로미터")
         self.root.configure(bg=self.bg_color)
-        self.root.geometry("560x560")
-        self.root.minsize(560, 560)
+        self.root.geometry("560x840")
+        self.root.minsize(560, 840)
         self.root.resizable(True, True)
         
+        # 키 입력/슬라이더 이벤트를 프레임 단위로 병합 (여러 칸이 바뀌면 계산은 한 번)
+        self.scheduler = CoalescingScheduler(self.root, latency_ms, batch=controller.transaction)
+        
+        # 무거운 계산(시나리오 격자, 시뮬레이션)은 작업 스레드에서 실행하고 결과만 Tk 루프로 받는다
+        controller.set_executor(TkExecutor(self.root))
+        
         # 메인 컨테이너
         self.container = tk.Frame(self.root, bg=self.bg_color)
         self.container.pack(fill="both", expand=True, padx=30, pady=30)
@@ -31,6 +53,14 @@ class TradingCalculatorView:
         self.container.columnconfigure(0, weight=1)
         self.container.columnconfigure(1, weight=2)
         
+        # 시나리오 히트맵 (필요할 때 생성)
+        self.scenario_window = None
+        self.scenario_grid = None
+        
+        # 포지션 표 (필요할 때 생성)
+        self.positions_window = None
+        self.positions_table = None
+        
         # UI 요소들 생성
         self.create_ui_elements()
         
@@ -44,14 +74,16 @@ class TradingCalculatorView:
         self.box_label("진입 가격").grid(row=row, column=0, sticky='ew', padx=(0,10), pady=5, ipady=6)
         self.entry_entry_price = self.styled_entry()
         self.entry_entry_price.grid(row=row, column=1, sticky='ew', pady=5, ipady=6)
-        self.entry_entry_price.bind("<KeyRelease>", lambda event: self.controller.update_entry_price(self.entry_entry_price.get()))
+        self.entry_entry_price.bind("<KeyRelease>", lambda event: self.scheduler.schedule(
+            "entry_price", lambda: self.controller.update_entry_price(self.entry_entry_price.get())))
         
         row += 1
         # 목표 가격
         self.box_label("목표 가격").grid(row=row, column=0, sticky='ew', padx=(0,10), pady=5, ipady=6)
         self.entry_target_price = self.styled_entry()
         self.entry_target_price.grid(row=row, column=1, sticky='ew', pady=5, ipady=6)
-        self.entry_target_price.bind("<KeyRelease>", lambda event: self.controller.update_target_price(self.entry_target_price.get()))
+        self.entry_target_price.bind("<KeyRelease>", lambda event: self.scheduler.schedule(
+            "target_price", lambda: self.controller.update_target_price(self.entry_target_price.get())))
         
         row += 1
         # 레버리지
@@ -93,14 +125,48 @@ class TradingCalculatorView:
         self.box_label("실제 투자금 (달러)").grid(row=row, column=0, sticky='ew', padx=(0,10), pady=5, ipady=6)
         self.entry_capital = self.styled_entry("1000")
         self.entry_capital.grid(row=row, column=1, sticky='ew', pady=5, ipady=6)
-        self.entry_capital.bind("<KeyRelease>", lambda event: self.controller.update_capital(self.entry_capital.get()))
+        self.entry_capital.bind("<KeyRelease>", lambda event: self.scheduler.schedule(
+            "capital", lambda: self.controller.update_capital(self.entry_capital.get())))
         
         row += 1
         # 환율
         self.box_label("적용 환율 (1 USD = 원)").grid(row=row, column=0, sticky='ew', padx=(0,10), pady=5, ipady=6)
         self.entry_exchange_rate = self.styled_entry("1450")
         self.entry_exchange_rate.grid(row=row, column=1, sticky='ew', pady=5, ipady=6)
-        self.entry_exchange_rate.bind("<KeyRelease>", lambda event: self.controller.update_exchange_rate(self.entry_exchange_rate.get()))
+        self.entry_exchange_rate.bind("<KeyRelease>", lambda event: self.scheduler.schedule(
+            "exchange_rate", lambda: self.controller.update_exchange_rate(self.entry_exchange_rate.get())))
+        
+        row += 1
+        # 원하는 수익 -> 목표 가격 역계산
+        self.box_label("원하는 수익 (10% / $50)").grid(row=row, column=0, sticky='ew', padx=(0,10), pady=5, ipady=6)
+        frame_desired = tk.Frame(self.container, bg=self.bg_color)
+        self.entry_desired = self.small_entry(frame_desired)
+        self.entry_desired.bind("<KeyRelease>", lambda event: self.update_solvers())
+        self.small_button(frame_desired, "목표 가격에 적용", self.handle_apply_target).pack(side=tk.LEFT, padx=5)
+        frame_desired.grid(row=row, column=1, sticky='ew', pady=5)
+        
+        row += 1
+        # 버틸 가격 변동폭 -> 최대 레버리지
+        self.box_label("버틸 변동폭 (%)").grid(row=row, column=0, sticky='ew', padx=(0,10), pady=5, ipady=6)
+        frame_move = tk.Frame(self.container, bg=self.bg_color)
+        self.entry_move = self.small_entry(frame_move)
+        self.entry_move.bind("<KeyRelease>", lambda event: self.update_solvers())
+        self.small_button(frame_move, "레버리지에 적용", self.handle_apply_leverage).pack(side=tk.LEFT, padx=5)
+        frame_move.grid(row=row, column=1, sticky='ew', pady=5)
+        
+        row += 1
+        # 실시간 가격 알림 (현재 입력 기준, 피드 가격으로 평가)
+        self.box_label("알림 (10% / -5% / 청산 2%)").grid(row=row, column=0, sticky='ew', padx=(0,10), pady=5, ipady=6)
+        frame_alert = tk.Frame(self.container, bg=self.bg_color)
+        self.entry_alert = self.small_entry(frame_alert)
+        self.entry_alert.bind("<Return>", lambda event: self.handle_add_alert())
+        self.small_button(frame_alert, "알림 추가", self.handle_add_alert).pack(side=tk.LEFT, padx=5)
+        frame_alert.grid(row=row, column=1, sticky='ew', pady=5)
+        
+        row += 1
+        self.result_solve_label = tk.Label(self.container, text="", font=("Malgun Gothic", 10),
+                                           bg=self.bg_color, fg="gray")
+        self.result_solve_label.grid(row=row, column=0, columnspan=2, pady=(0, 0))
         
         # 결과 출력
         row += 1
@@ -119,7 +185,60 @@ class TradingCalculatorView:
         
         row += 1
         self.result_amount_label = tk.Label(self.container, text="-", font=self.large_font, bg=self.bg_color, fg="white")
-        self.result_amount_label.grid(row=row, column=0, columnspan=2, pady=(0, 30))
+        self.result_amount_label.grid(row=row, column=0, columnspan=2, pady=(0, 10))
+        
+        row += 1
+        # 청산 가격 / 마진 비율
+        self.result_margin_label = tk.Label(self.container, text="-", font=("Malgun Gothic", 11),
+                                            bg=self.bg_color, fg="gray")
+        self.result_margin_label.grid(row=row, column=0, columnspan=2, pady=(0, 0))
+        
+        row += 1
+        # 호가창 슬리피지 반영 결과 (호가창을 불러왔을 때만 표시)
+        self.result_slippage_label = tk.Label(self.container, text="", font=("Malgun Gothic", 10),
+                                              bg=self.bg_color, fg="gray")
+        self.result_slippage_label.grid(row=row, column=0, columnspan=2, pady=(4, 20))
+        
+        row += 1
+        # 시나리오 히트맵 열기 / 현재 입력을 포지션 장부에 추가
+        frame_buttons = tk.Frame(self.container, bg=self.bg_color)
+        tk.Button(frame_buttons, text="시나리오 보기 (가격 × 레버리지)", command=self.open_scenario_grid,
+                  bg=self.entry_bg, fg=self.entry_fg, font=("Malgun Gothic", 10), relief="flat",
+                  activebackground=self.bg_color, activeforeground=self.accent_color).pack(side=tk.LEFT, padx=5)
+        tk.Button(frame_buttons, text="포지션 추가", command=self.handle_add_position,
+                  bg=self.entry_bg, fg=self.entry_fg, font=("Malgun Gothic", 10), relief="flat",
+                  activebackground=self.bg_color, activeforeground=self.accent_color).pack(side=tk.LEFT, padx=5)
+        tk.Button(frame_buttons, text="손익 분포", command=self.handle_simulate,
+                  bg=self.entry_bg, fg=self.entry_fg, font=("Malgun Gothic", 10), relief="flat",
+                  activebackground=self.bg_color, activeforeground=self.accent_color).pack(side=tk.LEFT, padx=5)
+        tk.Button(frame_buttons, text="포지션 표", command=self.open_positions_table,
+                  bg=self.entry_bg, fg=self.entry_fg, font=("Malgun Gothic", 10), relief="flat",
+                  activebackground=self.bg_color, activeforeground=self.accent_color).pack(side=tk.LEFT, padx=5)
+        frame_buttons.grid(row=row, column=0, columnspan=2)
+        
+        row += 1
+        # 포지션 장부 합계
+        self.result_portfolio_label = tk.Label(self.container, text="", font=("Malgun Gothic", 10),
+                                               bg=self.bg_color, fg="gray")
+        self.result_portfolio_label.grid(row=row, column=0, columnspan=2, pady=(10, 0))
+        
+        row += 1
+        # 실시간 피드 상태 (피드를 켰을 때만 표시)
+        self.result_feed_label = tk.Label(self.container, text="", font=("Malgun Gothic", 9),
+                                          bg=self.bg_color, fg="#888888")
+        self.result_feed_label.grid(row=row, column=0, columnspan=2, pady=(4, 0))
+        
+        row += 1
+        # 백그라운드 작업 진행률 / 결과
+        self.result_job_label = tk.Label(self.container, text="", font=("Malgun Gothic", 9),
+                                         bg=self.bg_color, fg="#888888")
+        self.result_job_label.grid(row=row, column=0, columnspan=2, pady=(4, 0))
+        
+        row += 1
+        # 발동한 알림 / 대기 중인 알림 수
+        self.result_alert_label = tk.Label(self.container, text="", font=("Malgun Gothic", 9),
+                                           bg=self.bg_color, fg="#888888")
+        self.result_alert_label.grid(row=row, column=0, columnspan=2, pady=(4, 0))
         
         # 초기 포지션 색상 업데이트
         self.update_position_colors()
@@ -141,17 +260,29 @@ class TradingCalculatorView:
         e.insert(0, default)
         return e
     
+    def small_entry(self, parent):
+        e = tk.Entry(parent, width=10, bg=self.entry_bg, fg=self.entry_fg,
+                     font=self.entry_font, justify='center', insertbackground='white',
+                     relief="flat", bd=0, highlightthickness=2, highlightbackground="#888888")
+        e.pack(side=tk.LEFT, ipady=4)
+        return e
+    
+    def small_button(self, parent, text, command):
+        return tk.Button(parent, text=text, command=command,
+                         bg=self.entry_bg, fg=self.entry_fg, font=("Malgun Gothic", 10), relief="flat",
+                         activebackground=self.bg_color, activeforeground=self.accent_color)
+    
     def handle_leverage_scale(self, val):
         self.entry_leverage.delete(0, tk.END)
         self.entry_leverage.insert(0, str(int(float(val))))
-        self.controller.update_leverage(int(float(val)))
+        self.scheduler.schedule("leverage", lambda: self.controller.update_leverage(int(float(val))))
     
     def handle_leverage_entry(self, event):
         try:
             val = int(self.entry_leverage.get())
             if 1 <= val <= 125:
                 self.scale_leverage.set(val)
-                self.controller.update_leverage(val)
+                self.scheduler.schedule("leverage", lambda: self.controller.update_leverage(val))
         except:
             pass
     
@@ -167,11 +298,199 @@ class TradingCalculatorView:
             self.radio_long.config(fg="white")
             self.radio_short.config(fg=self.accent_color)
     
+    def handle_add_position(self):
+        # 대기 중인 입력을 먼저 반영해야 방금 입력한 값이 장부에 들어간다
+        self.scheduler.flush()
+        if self.controller.add_position() is None:
+            self.result_portfolio_label.config(text="포지션을 추가하려면 입력을 확인하세요.", fg="red")
+    
+    def handle_add_alert(self):
+        self.scheduler.flush()
+        if self.controller.add_alert(self.entry_alert.get()) is None:
+            self.result_alert_label.config(text="알림 조건을 확인하세요. (예: 10%, -5%, $50, 청산 2%, @61000)", fg="red")
+        else:
+            self.entry_alert.delete(0, tk.END)
+    
+    def update_alerts(self, fired, pending):
+        if fired:
+            latest = fired[-1]
+            more = f" 외 {len(fired) - 1}개" if len(fired) > 1 else ""
+            self.result_alert_label.config(
+                text=f"알림: {latest.describe()} @ {latest.fired_price:,.2f}{more}  ·  대기 {pending}개", fg="orange")
+            self.root.bell()
+        else:
+            self.result_alert_label.config(text=f"대기 중인 알림 {pending}개", fg="#888888")
+    
+    def update_solvers(self):
+        # 역계산 결과 (입력이 바뀔 때마다 다시 계산 - 모두 닫힌 식이라 가볍다)
+        m = self.controller.model
+        parts = []
+        desired = self.entry_desired.get().strip()
+        if desired:
+            target = self.controller.solve_target(desired)
+            parts.append("목표 가격: -" if target is None else f"목표 가격: {target:,.2f}")
+        break_even = m.break_even_price
+        if break_even == break_even:
+            parts.append(f"손익분기: {break_even:,.2f}")
+        move = self.entry_move.get().strip()
+        if move:
+            leverage = self.controller.solve_max_leverage(move)
+            if leverage is None:
+                parts.append("최대 레버리지: -")
+            else:
+                parts.append(f"최대 레버리지: {leverage}x" if leverage else "1배로도 청산")
+        self.result_solve_label.config(text="  ·  ".join(parts), fg="gray")
+    
+    def handle_apply_target(self):
+        self.scheduler.flush()
+        target = self.controller.solve_target(self.entry_desired.get())
+        if target is None:
+            self.result_solve_label.config(text="원하는 수익을 확인하세요.", fg="red")
+            return
+        self.set_target_price_text(target)
+        self.controller.apply_target(target)
+    
+    def handle_apply_leverage(self):
+        self.scheduler.flush()
+        leverage = self.controller.solve_max_leverage(self.entry_move.get())
+        if not leverage:
+            self.result_solve_label.config(text="버틸 변동폭을 확인하세요.", fg="red")
+            return
+        self.scale_leverage.set(leverage)
+        self.entry_leverage.delete(0, tk.END)
+        self.entry_leverage.insert(0, str(leverage))
+        self.controller.update_leverage(leverage)
+    
+    def handle_simulate(self):
+        # 현재 입력으로 몬테카를로 손익 분포를 계산 (다시 누르면 이전 계산은 취소)
+        self.scheduler.flush()
+        m = self.controller.model
+        if m.calculation_error or m.entry_price <= 0:
+            self.result_job_label.config(text="시뮬레이션하려면 입력을 확인하세요.", fg="red")
+            return
+        params = dict(entry_price=m.entry_price, leverage=m.leverage, position=m.position,
+                      capital_usd=m.capital_usd, exchange_rate=m.exchange_rate, fee_rate=m.fee_rate,
+                      margin_engine=m.margin_engine)
+        self.result_job_label.config(text="손익 분포 계산 중...", fg="#888888")
+        self.controller.submit_job("montecarlo", run_simulation, params, context=True,
+                                   on_progress=self.show_job_progress,
+                                   on_done=self.show_simulation,
+                                   on_error=lambda e: self.result_job_label.config(text=f"시뮬레이션 실패: {e}", fg="red"))
+    
+    def show_job_progress(self, fraction, message=None):
+        self.result_job_label.config(text=f"{message or '계산 중'}... {fraction * 100:.0f}%", fg="#888888")
+    
+    def show_simulation(self, summary):
+        p = summary["percentiles"]
+        self.result_job_label.config(
+            text=f"청산 확률 {summary['liquidation_probability'] * 100:.1f}%  ·  평균 {summary['mean_percent']:.2f}%"
+                 f"  ·  5~95% 분위 {p[5]:.1f}% ~ {p[95]:.1f}%",
+            fg="#888888")
+    
+    def open_scenario_grid(self):
+        if self.scenario_window is not None:
+            self.scenario_window.lift()
+            return
+        # numpy 가 필요하므로 처음 열 때 불러온다
+        from scenario_grid import ScenarioGridView
+        
+        self.scenario_window = tk.Toplevel(self.root)
+        self.scenario_window.title("시나리오 히트맵 (목표 가격 ±20% × 레버리지 1~125)")
+        self.scenario_window.configure(bg=self.bg_color)
+        self.scenario_window.protocol("WM_DELETE_WINDOW", self.close_scenario_grid)
+        self.scenario_grid = ScenarioGridView(self.scenario_window, self.controller.model, bg=self.bg_color,
+                                              submit=self.controller.submit_job)
+        self.scenario_grid.pack(padx=10, pady=10)
+        self.scenario_grid.refresh()
+    
+    def close_scenario_grid(self):
+        self.controller.cancel_jobs("scenario_grid")
+        self.scenario_window.destroy()
+        self.scenario_window = None
+        self.scenario_grid = None
+    
+    def open_positions_table(self):
+        if self.positions_window is not None:
+            self.positions_window.lift()
+            return
+        from positions_table import POSITION_COLUMNS, VirtualTable, position_cells
+        
+        portfolio = self.controller.model.portfolio
+        self.positions_window = tk.Toplevel(self.root)
+        self.positions_window.title("포지션 장부")
+        self.positions_window.configure(bg=self.bg_color)
+        self.positions_window.protocol("WM_DELETE_WINDOW", self.close_positions_table)
+        self.positions_table = VirtualTable(self.positions_window, POSITION_COLUMNS, portfolio.__len__,
+                                            lambda row: position_cells(portfolio, row), bg=self.bg_color)
+        self.positions_table.pack(fill="both", expand=True, padx=10, pady=10)
+        self.positions_table.refresh()
+    
+    def close_positions_table(self):
+        self.positions_window.destroy()
+        self.positions_window = None
+        self.positions_table = None
+    
     def update_results(self, leveraged_percent, actual_profit_usd, actual_profit_krw, has_error):
+        if self.scenario_grid is not None:
+            self.scenario_grid.refresh()
+
+        self.update_solvers()
+        
         if has_error:
             self.result_percent_label.config(text="입력을 확인하세요.", fg="red")
             self.result_amount_label.config(text="", fg="red")
         else:
-            self.result_percent_label.config(text=f"{leveraged_percent:.2f}%", fg=self.accent_color)
+            self.result_percent_label.config(text=format_percent(leveraged_percent), fg=self.accent_color)
             self.result_amount_label.config(
-                text=f"${actual_profit_usd:,.2f} (₩{actual_profit_krw:,.0f})", fg="white")
\ No newline at end of file
+                text=format_money(actual_profit_usd, actual_profit_krw), fg="white")
+    
+    def update_margin(self, liquidation_price, margin_ratio):
+        # nan = 계산 불가 (입력 오류 또는 구간 최대 레버리지 초과)
+        if liquidation_price != liquidation_price:
+            self.result_margin_label.config(text="청산 가격: -", fg="gray")
+        elif margin_ratio != margin_ratio:
+            self.result_margin_label.config(text=f"청산 가격: {liquidation_price:,.2f}", fg="gray")
+        else:
+            color = "red" if margin_ratio >= 1 else "gray"
+            self.result_margin_label.config(
+                text=f"청산 가격: {liquidation_price:,.2f}  ·  마진 비율: {margin_ratio * 100:.2f}%", fg=color)
+    
+    def update_slippage(self, result):
+        # result: (수익률, USD, KRW, 진입 체결가, 청산 체결가) / nan = 입력 오류 또는 호가 잔량 초과
+        if result is None:
+            self.result_slippage_label.config(text="")
+        elif not isinstance(result, tuple):
+            self.result_slippage_label.config(text="슬리피지 반영: - (호가 잔량 초과 또는 입력 오류)", fg="red")
+        else:
+            leveraged_percent, profit_usd, profit_krw, entry_fill, exit_fill = result
+            self.result_slippage_label.config(
+                text=f"슬리피지 반영: {format_percent(leveraged_percent)}  ·  {format_money(profit_usd, profit_krw)}"
+                     f"\n체결 {entry_fill:,.2f} → {exit_fill:,.2f}",
+                fg="gray")
+    
+    def update_portfolio(self, totals):
+        if self.positions_table is not None:
+            self.positions_table.refresh()  # 보이는 행 중 바뀐 칸만 다시 그린다
+        self.result_portfolio_label.config(
+            text=f"장부 {totals['positions']}개  ·  손익 {format_money(totals['pnl_usd'], totals['pnl_krw'])}"
+                 f"  ·  노출 ${totals['exposure']:,.0f}  ·  증거금 ${totals['margin']:,.0f}",
+            fg="gray")
+    
+    def is_editing_target_price(self):
+        # 사용자가 목표 가격 칸에 입력 중인지 (실시간 가격 피드가 모델과 칸을 모두 건드리지 않아야 함)
+        return self.root.focus_get() is self.entry_target_price
+    
+    def set_target_price_text(self, price):
+        # 실시간 가격으로 목표 가격 칸을 채운다 (사용자가 입력 중이면 건드리지 않음)
+        if self.is_editing_target_price():
+            return
+        self.entry_target_price.delete(0, tk.END)
+        self.entry_target_price.insert(0, f"{price:.8g}")
+    
+    def update_feed_status(self, stats):
+        state = "연결됨" if stats["connected"] else "연결 끊김"
+        lag = stats["total_lag"]
+        self.result_feed_label.config(
+            text=f"피드 {state}  ·  틱 {stats['received']:,} (병합 {stats['dropped']:,})"
+                 f"  ·  지연 평균 {lag['mean_ms']:.1f}ms / 최대 {lag['max_ms']:.1f}ms",
+            fg="#888888" if stats["connected"] else "red")
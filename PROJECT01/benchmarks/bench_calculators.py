@@ -0,0 +1,348 @@
+# bench_calculators.py
+# 세 가지(+mk1.1) 계산기 구현을 화면 없이 비교하는 벤치마크
+#
+# - codeman    : project01-tradingcal - codeman.py 의 모듈 함수 calculate_profit (수수료 1회)
+# - claude     : project01-tradingcal - claude.py 의 TradingCalculator.calculate_profit (수수료 2회)
+# - mk1.1      : Error/project01-tradingcal - codeman - mk1.1.py 의 TradingCalculatorModel.calculate (수수료 2회)
+# - mvc        : MVCpattern(Claude)/model.py 의 TradingCalculatorModel (수수료 1회)
+# - mvc-batch  : 같은 모델의 calculate_batch (numpy 필요)
+#
+# Tk 위젯은 값만 저장하는 가짜 객체로 대체한다. GUI 구현은 결과를 라벨 문자열로만 내보내므로
+# 수치 비교는 화면 표시 자릿수(수익률 소수 2자리, 달러 2자리, 원 0자리) 기준으로 한다.
+#
+# 사용 예:
+#   python bench_calculators.py                 # 측정 후 baselines/baseline.json 과 비교
+#   python bench_calculators.py --save          # 현재 측정값을 기준값으로 저장
+#   python bench_calculators.py --rows 200000 --threshold 0.3
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+MVC_DIR = os.path.join(PROJECT_DIR, "MVCpattern(Claude)")
+CODEMAN_PATH = os.path.join(PROJECT_DIR, "project01-tradingcal - codeman.py")
+CLAUDE_PATH = os.path.join(PROJECT_DIR, "project01-tradingcal - claude.py")
+MK11_PATH = os.path.join(os.path.dirname(PROJECT_DIR), "Error", "project01-tradingcal - codeman - mk1.1.py")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "baseline.json")
+
+FEE_RATE = 0.0005
+
+# 각 구현이 tradingcore 패키지를 import 할 수 있도록
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+
+# --- 가짜 Tk 위젯 ---
+
+class FakeWidget:
+    # 위젯 생성/배치/설정 호출을 모두 받아들이고, 텍스트 값만 기억한다
+    def __init__(self, *args, **kwargs):
+        self.text = kwargs.get("text", "")
+        self.value = kwargs.get("value", "")
+
+    def __getattr__(self, name):
+        # pack/grid/bind/title/configure/mainloop 등은 아무 일도 하지 않음
+        return lambda *args, **kwargs: None
+
+    def insert(self, index, text):
+        self.value = str(text)
+
+    def delete(self, first, last=None):
+        self.value = ""
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+    def config(self, **kwargs):
+        if "text" in kwargs:
+            self.text = kwargs["text"]
+
+    configure = config
+
+
+def fake_tkinter():
+    tk = types.ModuleType("tkinter")
+    for name in ("Tk", "Frame", "Entry", "Label", "Scale", "Radiobutton", "Button", "Canvas", "Toplevel"):
+        setattr(tk, name, FakeWidget)
+    tk.StringVar = FakeWidget
+    tk.END = "end"
+    tk.HORIZONTAL = "horizontal"
+    tk.LEFT = "left"
+    return tk
+
+
+def load_module(name, path, tkinter_module=None):
+    # 파일 이름에 공백이 있어 importlib 로 직접 불러온다
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get("tkinter")
+    if tkinter_module is not None:
+        sys.modules["tkinter"] = tkinter_module
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if tkinter_module is not None:
+            if saved is None:
+                sys.modules.pop("tkinter", None)
+            else:
+                sys.modules["tkinter"] = saved
+    return module
+
+
+def parse_amount_label(text):
+    # "$1,234.56 (₩1,790,112)" -> (1234.56, 1790112.0)
+    usd, krw = text.split(" (₩")
+    return float(usd.replace("$", "").replace(",", "")), float(krw.rstrip(")").replace(",", ""))
+
+
+def display(pct, usd, krw):
+    # 화면 표시 자릿수로 반올림
+    return round(pct, 2), round(usd, 2), round(krw, 0)
+
+
+# --- 각 구현을 같은 입력 형식 (entry, target, leverage, capital, rate, position) 으로 감싸기 ---
+
+def make_codeman():
+    module = load_module("bench_codeman", CODEMAN_PATH, fake_tkinter())
+    module.build_ui()  # import 만으로는 위젯을 만들지 않는다
+
+    def calc(entry, target, leverage, capital, rate, position):
+        module.entry_entry_price.value = str(entry)
+        module.entry_target_price.value = str(target)
+        module.entry_leverage.value = str(leverage)
+        module.entry_capital.value = str(capital)
+        module.entry_exchange_rate.value = str(rate)
+        module.position_var.value = position
+        module.calculate_profit()
+        usd, krw = parse_amount_label(module.result_amount_label.text)
+        return float(module.result_percent_label.text.rstrip("%")), usd, krw
+    return calc, "single"
+
+
+def make_claude():
+    module = load_module("bench_claude", CLAUDE_PATH)
+    app = module.TradingCalculator.__new__(module.TradingCalculator)
+    app.settings = {
+        "theme": "dark", "exchange_rate": 1450, "fee_rate": FEE_RATE,
+        "last_values": {"entry_price": "", "target_price": "", "leverage": 10, "position": "Long", "capital": 1000},
+    }
+    app.colors = {"positive": "", "negative": "", "neutral": "", "label_fg": ""}
+    for name in ("entry_price", "target_price", "leverage_entry", "capital", "exchange_rate",
+                 "position_var", "result_percent_label", "result_amount_label", "result_total_label"):
+        setattr(app, name, FakeWidget())
+    app.settings_writer = FakeWidget()
+    app.journal = None  # 시나리오 일지는 측정에서 제외
+
+    def calc(entry, target, leverage, capital, rate, position):
+        app.entry_price.value = str(entry)
+        app.target_price.value = str(target)
+        app.leverage_entry.value = str(leverage)
+        app.capital.value = str(capital)
+        app.exchange_rate.value = str(rate)
+        app.position_var.value = position
+        app.calculate_profit()
+        usd, krw = parse_amount_label(app.result_amount_label.text)
+        return float(app.result_percent_label.text.rstrip("%")), usd, krw
+    return calc, "round_trip"
+
+
+def make_mk11():
+    module = load_module("bench_mk11", MK11_PATH)
+    model = module.TradingCalculatorModel(fee_rate=FEE_RATE)
+    return model.calculate, "round_trip"
+
+
+def _mvc_model(fee_rate=FEE_RATE):
+    if MVC_DIR not in sys.path:
+        sys.path.insert(0, MVC_DIR)
+    from model import TradingCalculatorModel
+    model = TradingCalculatorModel()
+    model.fee_rate = fee_rate
+    return model
+
+
+def make_mvc(fee_rate=FEE_RATE):
+    model = _mvc_model(fee_rate)
+
+    def calc(entry, target, leverage, capital, rate, position):
+        model.update_many(entry_price=entry, target_price=target, leverage=leverage,
+                          position=position, capital=capital, exchange_rate=rate)
+        return model.leveraged_percent, model.actual_profit_usd, model.actual_profit_krw
+    return calc, "single"
+
+
+CORES = {
+    "codeman": make_codeman,
+    "claude": make_claude,
+    "mk1.1": make_mk11,
+    "mvc": lambda: make_mvc(),
+}
+
+
+def make_rows(n, seed=1):
+    # 표시 자릿수 경계에서 반올림 차이가 나지 않도록 '깔끔한' 값 위주로 생성
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        entry = rng.randint(1, 100000)
+        target = entry + rng.randint(-entry // 2, entry // 2)
+        rows.append((float(entry), float(target), rng.randint(1, 125),
+                     float(rng.randint(10, 100000)), float(rng.choice([1300, 1450, 1500])),
+                     rng.choice(["Long", "Short"])))
+    return rows
+
+
+def measure_latency(calc, row, repeat=5, number=2000):
+    best = min(timeit.repeat(lambda: calc(*row), repeat=repeat, number=number))
+    return best / number * 1e6  # 마이크로초
+
+
+def measure_throughput(calc, rows):
+    timer = timeit.default_timer
+    start = timer()
+    for row in rows:
+        calc(*row)
+    return len(rows) / (timer() - start)  # 행/초
+
+
+def measure_batch_throughput(rows, repeat=3):
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    model = _mvc_model()
+    entry, target, leverage, capital, rate, position = (np.array(col) for col in zip(*rows))
+    is_long = position == "Long"
+    best = min(timeit.repeat(lambda: model.calculate_batch(entry, target, leverage, is_long, capital, rate),
+                             repeat=repeat, number=1))
+    return len(rows) / best
+
+
+def check_agreement(cores, rows):
+    # 같은 수수료 모델끼리 표시 자릿수 기준으로 결과가 같은지,
+    # 그리고 수수료 2회 모델이 '수수료율 x2 인 1회 모델' 과 같은지 확인
+    reference = {
+        "single": make_mvc()[0],
+        "round_trip": make_mvc(FEE_RATE * 2)[0],
+    }
+
+    report = {}
+    for name, (calc, fee_model) in cores.items():
+        mismatches = 0
+        example = None
+        for row in rows:
+            got = display(*calc(*row))
+            want = display(*reference[fee_model](*row))
+            # 반올림 경계(예: x.xx5) 는 구현마다 연산 순서가 달라 한 자리 차이가 날 수 있다
+            if any(abs(a - b) > tol for a, b, tol in zip(got, want, (0.011, 0.011, 1.01))):
+                mismatches += 1
+                if example is None:
+                    example = {"row": row, "got": got, "expected": want}
+        report[name] = {"fee_model": fee_model, "rows": len(rows), "mismatches": mismatches, "example": example}
+    return report
+
+
+def run(rows_count, agreement_rows):
+    cores = {name: factory() for name, factory in CORES.items()}
+    rows = make_rows(rows_count)
+    sample = rows[0]
+
+    results = {}
+    for name, (calc, fee_model) in cores.items():
+        results[name] = {
+            "fee_model": fee_model,
+            "latency_us": measure_latency(calc, sample),
+            "throughput_rows_per_s": measure_throughput(calc, rows),
+        }
+    batch = measure_batch_throughput(rows)
+    if batch is not None:
+        results["mvc-batch"] = {"fee_model": "single", "latency_us": None, "throughput_rows_per_s": batch}
+
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor()},
+        "rows": rows_count,
+        "results": results,
+        "agreement": check_agreement(cores, make_rows(agreement_rows, seed=2)),
+    }
+
+
+def compare(current, baseline, threshold):
+    # 처리량이 threshold 비율 이상 떨어지거나 지연이 그만큼 늘면 회귀로 판단
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if before["throughput_rows_per_s"] and now["throughput_rows_per_s"] < before["throughput_rows_per_s"] * (1 - threshold):
+            regressions.append(f"{name}: 처리량 {before['throughput_rows_per_s']:,.0f} -> {now['throughput_rows_per_s']:,.0f} 행/초")
+        if before.get("latency_us") and now.get("latency_us") and now["latency_us"] > before["latency_us"] * (1 + threshold):
+            regressions.append(f"{name}: 지연 {before['latency_us']:.2f} -> {now['latency_us']:.2f} µs")
+    return regressions
+
+
+def print_report(report):
+    print(f"{'구현':<10} {'수수료':<11} {'지연(µs)':>10} {'처리량(행/초)':>16}")
+    for name, r in report["results"].items():
+        latency = "-" if r["latency_us"] is None else f"{r['latency_us']:.2f}"
+        print(f"{name:<10} {r['fee_model']:<11} {latency:>10} {r['throughput_rows_per_s']:>16,.0f}")
+    print()
+    for name, a in report["agreement"].items():
+        status = "일치" if a["mismatches"] == 0 else f"불일치 {a['mismatches']}/{a['rows']}"
+        print(f"{name:<10} {a['fee_model']:<11} {status}")
+        if a["example"]:
+            print(f"    예: {a['example']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="계산기 구현 벤치마크")
+    parser.add_argument("--rows", type=int, default=50000, help="처리량 측정에 사용할 행 수")
+    parser.add_argument("--agreement-rows", type=int, default=2000, help="결과 비교에 사용할 행 수")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="측정값을 기준값으로 저장")
+    parser.add_argument("--threshold", type=float, default=0.25, help="회귀로 판단할 성능 저하 비율")
+    parser.add_argument("--json", help="측정 결과를 JSON 으로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.agreement_rows)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    failed = any(a["mismatches"] for a in report["agreement"].values())
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n기준값 저장: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        print()
+        if regressions:
+            print("성능 회귀:")
+            for line in regressions:
+                print("  " + line)
+            failed = True
+        else:
+            print("기준값 대비 회귀 없음")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# bench_startup.py
+# tradingcore 패키지의 콜드 스타트 시간 측정
+#
+# 새 인터프리터에서 "import tradingcore; tradingcore.calculate(...)" 까지 걸리는 시간을
+# 빈 인터프리터 실행 시간과 비교한다. 스크립트/CLI 에서 계산만 할 때 tkinter, numpy 를
+# 불러오지 않아야 하므로 두 모듈이 sys.modules 에 들어오면 실패로 처리한다.
+#
+# 사용 예:
+#   python bench_startup.py                # 측정 후 baselines/startup.json 의 예산과 비교
+#   python bench_startup.py --save         # 현재 측정값 x 1.5 + 2 ms 를 예산으로 저장
+#
+# 예산 여유분은 측정값에 비례(--margin-pct)하고, 실행마다 1~2 ms 흔들리는 만큼만 고정값(--margin-ms)을 더한다.
+# 고정 여유분을 크게 잡으면 import 시간이 몇 배로 늘어도 예산 안에 들어가 회귀를 놓친다.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "startup.json")
+
+# 계산 한 번 + 무거운 모듈이 불러와졌는지 확인
+CORE_SNIPPET = (
+    "import sys\n"
+    "import tradingcore\n"
+    "tradingcore.calculate(100.0, 110.0, 10, 1000.0, 1450.0, 'Long')\n"
+    "heavy = [m for m in ('tkinter', 'numpy') if m in sys.modules]\n"
+    "print(','.join(heavy))\n"
+)
+EMPTY_SNIPPET = "pass\n"
+
+
+def run_once(snippet):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", snippet], cwd=PROJECT_DIR,
+                         capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000, out.stdout.strip()
+
+
+def measure(repeat):
+    # 첫 실행은 디스크 캐시/.pyc 생성 때문에 버린다
+    run_once(CORE_SNIPPET)
+    run_once(EMPTY_SNIPPET)
+    core, empty = [], []
+    heavy = ""
+    for _ in range(repeat):
+        ms, heavy = run_once(CORE_SNIPPET)
+        core.append(ms)
+        empty.append(run_once(EMPTY_SNIPPET)[0])
+    core_ms = statistics.median(core)
+    empty_ms = statistics.median(empty)
+    return {
+        "repeat": repeat,
+        "interpreter_ms": empty_ms,
+        "core_ms": core_ms,
+        "overhead_ms": core_ms - empty_ms,
+        "heavy_modules": [m for m in heavy.split(",") if m],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="tradingcore 콜드 스타트 벤치마크")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="측정값으로 예산을 저장")
+    parser.add_argument("--margin-pct", type=float, default=50.0, help="저장 시 측정값에 더할 비율 여유분 (%%)")
+    parser.add_argument("--margin-ms", type=float, default=2.0, help="저장 시 예산에 더할 고정 여유분 (측정 흔들림, ms)")
+    args = parser.parse_args(argv)
+
+    report = measure(args.repeat)
+    print(f"빈 인터프리터     {report['interpreter_ms']:8.2f} ms")
+    print(f"tradingcore 계산  {report['core_ms']:8.2f} ms")
+    print(f"추가 시간         {report['overhead_ms']:8.2f} ms")
+
+    failed = False
+    if report["heavy_modules"]:
+        print("불필요하게 불러온 모듈: " + ", ".join(report["heavy_modules"]))
+        failed = True
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        overhead = report["overhead_ms"]
+        budget = {
+            "overhead_ms": round(overhead, 1),
+            "overhead_budget_ms": round(overhead * (1 + args.margin_pct / 100) + args.margin_ms, 1),
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+        print(f"\n예산 저장: {args.baseline} ({budget['overhead_budget_ms']} ms)")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            budget = json.load(f)["overhead_budget_ms"]
+        if report["overhead_ms"] > budget:
+            print(f"\n예산 초과: {report['overhead_ms']:.2f} ms > {budget} ms")
+            failed = True
+        else:
+            print(f"\n예산 이내 ({budget} ms)")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
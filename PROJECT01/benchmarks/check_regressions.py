@@ -0,0 +1,320 @@
+# check_regressions.py
+# 한 번 고친 버그가 다시 생기지 않았는지 확인하는 점검 모음 (측정이 아니라 맞고 틀림만 본다)
+# 점검마다 실패 이유를 모아 출력하고, 하나라도 실패하면 종료 코드 1
+#
+# 사용 예:
+#   python check_regressions.py
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+
+def check_journal_rejected_row(tmp):
+    # 값 하나가 거부된 행은 통째로 빠지고, 뒤의 행이 밀려 기록되지 않아야 한다
+    from tradingcore.journal import JournalReader, JournalWriter
+
+    path = os.path.join(tmp, "journal")
+    with JournalWriter(path) as writer:
+        writer.append(ts=1, side=1, leverage=10)
+        try:
+            writer.append(ts=2, side=1, leverage=10.5)  # 'i' 열은 float 를 거부
+        except TypeError:
+            pass
+        else:
+            return "leverage=10.5 가 거부되지 않았습니다"
+        try:
+            writer.append(ts=2, side=300, leverage=10)  # 'b' 열 범위 밖
+        except OverflowError:
+            pass
+        else:
+            return "side=300 이 거부되지 않았습니다"
+        writer.append(ts=3, side=-1, leverage=20)
+    reader = JournalReader(path)
+    try:
+        ts, side, leverage = (reader.columns[name].tolist() for name in ("ts", "side", "leverage"))
+    finally:
+        reader.close()
+    if (ts, side, leverage) != ([1, 3], [1, -1], [10, 20]):
+        return f"기록된 행이 어긋났습니다: ts={ts} side={side} leverage={leverage}"
+    return None
+
+
+def check_headless_bad_fee_cell(tmp):
+    # 수수료표를 쓸 때 volume_30d 칸만 잘못된 행은 오류 행이 되고 나머지는 계산돼야 한다
+    from tradingcore.fees import load_fee_schedule
+    from tradingcore.headless import calculate_chunk
+
+    schedule = load_fee_schedule()
+    good = {"entry_price": 100, "target_price": 110, "leverage": 10, "symbol": "BTCUSDT", "volume_30d": 0}
+    chunk = [good] * 10 + [dict(good, volume_30d="x")] + [good] * 10
+    vectorized_options = [False]
+    try:
+        import numpy  # noqa: F401
+        vectorized_options.append(True)
+    except ImportError:
+        pass
+    for vectorized in vectorized_options:
+        results = calculate_chunk(chunk, 1000.0, 1450.0, vectorized, fee_schedule=schedule)
+        errors = [i for i, result in enumerate(results) if result is None]
+        if len(results) != len(chunk) or errors != [10]:
+            return f"vectorized={vectorized}: 결과 {len(results)}행, 오류 행 {errors}"
+    return None
+
+
+def check_headless_bad_jsonl_line(tmp):
+    # 잘못된 JSONL 줄이 있어도 실행이 멈추지 않고 그 줄만 오류 행으로 나와야 한다
+    import io
+    import json
+
+    from tradingcore.headless import run
+
+    good = json.dumps({"entry_price": 100, "target_price": 110, "leverage": 10})
+    source = io.StringIO("\n".join([good, "{not json", "[1, 2]", "42", good]) + "\n")
+    out = io.StringIO()
+    run(source, out, "jsonl", "jsonl", chunk_size=2)
+    errors = [json.loads(line)["error"] for line in out.getvalue().splitlines()]
+    if errors != [False, True, True, True, False]:
+        return f"오류 표시가 다릅니다: {errors}"
+    return None
+
+
+def check_headless_strict_fields(tmp):
+    # 방향 오타나 정수가 아닌/범위 밖 레버리지는 다른 값으로 바꿔 계산하지 않고 오류 행이 돼야 한다
+    from tradingcore.headless import calculate_chunk
+
+    good = {"entry_price": 100, "target_price": 110, "leverage": 10, "position": "long"}
+    chunk = [good, dict(good, position="Lnog"), dict(good, leverage=10.9), dict(good, leverage=0),
+             dict(good, leverage=126), dict(good, leverage="10.0", position="SHORT"), dict(good, position="")]
+    results = calculate_chunk(chunk, 1000.0, 1450.0, False)
+    errors = [i for i, result in enumerate(results) if result is None]
+    if errors != [1, 2, 3, 4]:
+        return f"오류 행이 다릅니다: {errors}"
+    if not results[5][0] < 0 < results[6][0]:
+        return f"숏/기본 롱 계산이 다릅니다: {results[5]}, {results[6]}"
+    return None
+
+
+def check_service_malformed_requests(tmp):
+    # 잘못된 요청은 연결이 그냥 끊기지 않고 4xx 응답을 받아야 한다
+    import asyncio
+
+    from tradingcore.service import CalculatorService
+
+    requests = [
+        (b"POST /calculate HTTP/1.1\r\nContent-Length: abc\r\n\r\n", b"400"),
+        (b"POST /calculate HTTP/1.1\r\nContent-Length: -5\r\n\r\n", b"400"),
+        (b"POST /calculate HTTP/1.1\r\nContent-Length: 2\r\n\r\n\xc3\x28", b"400"),
+        (b"POST /batch HTTP/1.1\r\nContent-Type: application/x-ndjson\r\nContent-Length: x\r\n\r\n", b"400"),
+        (b"POST /batch HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n-5\r\n", b"400"),
+    ]
+
+    async def run():
+        service = CalculatorService(vectorized=False)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        problems = []
+        try:
+            for request, status in requests:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                await writer.drain()
+                reply = await asyncio.wait_for(reader.read(), 5)
+                writer.close()
+                if reply.split(b" ")[1:2] != [status]:
+                    problems.append(f"{request[:40]!r} -> {reply[:40]!r}")
+        finally:
+            server.close()
+            await server.wait_closed()
+        return "; ".join(problems) or None
+
+    return asyncio.run(run())
+
+
+def check_service_batch_error_rows(tmp):
+    # /batch 는 객체가 아닌 항목과 방향 오타를 오류 행으로 돌려주고 결과 순서를 입력과 맞춰야 한다
+    import asyncio
+    import json
+
+    from tradingcore.service import CalculatorService
+
+    good = {"entry_price": 100, "target_price": 110, "leverage": 10}
+    rows = [1, good, dict(good, position="Lnog"), "x", good]
+    expected = [True, False, True, True, False]
+    bodies = [
+        ("application/json", json.dumps({"rows": rows}).encode()),
+        ("application/x-ndjson", "\n".join(json.dumps(row) for row in rows).encode()),
+    ]
+
+    async def run():
+        service = CalculatorService(vectorized=False)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        problems = []
+        try:
+            for content_type, body in bodies:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(f"POST /batch HTTP/1.1\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                             f"Connection: close\r\n\r\n".encode() + body)
+                await writer.drain()
+                reply = await asyncio.wait_for(reader.read(), 5)
+                writer.close()
+                head, _, payload = reply.partition(b"\r\n\r\n")
+                if head.split(b" ")[1:2] != [b"200"]:
+                    problems.append(f"{content_type}: {head[:40]!r}")
+                    continue
+                if b"chunked" in head.lower():
+                    # chunked 본문에서 크기 줄을 걷어 내고 NDJSON 결과 줄만 남긴다
+                    lines = payload.split(b"\r\n")[1::2]
+                    results = [json.loads(line) for part in lines for line in part.splitlines() if line.strip()]
+                else:
+                    results = json.loads(payload)["results"]
+                errors = [result["error"] for result in results]
+                if errors != expected:
+                    problems.append(f"{content_type}: 오류 표시 {errors}")
+        finally:
+            server.close()
+            await server.wait_closed()
+        return "; ".join(problems) or None
+
+    return asyncio.run(run())
+
+
+def check_feed_long_line_reconnects(tmp):
+    # 스트림 한도보다 긴 줄을 받으면 피드 작업이 끝나지 않고 끊은 뒤 다시 접속해 틱을 계속 받아야 한다
+    import asyncio
+    import json
+
+    from tradingcore.feed import FeedClient
+
+    async def run():
+        accepted = 0
+
+        async def handle(reader, writer):
+            nonlocal accepted
+            accepted += 1
+            if accepted == 1:
+                writer.write(b"x" * (1 << 17) + b"\n")  # 기본 한도 64 KiB 초과
+            writer.write((json.dumps({"symbol": "BTCUSDT", "price": 100.0, "ts": 0}) + "\n").encode())
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        client = FeedClient("127.0.0.1", server.sockets[0].getsockname()[1], reconnect_delay=0.01)
+        task = asyncio.create_task(client.run())
+        try:
+            for _ in range(200):
+                if client.ticks.received:
+                    break
+                await asyncio.sleep(0.01)
+            if task.done():
+                return f"피드 작업이 끝났습니다: {task.exception()!r}"
+            if not client.ticks.received or client.overruns != 1:
+                return f"받은 틱 {client.ticks.received}, 긴 줄 재접속 {client.overruns}"
+            return None
+        finally:
+            task.cancel()
+            server.close()
+
+    return asyncio.run(run())
+
+
+def _mvc_model():
+    mvc_dir = os.path.join(os.path.dirname(BENCH_DIR), "MVCpattern(Claude)")
+    if mvc_dir not in sys.path:
+        sys.path.insert(0, mvc_dir)
+    from model import TradingCalculatorModel
+    return TradingCalculatorModel()
+
+
+def check_portfolio_mark_price(tmp):
+    # 목표 가격을 입력하기 전에 장부에 넣어도 -100% x 레버리지 손익이 잡히지 않아야 한다
+    from tradingcore.portfolio import Portfolio
+
+    try:
+        Portfolio().add(100.0, 10, mark_price=0.0)
+    except ValueError:
+        pass
+    else:
+        return "mark_price=0 이 거부되지 않았습니다"
+    model = _mvc_model()
+    model.update_many(entry_price=100.0, leverage=10)
+    position_id = model.add_to_portfolio("BTCUSDT")
+    position = model.portfolio.get(position_id)
+    if position["mark_price"] != 100.0 or not -1.0 < position["leveraged_percent"] <= 0:
+        return f"목표 가격 없이 추가한 포지션: {position}"
+    return None
+
+
+def check_model_fee_rate_propagates(tmp):
+    # 모델의 수수료를 바꾸면 장부 손익과 알림 조건 가격도 새 수수료를 따라야 한다
+    from tradingcore.alerts import price_trigger
+    from tradingcore.formula import calculate
+
+    model = _mvc_model()
+    model.update_many(entry_price=100.0, target_price=110.0, leverage=10)
+    position_id = model.add_to_portfolio("BTCUSDT")
+    alert_id = model.add_alert("BTCUSDT", "percent", 50)
+    model.fee_rate = 0.002
+    pnl = model.portfolio.get(position_id)["pnl_usd"]
+    expected_pnl = calculate(100.0, 110.0, 10, 1000.0, 1.0, "Long", 0.002)[1]
+    if abs(model.portfolio_totals()["pnl_usd"] - expected_pnl) > 1e-9 or abs(pnl - expected_pnl) > 1e-9:
+        return f"장부 손익 {pnl} (기대 {expected_pnl})"
+    trigger = model.alerts.alerts[alert_id].trigger
+    expected_trigger = price_trigger("percent", 50, 100.0, 10, "Long", 1000.0, 0.002)[0]
+    if abs(trigger - expected_trigger) > 1e-9 or model.alerts.nearest("BTCUSDT")[0] != trigger:
+        return f"알림 조건 가격 {trigger} (기대 {expected_trigger})"
+    return None
+
+
+def check_montecarlo_liquidation_matches_backtest(tmp):
+    # 같은 거래면 몬테카를로와 백테스트의 청산 가격이 같아야 한다 (둘 다 margin 엔진 구간표)
+    try:
+        from tradingcore.montecarlo import simulate
+    except ImportError:
+        return None  # numpy 없음
+    from tradingcore.backtest import Order
+
+    # (레버리지, 방향, 투자금, 목표 가격) - 두 번째는 명목 100만으로 세 번째 구간
+    for leverage, position, capital, target in ((20, "Long", 1000.0, 110.0), (20, "Short", 50000.0, 90.0)):
+        result = simulate(100.0, leverage, position, capital, n_paths=1000, n_steps=4, seed=1, workers=1)
+        expected = Order(100.0, target, leverage=leverage, position=position, capital_usd=capital).liquidation_price
+        if result.liquidation_price != expected:
+            return f"{position} x{leverage}: 몬테카를로 {result.liquidation_price} / 백테스트 {expected}"
+    return None
+
+
+CHECKS = [
+    check_journal_rejected_row,
+    check_headless_bad_fee_cell,
+    check_headless_bad_jsonl_line,
+    check_headless_strict_fields,
+    check_service_malformed_requests,
+    check_service_batch_error_rows,
+    check_feed_long_line_reconnects,
+    check_portfolio_mark_price,
+    check_model_fee_rate_propagates,
+    check_montecarlo_liquidation_matches_backtest,
+]
+
+
+def main():
+    failures = 0
+    for check in CHECKS:
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                problem = check(tmp)
+            except Exception as e:  # 점검 자체가 예외로 끝나도 실패로 기록
+                problem = f"{type(e).__name__}: {e}"
+        if problem:
+            failures += 1
+            print(f"실패  {check.__name__}: {problem}")
+        else:
+            print(f"통과  {check.__name__}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
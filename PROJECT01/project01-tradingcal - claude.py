@@ -2,8 +2,127 @@ import tkinter as tk
 from tkinter import ttk
 import json
 import os
+import tempfile
+import sqlite3
+import threading
+import time
 from functools import partial
 
+from tradingcore.formula import calculate, final_capital
+from tradingcore.formatting import format_money, format_percent
+from tradingcore.history import TradeHistory
+from tradingcore.journal import JournalWriter, now_ms
+
+SETTINGS_FILE = 'trading_calculator_settings.json'
+JOURNAL_DIR = 'trading_journal'  # 계산한 시나리오를 쌓는 거래 일지 (tradingcore.journal)
+JOURNAL_SETTLE_MS = 1500  # 입력이 이만큼 멈춰 있어야 일지에 기록 (타이핑 중간값은 남기지 않음)
+HISTORY_FILE = 'trading_history.db'  # 기록한 거래 (tradingcore.history, 누적 손익은 일별 집계에서 계산)
+
+
+class SettingsWriter:
+    # 설정 저장을 백그라운드 스레드에서 처리 (write-behind)
+    # - schedule(): 현재 설정의 사본만 맡기고 즉시 반환 (UI 스레드를 막지 않음)
+    # - 연속 변경은 delay 초 동안 모아서 한 번만 저장 (계속 바뀌어도 max_delay 안에는 저장)
+    # - 임시 파일에 쓴 뒤 os.replace 로 교체하므로 중간에 종료되어도 파일이 잘리지 않음
+    # - flush(): 대기 중인 변경을 즉시 저장하고 완료될 때까지 기다림 (종료 시 사용)
+    def __init__(self, path, delay=0.5, max_delay=2.0):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        
+        self._cond = threading.Condition()
+        self._snapshot = None      # 저장 대기 중인 설정 사본
+        self._due = None           # 저장 예정 시각
+        self._first_pending = None # 처음 변경이 들어온 시각
+        self._writing = False
+        self._closed = False
+        self.writes = 0
+        self.last_error = None
+        
+        self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+        self._thread.start()
+    
+    def schedule(self, settings, delay=None):
+        # 메인 스레드에서 가벼운 사본만 만든다 (직렬화는 백그라운드에서)
+        snapshot = {key: dict(value) if isinstance(value, dict) else value
+                    for key, value in settings.items()}
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                return
+            if self._snapshot is None:
+                self._first_pending = now
+            self._snapshot = snapshot
+            due = now + (self.delay if delay is None else delay)
+            self._due = min(due, self._first_pending + self.max_delay)
+            self._cond.notify()
+    
+    def flush(self, timeout=5.0):
+        # 대기 중인 저장을 즉시 수행하고 완료를 기다림. 성공 여부 반환
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._snapshot is not None:
+                self._due = time.monotonic()
+                self._cond.notify()
+            while self._snapshot is not None or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return self.last_error is None
+    
+    def close(self, timeout=5.0):
+        ok = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        return ok
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._snapshot is None or time.monotonic() < self._due):
+                    if self._snapshot is None:
+                        self._cond.wait()
+                    else:
+                        self._cond.wait(self._due - time.monotonic())
+                if self._snapshot is None:
+                    return  # 종료
+                snapshot, self._snapshot = self._snapshot, None
+                self._writing = True
+            
+            try:
+                self._write_atomic(snapshot)
+                error = None
+            except (OSError, TypeError, ValueError) as e:
+                error = e
+            
+            with self._cond:
+                self._writing = False
+                self.last_error = error
+                if error is None:
+                    self.writes += 1
+                self._cond.notify_all()
+    
+    def _write_atomic(self, settings):
+        data = json.dumps(settings)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.settings-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
 class TradingCalculator:
     def __init__(self, root):
         # 기본 설정값 정의
@@ -11,6 +130,7 @@ class TradingCalculator:
             "theme": "dark",
             "exchange_rate": 1450,
             "fee_rate": 0.0005,  # 0.05%
+            "symbol": "BTCUSDT",  # 거래 기록에 남길 종목 이름
             "last_values": {
                 "entry_price": "",
                 "target_price": "",
@@ -22,6 +142,29 @@ class TradingCalculator:
         
         # 설정 로드
         self.settings = self.load_settings()
+        self.settings_writer = SettingsWriter(SETTINGS_FILE)
+        
+        # 시나리오 일지 (열 수 없으면 기록하지 않고 계속 동작)
+        try:
+            self.journal = JournalWriter(JOURNAL_DIR, buffer_rows=1)
+        except (OSError, ValueError):
+            self.journal = None
+        self._journal_job = None
+        self._pending_scenario = None
+        self._last_scenario = None
+        self._last_result = None  # 마지막으로 계산에 성공한 (입력값, 결과)
+        
+        # 거래 기록 DB (열 수 없으면 누적 손익 표시 없이 동작)
+        try:
+            self.history = TradeHistory(HISTORY_FILE, utc_offset_hours=9)
+        except sqlite3.Error:
+            self.history = None
+        
+        # 연속 입력(키 반복, 붙여넣기, 슬라이더 드래그)을 한 번의 계산으로 병합
+        self.calc_latency_ms = 16  # 입력 후 계산까지 허용하는 최대 지연 (약 1프레임)
+        self._calc_job = None
+        self.calc_requests = 0  # 계산 요청 수
+        self.calc_merged = 0    # 이미 예약된 계산에 병합된 요청 수
         
         # 스타일 설정
         self.setup_styles()
@@ -32,6 +175,7 @@ class TradingCalculator:
         self.root.configure(bg=self.colors["bg"])
         self.root.geometry("600x700")  # 높이 증가
         self.root.minsize(600, 700)  # 최소 크기 증가
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # 외부 프레임 (스크롤바 포함)
         outer_frame = ttk.Frame(root)
@@ -184,7 +328,7 @@ class TradingCalculator:
                                 highlightbackground=self.colors["accent"])
                 entry.insert(0, default_value)
                 entry.grid(row=row_num, column=1, sticky='ew', padx=(0,20), pady=8, ipady=8)
-                entry.bind("<KeyRelease>", self.calculate_profit)
+                entry.bind("<KeyRelease>", self.schedule_calculate)
                 return entry
         
         # 진입 가격
@@ -339,6 +483,62 @@ class TradingCalculator:
                                           bg=self.colors["bg"], 
                                           fg=self.colors["accent"])
         self.result_total_label.pack(pady=(0, 10))
+        
+        # 기록한 거래의 누적 손익 (오늘 / 전체)
+        tk.Label(result_frame, 
+                text="기록한 거래 누적 손익", 
+                font=self.fonts["result_title"],
+                bg=self.colors["bg"], 
+                fg=self.colors["label_fg"]).pack(pady=(5, 5))
+        
+        self.result_history_label = tk.Label(result_frame, 
+                                            text="-", 
+                                            font=self.fonts["label"],
+                                            bg=self.colors["bg"], 
+                                            fg=self.colors["label_fg"],
+                                            justify='center')
+        self.result_history_label.pack(pady=(0, 10))
+        self.update_history_totals()
+    
+    def update_history_totals(self):
+        # daily 집계 테이블만 읽으므로 거래가 수천만 건이어도 바로 끝난다
+        if self.history is None:
+            self.result_history_label.config(text="거래 기록을 열 수 없습니다")
+            return
+        try:
+            total = self.history.totals()
+            today_start = self.history.day_of(now_ms()) * 86400000 - self.history.offset_ms
+            today = self.history.totals(start_ms=today_start)
+        except sqlite3.Error:
+            self.result_history_label.config(text="거래 기록을 읽을 수 없습니다")
+            return
+        if total["profit_usd"] > 0:
+            color = self.colors["positive"]
+        elif total["profit_usd"] < 0:
+            color = self.colors["negative"]
+        else:
+            color = self.colors["label_fg"]
+        self.result_history_label.config(
+            text=(f"오늘 {today['trades']:,}건  {format_money(today['profit_usd'], today['profit_krw'])}\n"
+                  f"전체 {total['trades']:,}건 (승률 {total['win_rate'] * 100:.1f}%)  "
+                  f"{format_money(total['profit_usd'], total['profit_krw'])}"),
+            fg=color)
+    
+    def record_trade(self):
+        # 현재 계산 결과를 목표 가격에 종료된 거래로 기록
+        if self.history is None or self._last_result is None:
+            tk.messagebox.showerror("오류", "기록할 계산 결과가 없습니다")
+            return
+        (entry_price, target_price, leverage, capital_usd, exchange_rate, position, fee_rate), \
+            (leveraged_percent, profit_usd, profit_krw) = self._last_result
+        ts = now_ms()
+        try:
+            self.history.add_trade(self.settings["symbol"], ts, ts, position, leverage, entry_price, target_price,
+                                   capital_usd, exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw)
+        except sqlite3.Error:
+            tk.messagebox.showerror("오류", "거래 기록 중 오류가 발생했습니다")
+            return
+        self.update_history_totals()
     
     def create_footer(self):
         footer_frame = tk.Frame(self.main_frame, bg=self.colors["bg"])
@@ -350,6 +550,12 @@ class TradingCalculator:
                              command=self.save_current_settings)
         save_btn.pack(side=tk.LEFT)
         
+        # 거래 기록 버튼
+        record_btn = ttk.Button(footer_frame, 
+                               text="거래로 기록", 
+                               command=self.record_trade)
+        record_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
         # 테마 전환 버튼
         theme_btn = ttk.Button(footer_frame, 
                               text="테마 전환", 
@@ -371,24 +577,14 @@ class TradingCalculator:
             if entry_price <= 0 or target_price <= 0 or leverage <= 0 or capital_usd <= 0 or exchange_rate <= 0:
                 raise ValueError("값은 0보다 커야 합니다")
                 
-            # 기본 수익률 계산
-            if position == 'Long':
-                profit_percent = ((target_price - entry_price) / entry_price) * 100
-            else:  # Short
-                profit_percent = ((entry_price - target_price) / entry_price) * 100
-            
-            # 수수료 반영한 레버리지 수익률
+            # 수수료 반영한 레버리지 수익률 / 실제 금액
             # 진입 및 청산 시 두 번의 수수료 적용
-            fee_impact = fee_rate * 2 * 100  # 퍼센트로 변환
-            leveraged_percent = (profit_percent * leverage) - (fee_impact * leverage)
-            
-            # 실제 금액 계산
-            actual_profit_usd = capital_usd * (leveraged_percent / 100)
-            actual_profit_krw = actual_profit_usd * exchange_rate
+            leveraged_percent, actual_profit_usd, actual_profit_krw = calculate(
+                entry_price, target_price, leverage, capital_usd, exchange_rate, position,
+                fee_rate, fee_sides=2)
             
             # 최종 자산 계산
-            final_capital_usd = capital_usd + actual_profit_usd
-            final_capital_krw = final_capital_usd * exchange_rate
+            final_capital_usd, final_capital_krw = final_capital(capital_usd, actual_profit_usd, exchange_rate)
             
             # 색상 결정
             if leveraged_percent > 0:
@@ -399,12 +595,12 @@ class TradingCalculator:
                 percent_color = self.colors["neutral"]
             
             # 결과 표시
-            self.result_percent_label.config(text=f"{leveraged_percent:.2f}%", fg=percent_color)
+            self.result_percent_label.config(text=format_percent(leveraged_percent), fg=percent_color)
             self.result_amount_label.config(
-                text=f"${actual_profit_usd:,.2f} (₩{actual_profit_krw:,.0f})", 
+                text=format_money(actual_profit_usd, actual_profit_krw), 
                 fg=self.colors["label_fg"])
             self.result_total_label.config(
-                text=f"${final_capital_usd:,.2f} (₩{final_capital_krw:,.0f})", 
+                text=format_money(final_capital_usd, final_capital_krw), 
                 fg=percent_color)
             
             # 입력값 저장
@@ -415,6 +611,12 @@ class TradingCalculator:
             self.settings["last_values"]["capital"] = capital_usd
             self.settings["exchange_rate"] = exchange_rate
             
+            # 자동 저장 (백그라운드에서 모아서 기록)
+            self.settings_writer.schedule(self.settings)
+            scenario = (entry_price, target_price, leverage, capital_usd, exchange_rate, position, fee_rate)
+            self._last_result = (scenario, (leveraged_percent, actual_profit_usd, actual_profit_krw))
+            self.schedule_journal(scenario)
+            
         except ValueError as e:
             if str(e) == "값은 0보다 커야 합니다":
                 message = "모든 값은 0보다 커야 합니다"
@@ -424,30 +626,66 @@ class TradingCalculator:
             self.result_percent_label.config(text=message, fg=self.colors["negative"])
             self.result_amount_label.config(text="-", fg=self.colors["label_fg"])
             self.result_total_label.config(text="-", fg=self.colors["label_fg"])
+            self._last_result = None
+    
+    def schedule_calculate(self, *args):
+        # 이미 예약된 계산이 있으면 병합 (계산 시점에 최신 입력값을 읽으므로 결과는 같다)
+        self.calc_requests += 1
+        if self._calc_job is not None:
+            self.calc_merged += 1
+            return
+        if self.calc_latency_ms > 0:
+            self._calc_job = self.root.after(self.calc_latency_ms, self._run_scheduled_calculate)
+        else:
+            self._calc_job = self.root.after_idle(self._run_scheduled_calculate)
+    
+    def _run_scheduled_calculate(self):
+        self._calc_job = None
+        self.calculate_profit()
+    
+    def schedule_journal(self, scenario):
+        # 입력이 JOURNAL_SETTLE_MS 동안 그대로일 때 한 번만 기록 (직전에 기록한 것과 같으면 생략)
+        if self.journal is None:
+            return
+        self._pending_scenario = scenario
+        if self._journal_job is not None:
+            self.root.after_cancel(self._journal_job)
+        self._journal_job = self.root.after(JOURNAL_SETTLE_MS, self.record_scenario)
+    
+    def record_scenario(self):
+        self._journal_job = None
+        scenario, self._pending_scenario = self._pending_scenario, None
+        if scenario is None or scenario == self._last_scenario:
+            return
+        try:
+            self.journal.append_scenario(*scenario, fee_sides=2)
+        except (OSError, ValueError):
+            return
+        self._last_scenario = scenario
     
     def sync_slider_with_entry(self, *args):
         try:
             val = int(self.leverage_entry.get())
             if 1 <= val <= 125:
                 self.leverage_scale.set(val)
-                self.calculate_profit()
+                self.schedule_calculate()
             elif val > 125:
                 self.leverage_entry.delete(0, tk.END)
                 self.leverage_entry.insert(0, "125")
                 self.leverage_scale.set(125)
-                self.calculate_profit()
+                self.schedule_calculate()
             elif val < 1:
                 self.leverage_entry.delete(0, tk.END)
                 self.leverage_entry.insert(0, "1")
                 self.leverage_scale.set(1)
-                self.calculate_profit()
+                self.schedule_calculate()
         except ValueError:
             pass
     
     def sync_entry_with_slider(self, val):
         self.leverage_entry.delete(0, tk.END)
         self.leverage_entry.insert(0, str(int(float(val))))
-        self.calculate_profit()
+        self.schedule_calculate()
     
     def update_position_and_calculate(self):
         self.calculate_profit()
@@ -515,8 +753,10 @@ class TradingCalculator:
             self.settings["last_values"]["capital"] = float(self.capital.get())
             self.settings["exchange_rate"] = float(self.exchange_rate.get())
             
-            # 설정 저장
+            # 설정 저장 (저장 완료까지 확인)
             self.save_settings()
+            if not self.settings_writer.flush():
+                raise OSError("설정 파일 저장 실패")
             
             # 성공 메시지
             tk.messagebox.showinfo("설정 저장", "현재 설정이 성공적으로 저장되었습니다.")
@@ -525,8 +765,8 @@ class TradingCalculator:
     
     def load_settings(self):
         try:
-            if os.path.exists('trading_calculator_settings.json'):
-                with open('trading_calculator_settings.json', 'r') as f:
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r') as f:
                     settings = json.load(f)
                 # 기존 설정에 누락된 항목이 있으면 기본값으로 추가
                 for key, value in self.default_settings.items():
@@ -546,11 +786,20 @@ class TradingCalculator:
             return self.default_settings
     
     def save_settings(self):
-        try:
-            with open('trading_calculator_settings.json', 'w') as f:
-                json.dump(self.settings, f)
-        except:
-            pass
+        # 즉시 저장 요청 (실제 기록은 백그라운드 스레드에서)
+        self.settings_writer.schedule(self.settings, delay=0)
+    
+    def on_close(self):
+        # 대기 중인 설정과 시나리오를 모두 기록한 뒤 종료
+        self.settings_writer.close()
+        if self.journal is not None:
+            if self._journal_job is not None:
+                self.root.after_cancel(self._journal_job)
+                self.record_scenario()
+            self.journal.close()
+        if self.history is not None:
+            self.history.close()
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,47 @@
+# tradingcore
+# 트레이딩 손익 계산 핵심 로직 (tkinter 없이 사용 가능)
+#
+# 하위 모듈은 처음 사용할 때 불러온다. numpy 가 필요한 batch / montecarlo 등은
+# 실제로 접근하기 전에는 import 되지 않으므로 `import tradingcore` 는 가볍다.
+#
+#   import tradingcore
+#   tradingcore.calculate(100, 110, 10, 1000, 1450, "Long")
+#   tradingcore.batch.calculate_batch(...)
+import importlib
+
+_SUBMODULES = ("fees", "formula", "formatting", "batch", "margin", "montecarlo", "headless", "backtest",
+               "portfolio", "feed", "solve", "journal", "history", "lots", "slippage", "alerts", "service",
+               "latency")
+
+# 패키지에서 바로 꺼내 쓸 수 있는 이름 -> 하위 모듈
+_EXPORTS = {
+    "DEFAULT_FEE_RATE": "fees",
+    "fee_impact_percent": "fees",
+    "FeeSchedule": "fees",
+    "load_fee_schedule": "fees",
+    "calculate": "formula",
+    "profit_percent": "formula",
+    "final_capital": "formula",
+    "format_percent": "formatting",
+    "format_money": "formatting",
+    "calculate_batch": "batch",
+    "MarginEngine": "margin",
+    "Portfolio": "portfolio",
+}
+
+__all__ = list(_SUBMODULES) + list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+        value = getattr(module, name)
+        globals()[name] = value  # 다음부터는 모듈 속성으로 바로 찾음
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
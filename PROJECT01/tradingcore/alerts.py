@@ -0,0 +1,252 @@
+# alerts.py
+# 틱마다 평가하는 가격 알림 엔진
+# - 손익 조건은 등록할 때 한 번만 가격 조건으로 바꾼다 (손익은 가격에 대해 단조이므로 가능, 수수료가 바뀌면 set_fee_rate 로 다시)
+#     percent     : 수수료 반영 레버리지 수익률이 X% 에 도달 (음수면 손실)   -> solve.target_for_percent
+#     usd         : 수익이 $X 에 도달 (음수면 손실)                          -> solve.target_for_profit_usd
+#     liquidation : 현재가와 청산 가격의 거리가 Y% 이내                      -> margin 엔진의 청산 가격
+#     price       : 가격이 X 에 도달
+#   조건 가격이 진입 가격 이상이면 "오르면 발동", 아니면 "내리면 발동"
+# - 종목마다 힙 두 개: 오르면 발동하는 알림은 조건 가격의 최소 힙, 내리면 발동하는 알림은 최대 힙
+#   틱이 오면 각 힙의 맨 위만 보고 넘어선 알림만 꺼낸다. 틱 하나의 비용은 O((발동 수 + 1) log n)
+#   이고, 넘지 않은 알림은 건드리지 않는다
+# - 알림은 한 번 발동하면 끝난다. 취소는 표시만 해 두고 힙 맨 위에 올라왔을 때 버린다
+#   (취소된 항목이 절반을 넘으면 그 종목의 힙을 다시 만든다)
+#
+# 사용 예:
+#   engine = AlertEngine()
+#   engine.add("BTCUSDT", "percent", 50, entry_price=60000, leverage=20)
+#   engine.add("BTCUSDT", "liquidation", 2, entry_price=60000, leverage=20)
+#   for alert in engine.on_tick("BTCUSDT", 61700.0): ...
+import heapq
+import itertools
+
+from .fees import DEFAULT_FEE_RATE
+from .margin import default_engine
+from .solve import target_for_percent, target_for_profit_usd
+
+KINDS = ("percent", "usd", "liquidation", "price")
+
+
+class Alert:
+    __slots__ = ("id", "symbol", "kind", "threshold", "trigger", "rises", "position_id", "active",
+                 "fired_price", "inputs")
+
+    def __init__(self, alert_id, symbol, kind, threshold, trigger, rises, position_id, inputs=None):
+        self.id = alert_id
+        self.symbol = symbol
+        self.kind = kind
+        self.threshold = threshold
+        self.trigger = trigger        # 조건 가격
+        self.rises = rises            # True: 가격 >= trigger 에서 발동, False: 가격 <= trigger
+        self.position_id = position_id
+        self.active = True
+        self.fired_price = None
+        self.inputs = inputs          # 등록할 때의 (진입 가격, 레버리지, 방향, 투자금) - 수수료가 바뀌면 다시 계산
+
+    def describe(self):
+        if self.kind == "percent":
+            condition = f"수익률 {self.threshold:+g}%"
+        elif self.kind == "usd":
+            condition = f"손익 ${self.threshold:+,g}"
+        elif self.kind == "liquidation":
+            condition = f"청산 {self.threshold:g}% 이내"
+        else:
+            condition = f"가격 {self.threshold:,g}"
+        return f"{self.symbol} {condition} ({'≥' if self.rises else '≤'} {self.trigger:,.4f})"
+
+
+def price_trigger(kind, threshold, entry_price=None, leverage=None, position="Long", capital_usd=1000.0,
+                  fee_rate=DEFAULT_FEE_RATE, fee_sides=1, margin_engine=default_engine):
+    # (조건 가격, 오르면 발동 여부). 도달할 수 없는 조건이면 ValueError
+    if kind == "price":
+        if threshold <= 0:
+            raise ValueError("가격은 0보다 커야 합니다")
+        if entry_price is None:
+            raise ValueError("가격 알림의 방향을 정할 기준 가격(entry_price)이 필요합니다")
+        return float(threshold), threshold >= entry_price
+    if entry_price is None or leverage is None:
+        raise ValueError("진입 가격과 레버리지가 필요합니다")
+    if kind == "percent":
+        trigger = target_for_percent(entry_price, leverage, threshold, position, fee_rate, fee_sides)
+    elif kind == "usd":
+        trigger = target_for_profit_usd(entry_price, leverage, capital_usd, threshold, position,
+                                        fee_rate, fee_sides)
+    elif kind == "liquidation":
+        if not 0 <= threshold < 100:
+            raise ValueError("청산 거리는 0 이상 100 미만(%)이어야 합니다")
+        liquidation = margin_engine.liquidation_price(entry_price, leverage, capital_usd, position)
+        if not liquidation > 0:
+            raise ValueError("청산 가격을 계산할 수 없습니다")
+        # 롱: (가격 - 청산가) / 가격 <= y  ->  가격 <= 청산가 / (1 - y)
+        # 숏: (청산가 - 가격) / 가격 <= y  ->  가격 >= 청산가 / (1 + y)
+        y = threshold / 100
+        if position == 'Long':
+            return liquidation / (1 - y), False
+        return liquidation / (1 + y), True
+    else:
+        raise ValueError(f"알 수 없는 알림 종류: {kind}")
+    return trigger, trigger >= entry_price
+
+
+class AlertEngine:
+    def __init__(self, fee_rate=DEFAULT_FEE_RATE, fee_sides=1, margin_engine=default_engine):
+        self.fee_rate = fee_rate
+        self.fee_sides = fee_sides
+        self.margin_engine = margin_engine
+        self.alerts = {}       # id -> 활성 Alert
+        self._rising = {}      # symbol -> [(trigger, 순번, Alert)]  최소 힙
+        self._falling = {}     # symbol -> [(-trigger, 순번, Alert)] 최대 힙
+        self._stale = {}       # symbol -> 힙에 남은 취소된 항목 수
+        self._by_position = {}  # position_id -> {alert id}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self.ticks = 0
+        self.fired = 0
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def add(self, symbol, kind, threshold, entry_price=None, leverage=None, position="Long", capital_usd=1000.0,
+            position_id=None):
+        # 알림을 등록하고 id 반환 (잘못된 조건이면 ValueError)
+        trigger, rises = price_trigger(kind, threshold, entry_price, leverage, position, capital_usd,
+                                       self.fee_rate, self.fee_sides, self.margin_engine)
+        alert = Alert(next(self._ids), symbol, kind, threshold, trigger, rises, position_id,
+                      (entry_price, leverage, position, capital_usd))
+        self.alerts[alert.id] = alert
+        if rises:
+            heapq.heappush(self._rising.setdefault(symbol, []), (trigger, next(self._seq), alert))
+        else:
+            heapq.heappush(self._falling.setdefault(symbol, []), (-trigger, next(self._seq), alert))
+        if position_id is not None:
+            self._by_position.setdefault(position_id, set()).add(alert.id)
+        return alert.id
+
+    def add_for_position(self, portfolio, position_id, kind, threshold):
+        # portfolio.Portfolio 의 포지션에 대한 알림 (포지션을 지우면 cancel_position 으로 함께 취소)
+        p = portfolio.get(position_id)
+        return self.add(p["symbol"], kind, threshold, p["entry_price"], p["leverage"], p["position"],
+                        p["capital_usd"], position_id)
+
+    def cancel(self, alert_id):
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return False
+        alert.active = False
+        self._forget_position(alert)
+        stale = self._stale[alert.symbol] = self._stale.get(alert.symbol, 0) + 1
+        size = len(self._rising.get(alert.symbol, ())) + len(self._falling.get(alert.symbol, ()))
+        if stale * 2 > size:
+            self._compact(alert.symbol)
+        return True
+
+    def set_fee_rate(self, fee_rate):
+        # 손익 조건(percent/usd)의 조건 가격은 수수료에 따라 달라지므로 다시 구하고 힙을 새로 만든다
+        # 새 수수료로는 도달할 수 없게 된 알림은 취소하고 그 목록을 반환
+        if fee_rate == self.fee_rate:
+            return []
+        self.fee_rate = fee_rate
+        dropped = []
+        for alert in list(self.alerts.values()):
+            if alert.kind not in ("percent", "usd"):
+                continue
+            try:
+                alert.trigger, alert.rises = price_trigger(alert.kind, alert.threshold, *alert.inputs, fee_rate,
+                                                           self.fee_sides, self.margin_engine)
+            except ValueError:
+                alert.active = False
+                del self.alerts[alert.id]
+                self._forget_position(alert)
+                dropped.append(alert)
+        self._rebuild()
+        return dropped
+
+    def _rebuild(self):
+        # 활성 알림만으로 모든 종목의 힙을 다시 만든다
+        self._rising = {}
+        self._falling = {}
+        self._stale = {}
+        for alert in self.alerts.values():
+            if alert.rises:
+                self._rising.setdefault(alert.symbol, []).append((alert.trigger, next(self._seq), alert))
+            else:
+                self._falling.setdefault(alert.symbol, []).append((-alert.trigger, next(self._seq), alert))
+        for heaps in (self._rising, self._falling):
+            for heap in heaps.values():
+                heapq.heapify(heap)
+
+    def cancel_position(self, position_id):
+        for alert_id in list(self._by_position.get(position_id, ())):
+            self.cancel(alert_id)
+
+    def _forget_position(self, alert):
+        if alert.position_id is not None:
+            ids = self._by_position.get(alert.position_id)
+            if ids is not None:
+                ids.discard(alert.id)
+                if not ids:
+                    del self._by_position[alert.position_id]
+
+    def _compact(self, symbol):
+        # 취소된 항목을 걷어내고 힙을 다시 만든다
+        for heaps in (self._rising, self._falling):
+            heap = heaps.get(symbol)
+            if heap is not None:
+                heap[:] = [entry for entry in heap if entry[2].active]
+                heapq.heapify(heap)
+        self._stale[symbol] = 0
+
+    def _fire(self, alert, price, fired):
+        if not alert.active:
+            # 취소된 항목이 맨 위에 올라옴
+            self._stale[alert.symbol] -= 1
+            return
+        alert.active = False
+        alert.fired_price = price
+        del self.alerts[alert.id]
+        self._forget_position(alert)
+        fired.append(alert)
+
+    def on_tick(self, symbol, price):
+        # 이번 가격으로 발동한 알림 목록 (발동한 알림은 엔진에서 빠진다)
+        self.ticks += 1
+        fired = []
+        heap = self._rising.get(symbol)
+        while heap and heap[0][0] <= price:
+            self._fire(heapq.heappop(heap)[2], price, fired)
+        heap = self._falling.get(symbol)
+        while heap and -heap[0][0] >= price:
+            self._fire(heapq.heappop(heap)[2], price, fired)
+        self.fired += len(fired)
+        return fired
+
+    def on_ticks(self, prices):
+        # prices: {종목: 가격} (feed.LatestTicks.drain 결과 등)
+        fired = []
+        for symbol, price in prices.items():
+            fired.extend(self.on_tick(symbol, price))
+        return fired
+
+    def nearest(self, symbol):
+        # (가장 가까운 오름 조건 가격, 가장 가까운 내림 조건 가격) - 없으면 None
+        # 이 범위 안의 틱은 아무 알림도 발동시키지 않는다
+        rising = self._rising.get(symbol)
+        falling = self._falling.get(symbol)
+        up = rising[0][0] if rising else None
+        down = -falling[0][0] if falling else None
+        return up, down
+
+
+def parse_alert(text):
+    # "10%" / "-5%" -> percent, "$50" / "-$50" -> usd, "청산 2%" / "liq 2%" -> liquidation, "@61000" -> price
+    # (종류, 값) 또는 ValueError
+    text = text.strip().replace(",", "")
+    lowered = text.lower()
+    for prefix in ("청산", "liq"):
+        if lowered.startswith(prefix):
+            return "liquidation", float(text[len(prefix):].strip().rstrip("%"))
+    if text.startswith("@"):
+        return "price", float(text[1:])
+    if "$" in text:
+        return "usd", float(text.replace("$", ""))
+    return "percent", float(text.rstrip("%"))
@@ -0,0 +1,403 @@
+# backtest.py
+# 로컬 캔들(OHLCV) 파일 위에서 진입/목표/손절 주문을 재생하는 백테스트
+# - 캔들은 CSV 또는 바이너리 파일에서 묶음(chunk) 단위로 읽어 한 번만 훑는다 (메모리 상한: chunk_size 캔들)
+# - 손익은 formula.calculate 와 같은 공식, 수수료는 claude 구현처럼 진입 + 청산 두 번 (fee_sides=2)
+# - 청산 가격은 margin.default_engine (격리 마진, 유지증거금 구간) 으로 계산
+# - 주문이 하나뿐이면 묶음마다 numpy 로 가격 도달 위치를 미리 구해 다음 체결 지점으로 건너뛴다
+#
+# 체결 규칙 (1분봉 안의 가격 순서는 알 수 없으므로 보수적으로 처리):
+# - 진입: 저가 <= 진입가 <= 고가 인 캔들에서 진입가로 체결. 종료 판정은 다음 캔들부터
+# - 같은 캔들에서 목표가와 손절/청산가가 모두 닿으면 손절/청산으로 처리
+# - 손절: 시가가 이미 손절가를 넘어 열리면 시가로 체결, 목표가는 목표가로 체결
+# - 청산: 증거금 전액 손실 (-100%)
+#
+# 바이너리 형식: CANDLE_DTYPE 레코드(48바이트)를 그대로 이어 붙인 파일 (--convert 로 CSV 에서 변환)
+#
+# 사용 예:
+#   python -m tradingcore.backtest btc_1m.csv --entry 60000 --target 61200 --stop 59400 --leverage 20 --repeat
+#   python -m tradingcore.backtest btc_1m.csv --convert btc_1m.bin
+#   python -m tradingcore.backtest btc_1m.bin --entry 60000 --target 61200 --repeat --journal trades.journal
+import argparse
+import csv
+import os
+from bisect import bisect_left
+
+import numpy as np
+
+from .fees import DEFAULT_FEE_RATE
+from .formula import calculate
+from .journal import JournalWriter
+from .margin import default_engine
+
+DEFAULT_CHUNK_SIZE = 262144  # 한 번에 읽는 캔들 수
+
+CANDLE_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+# CSV 헤더에서 시간 열로 인정하는 이름
+TIME_COLUMNS = ("ts", "timestamp", "open_time", "time", "date")
+
+WAITING, OPEN, DONE = 0, 1, 2
+
+
+# --- 캔들 읽기/쓰기 ---
+
+def _column_index(header, names, required=True):
+    lowered = [name.strip().lower() for name in header]
+    for name in names:
+        if name in lowered:
+            return lowered.index(name)
+    if required:
+        raise ValueError(f"캔들 파일에 {names[0]} 열이 없습니다")
+    return None
+
+
+def read_csv_candles(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    # 헤더가 있는 CSV (ts/timestamp, open, high, low, close[, volume]) 를 묶음 단위로 읽는다
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        ti = _column_index(header, TIME_COLUMNS)
+        oi, hi, li, ci = (_column_index(header, (name,)) for name in ("open", "high", "low", "close"))
+        vi = _column_index(header, ("volume",), required=False)
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            rows.append((int(float(row[ti])), float(row[oi]), float(row[hi]), float(row[li]),
+                         float(row[ci]), float(row[vi]) if vi is not None else 0.0))
+            if len(rows) == chunk_size:
+                yield np.array(rows, dtype=CANDLE_DTYPE)
+                rows = []
+        if rows:
+            yield np.array(rows, dtype=CANDLE_DTYPE)
+
+
+def read_binary_candles(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    with open(path, "rb") as f:
+        while True:
+            chunk = np.fromfile(f, dtype=CANDLE_DTYPE, count=chunk_size)
+            if chunk.size == 0:
+                break
+            yield chunk
+
+
+def read_candles(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    if os.path.splitext(path)[1].lower() == ".csv":
+        return read_csv_candles(path, chunk_size)
+    return read_binary_candles(path, chunk_size)
+
+
+def write_binary_candles(chunks, path):
+    count = 0
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            np.ascontiguousarray(chunk, dtype=CANDLE_DTYPE).tofile(f)
+            count += len(chunk)
+    return count
+
+
+# --- 주문 / 결과 ---
+
+class Order:
+    # 진입가에 닿으면 진입하고 목표가 / 손절가 / 청산가 중 먼저 닿는 가격에서 종료
+    # repeat=True 면 종료 후 다시 진입가를 기다린다
+    def __init__(self, entry_price, target_price, stop_price=None, leverage=10, position="Long",
+                 capital_usd=1000.0, repeat=False, margin_engine=default_engine):
+        if entry_price <= 0 or target_price <= 0 or capital_usd <= 0:
+            raise ValueError("진입 가격, 목표 가격, 투자금은 0보다 커야 합니다")
+        is_long = position == "Long"
+        if (target_price <= entry_price) if is_long else (target_price >= entry_price):
+            raise ValueError("목표 가격이 진입 가격보다 유리한 쪽에 있어야 합니다")
+        if stop_price is not None and ((stop_price >= entry_price) if is_long else (stop_price <= entry_price)):
+            raise ValueError("손절 가격이 진입 가격보다 불리한 쪽에 있어야 합니다")
+
+        self.entry_price = float(entry_price)
+        self.target_price = float(target_price)
+        self.stop_price = None if stop_price is None else float(stop_price)
+        self.leverage = leverage
+        self.position = position
+        self.is_long = is_long
+        self.capital_usd = float(capital_usd)
+        self.repeat = repeat
+        self.liquidation_price = margin_engine.liquidation_price(entry_price, leverage, capital_usd, position)
+
+        # 손절가가 청산가보다 멀면 청산이 먼저 일어난다
+        if is_long:
+            self.liquidates = stop_price is None or stop_price <= self.liquidation_price
+        else:
+            self.liquidates = stop_price is None or stop_price >= self.liquidation_price
+        self.adverse_price = self.liquidation_price if self.liquidates else self.stop_price
+
+
+class BacktestResult:
+    # 거래가 끝날 때마다 집계를 갱신한다 (keep_trades=False 면 거래 목록은 보관하지 않음)
+    def __init__(self, balance=None, keep_trades=True):
+        self.initial_balance = balance
+        self.keep_trades = keep_trades
+        self.trades = []
+        self.open_positions = []
+        self.candles = 0
+        self.count = 0
+        self.wins = 0
+        self.liquidations = 0
+        self.stops = 0
+        self.total_usd = 0.0
+        self.total_krw = 0.0
+        self.equity = 0.0 if balance is None else float(balance)
+        self.peak_equity = self.equity
+        self.max_drawdown_usd = 0.0
+
+    def record(self, trade):
+        # trade = (주문 번호, 진입 시각, 종료 시각, 진입가, 종료가, 사유, 수익률 %, USD, KRW)
+        if self.keep_trades:
+            self.trades.append(trade)
+        reason, profit_usd = trade[5], trade[7]
+        self.count += 1
+        if profit_usd > 0:
+            self.wins += 1
+        if reason == "liquidation":
+            self.liquidations += 1
+        elif reason == "stop":
+            self.stops += 1
+        self.total_usd += profit_usd
+        self.total_krw += trade[8]
+        self.equity += profit_usd
+        if self.equity > self.peak_equity:
+            self.peak_equity = self.equity
+        elif self.peak_equity - self.equity > self.max_drawdown_usd:
+            self.max_drawdown_usd = self.peak_equity - self.equity
+
+    def summary(self):
+        return {
+            "candles": self.candles,
+            "trades": self.count,
+            "win_rate": self.wins / self.count if self.count else 0.0,
+            "liquidations": self.liquidations,
+            "stops": self.stops,
+            "total_profit_usd": self.total_usd,
+            "total_profit_krw": self.total_krw,
+            "final_equity_usd": self.equity,
+            "max_drawdown_usd": self.max_drawdown_usd,
+            "open_positions": len(self.open_positions),
+        }
+
+
+class _Engine:
+    # 주문별 상태 (WAITING / OPEN / DONE) 와 지갑 잔고를 묶음 사이에 이어서 들고 있는다
+    def __init__(self, orders, exchange_rate, fee_rate, fee_sides, balance, result, journal=None):
+        self.orders = orders
+        self.exchange_rate = exchange_rate
+        self.fee_rate = fee_rate
+        self.fee_sides = fee_sides
+        self.balance = balance  # None 이면 잔고 제한 없음
+        self.result = result
+        self.journal = journal  # journal.JournalWriter - 종료된 거래를 기록
+        self.phase = [WAITING] * len(orders)
+        self.entry_ts = [0] * len(orders)
+
+    def enter(self, i, ts):
+        # 잔고가 모자라면 진입하지 않는다 (주문 하나뿐이면 다시는 진입할 수 없음)
+        order = self.orders[i]
+        if self.balance is not None:
+            if self.balance < order.capital_usd:
+                return False
+            self.balance -= order.capital_usd
+        self.phase[i] = OPEN
+        self.entry_ts[i] = ts
+        return True
+
+    def exit(self, i, ts, exit_price, reason):
+        order = self.orders[i]
+        if reason == "liquidation":
+            pct, usd, krw = -100.0, -order.capital_usd, -order.capital_usd * self.exchange_rate
+        else:
+            pct, usd, krw = calculate(order.entry_price, exit_price, order.leverage, order.capital_usd,
+                                      self.exchange_rate, order.position, self.fee_rate, self.fee_sides)
+        if self.balance is not None:
+            self.balance += order.capital_usd + usd
+        self.result.record((i, self.entry_ts[i], ts, order.entry_price, exit_price, reason, pct, usd, krw))
+        if self.journal is not None:
+            self.journal.append_trade(self.entry_ts[i], ts, order.entry_price, exit_price, order.leverage,
+                                      order.capital_usd, self.exchange_rate, order.position, self.fee_rate,
+                                      pct, usd, krw, reason)
+        self.phase[i] = WAITING if order.repeat else DONE
+
+    def adverse_fill(self, order, open_price):
+        # (종료가, 사유). 손절가를 건너뛰어 열린 캔들은 시가로 체결
+        if order.liquidates:
+            return order.liquidation_price, "liquidation"
+        if order.is_long:
+            return min(open_price, order.stop_price), "stop"
+        return max(open_price, order.stop_price), "stop"
+
+    # --- 일반 경로: 캔들 하나씩, 모든 주문을 시간 순서대로 ---
+
+    def scan(self, chunk):
+        orders = self.orders
+        phase = self.phase
+        columns = (chunk["ts"].tolist(), chunk["open"].tolist(), chunk["high"].tolist(), chunk["low"].tolist())
+        for ts, open_price, high, low in zip(*columns):
+            # 종료를 먼저 처리해 풀린 증거금으로 같은 캔들에서 다른 주문이 진입할 수 있게 한다
+            closed = None
+            for i, order in enumerate(orders):
+                if phase[i] != OPEN:
+                    continue
+                if order.is_long:
+                    adverse, target = low <= order.adverse_price, high >= order.target_price
+                else:
+                    adverse, target = high >= order.adverse_price, low <= order.target_price
+                if adverse:
+                    exit_price, reason = self.adverse_fill(order, open_price)
+                    self.exit(i, ts, exit_price, reason)
+                elif target:
+                    self.exit(i, ts, order.target_price, "target")
+                else:
+                    continue
+                if closed is None:
+                    closed = set()
+                closed.add(i)  # 이번 캔들에서는 다시 진입하지 않음
+            for i, order in enumerate(orders):
+                if phase[i] == WAITING and low <= order.entry_price <= high and (closed is None or i not in closed):
+                    self.enter(i, ts)
+
+    # --- 빠른 경로: 주문 하나, 가격 도달 위치를 묶음마다 한 번에 구한다 ---
+
+    def scan_single(self, chunk):
+        order = self.orders[0]
+        if self.phase[0] == DONE:
+            return
+        low, high = chunk["low"], chunk["high"]
+        entry_hits = np.flatnonzero((low <= order.entry_price) & (high >= order.entry_price)).tolist()
+        if order.is_long:
+            target_hits = np.flatnonzero(high >= order.target_price).tolist()
+            adverse_hits = np.flatnonzero(low <= order.adverse_price).tolist()
+        else:
+            target_hits = np.flatnonzero(low <= order.target_price).tolist()
+            adverse_hits = np.flatnonzero(high >= order.adverse_price).tolist()
+        ts = chunk["ts"]
+        n = len(chunk)
+        pos = 0
+        while True:
+            if self.phase[0] == WAITING:
+                j = bisect_left(entry_hits, pos)
+                if j == len(entry_hits):
+                    return
+                i = entry_hits[j]
+                if not self.enter(0, int(ts[i])):
+                    self.phase[0] = DONE
+                    return
+                pos = i + 1
+            elif self.phase[0] == OPEN:
+                a = bisect_left(adverse_hits, pos)
+                t = bisect_left(target_hits, pos)
+                ai = adverse_hits[a] if a < len(adverse_hits) else n
+                ti = target_hits[t] if t < len(target_hits) else n
+                if ai == n and ti == n:
+                    return  # 다음 묶음으로 포지션을 넘긴다
+                if ai <= ti:
+                    exit_price, reason = self.adverse_fill(order, float(chunk["open"][ai]))
+                    self.exit(0, int(ts[ai]), exit_price, reason)
+                    pos = ai + 1
+                else:
+                    self.exit(0, int(ts[ti]), order.target_price, "target")
+                    pos = ti + 1
+            else:
+                return
+
+    def finish(self, last_ts, last_close):
+        # 끝까지 종료되지 않은 포지션은 마지막 종가 기준 미실현 손익으로 남긴다
+        for i, order in enumerate(self.orders):
+            if self.phase[i] != OPEN or last_close is None:
+                continue
+            pct, usd, krw = calculate(order.entry_price, last_close, order.leverage, order.capital_usd,
+                                      self.exchange_rate, order.position, self.fee_rate, self.fee_sides)
+            self.result.open_positions.append((i, self.entry_ts[i], last_ts, order.entry_price, last_close,
+                                               "open", pct, usd, krw))
+
+
+def run(candles, orders, exchange_rate=1450.0, fee_rate=DEFAULT_FEE_RATE, fee_sides=2,
+        balance=None, vectorized=None, keep_trades=True, journal=None):
+    # candles: CANDLE_DTYPE 배열 묶음을 내는 iterable (read_candles 결과 등)
+    # vectorized=None 이면 주문이 하나일 때만 빠른 경로 사용
+    # journal: 종료된 거래를 덧붙일 journal.JournalWriter (닫는 것은 호출한 쪽)
+    if isinstance(orders, Order):
+        orders = [orders]
+    orders = list(orders)
+    if not orders:
+        raise ValueError("주문이 하나 이상 필요합니다")
+    if vectorized is None:
+        vectorized = len(orders) == 1
+    if vectorized and len(orders) != 1:
+        raise ValueError("빠른 경로는 주문이 하나일 때만 사용할 수 있습니다")
+
+    result = BacktestResult(balance, keep_trades)
+    engine = _Engine(orders, exchange_rate, fee_rate, fee_sides, balance, result, journal)
+    scan = engine.scan_single if vectorized else engine.scan
+    last_ts = last_close = None
+    for chunk in candles:
+        if len(chunk) == 0:
+            continue
+        scan(chunk)
+        result.candles += len(chunk)
+        last_ts, last_close = int(chunk["ts"][-1]), float(chunk["close"][-1])
+    engine.finish(last_ts, last_close)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="캔들 파일 백테스트")
+    parser.add_argument("candles", help="캔들 파일 (.csv 또는 CANDLE_DTYPE 바이너리)")
+    parser.add_argument("--convert", metavar="OUT", help="CSV 를 바이너리 캔들 파일로 변환만 하고 종료")
+    parser.add_argument("--entry", type=float, help="진입 가격")
+    parser.add_argument("--target", type=float, help="목표 가격")
+    parser.add_argument("--stop", type=float, help="손절 가격 (없으면 청산까지 보유)")
+    parser.add_argument("--leverage", type=int, default=10)
+    parser.add_argument("--position", choices=["Long", "Short"], default="Long")
+    parser.add_argument("--capital", type=float, default=1000.0)
+    parser.add_argument("--exchange-rate", type=float, default=1450.0)
+    parser.add_argument("--fee-rate", type=float, default=DEFAULT_FEE_RATE)
+    parser.add_argument("--fee-sides", type=int, choices=[1, 2], default=2,
+                        help="수수료 부과 횟수 (기본 2: 진입 + 청산)")
+    parser.add_argument("--balance", type=float, help="지갑 잔고 (없으면 잔고 제한 없음)")
+    parser.add_argument("--repeat", action="store_true", help="종료 후 다시 진입가를 기다림")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--no-vectorize", action="store_true", help="빠른 경로 대신 캔들 단위로 계산")
+    parser.add_argument("--journal", metavar="DIR", help="종료된 거래를 덧붙일 거래 일지 디렉터리")
+    args = parser.parse_args(argv)
+
+    if args.convert:
+        count = write_binary_candles(read_csv_candles(args.candles, args.chunk_size), args.convert)
+        print(f"{count:,}개 캔들 변환 완료: {args.convert}")
+        return 0
+    if args.entry is None or args.target is None:
+        parser.error("--entry 와 --target 이 필요합니다")
+
+    order = Order(args.entry, args.target, args.stop, args.leverage, args.position, args.capital, args.repeat)
+    journal = JournalWriter(args.journal) if args.journal else None
+    try:
+        result = run(read_candles(args.candles, args.chunk_size), [order], args.exchange_rate, args.fee_rate,
+                     args.fee_sides, args.balance, vectorized=not args.no_vectorize, keep_trades=False,
+                     journal=journal)
+    finally:
+        if journal is not None:
+            journal.close()
+    s = result.summary()
+    print(f"캔들 수: {s['candles']:,}")
+    print(f"청산 가격: {order.liquidation_price:,.4f}")
+    print(f"거래 수: {s['trades']:,} (승률 {s['win_rate'] * 100:.2f}%, 손절 {s['stops']:,}, 청산 {s['liquidations']:,})")
+    print(f"누적 손익: ${s['total_profit_usd']:,.2f} (₩{s['total_profit_krw']:,.0f})")
+    print(f"최대 낙폭: ${s['max_drawdown_usd']:,.2f}")
+    for trade in result.open_positions:
+        print(f"미청산 포지션: 진입 {trade[3]:,.4f} → 현재 {trade[4]:,.4f} ({trade[6]:.2f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
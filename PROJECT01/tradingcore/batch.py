@@ -0,0 +1,81 @@
+# batch.py
+# 여러 포지션을 한 번에 계산하는 벡터화 엔진
+# formula.calculate 와 연산 순서를 동일하게 맞춰 결과가 비트 단위로 일치한다.
+import numpy as np
+
+# 한 번에 처리할 행 수 (임시 배열이 CPU 캐시에 머무르도록 블록 단위로 계산)
+BLOCK_SIZE = 16384
+
+
+def _as_long_mask(position):
+    # "Long"/"Short" 문자열 배열 또는 bool 배열(True = 롱)을 모두 허용
+    # 문자열 비교는 느리므로 대량 처리에는 bool 배열을 넘기는 것이 좋다
+    position = np.asarray(position)
+    if position.dtype == np.bool_:
+        return position
+    return position == "Long"
+
+
+def calculate_batch(entry_price, target_price, leverage, position, capital_usd, exchange_rate, fee_rate,
+                    fee_sides=1):
+    entry_price = np.asarray(entry_price, dtype=np.float64)
+    target_price = np.asarray(target_price, dtype=np.float64)
+    # int 레버리지도 float64 로 한 번만 변환 (파이썬 int * float 와 같은 값)
+    leverage = np.asarray(leverage, dtype=np.float64)
+    capital_usd = np.asarray(capital_usd, dtype=np.float64)
+    exchange_rate = np.asarray(exchange_rate, dtype=np.float64)
+    # 수수료는 스칼라 또는 행마다 다른 값 (예: FeeSchedule.rates_batch 결과)
+    fee_rate = np.asarray(fee_rate, dtype=np.float64)
+    is_long = _as_long_mask(position)
+
+    # 스칼라 입력(예: 공통 환율)은 행 길이에 맞춰 브로드캐스트
+    entry_price, target_price, leverage, is_long, capital_usd, exchange_rate, fee_rate = np.broadcast_arrays(
+        entry_price, target_price, leverage, is_long, capital_usd, exchange_rate, fee_rate)
+    shape = entry_price.shape
+    entry_price, target_price, leverage, is_long, capital_usd, exchange_rate, fee_rate = (
+        a.reshape(-1) for a in (entry_price, target_price, leverage, is_long, capital_usd, exchange_rate, fee_rate))
+    n = entry_price.size
+
+    leveraged_percent = np.empty(n)
+    actual_profit_usd = np.empty(n)
+    actual_profit_krw = np.empty(n)
+    side = np.empty(BLOCK_SIZE)
+    fee_impact = np.empty(BLOCK_SIZE)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, n, BLOCK_SIZE):
+            rows = slice(start, start + BLOCK_SIZE)
+            k = min(BLOCK_SIZE, n - start)
+
+            # 기본 수익률 계산 (숏은 부호만 반대: entry - target == -(target - entry))
+            # ±1 을 곱하는 것은 정확한 연산이므로 스칼라 결과와 비트 단위로 같다
+            profit_percent = leveraged_percent[rows]
+            np.subtract(target_price[rows], entry_price[rows], out=profit_percent)
+            np.multiply(is_long[rows], 2.0, out=side[:k])
+            side[:k] -= 1
+            profit_percent *= side[:k]
+            profit_percent /= entry_price[rows]
+            profit_percent *= 100
+
+            # 수수료 반영한 레버리지 수익률
+            np.multiply(leverage[rows], fee_rate[rows], out=fee_impact[:k])
+            fee_impact[:k] *= fee_sides
+            fee_impact[:k] *= 100
+            profit_percent *= leverage[rows]
+            profit_percent -= fee_impact[:k]
+
+            # 실제 수익 계산
+            usd = actual_profit_usd[rows]
+            np.divide(profit_percent, 100, out=usd)
+            usd *= capital_usd[rows]
+            np.multiply(usd, exchange_rate[rows], out=actual_profit_krw[rows])
+
+    # 진입 가격이 0이면 스칼라 경로에서는 ZeroDivisionError -> calculation_error
+    calculation_error = entry_price == 0
+    if calculation_error.any():
+        leveraged_percent[calculation_error] = np.nan
+        actual_profit_usd[calculation_error] = np.nan
+        actual_profit_krw[calculation_error] = np.nan
+
+    return (leveraged_percent.reshape(shape), actual_profit_usd.reshape(shape),
+            actual_profit_krw.reshape(shape), calculation_error.reshape(shape))
@@ -0,0 +1,254 @@
+# feed.py
+# 로컬 가격 피드 (TCP 위 JSON 한 줄 = 틱 하나)
+# - FeedClient: asyncio 로 피드에 접속해 틱을 읽는 클라이언트. 별도 스레드의 이벤트 루프에서 돈다
+# - LatestTicks: 종목별 최신 틱만 남기는 버퍼. 소비자가 가져가기 전에 덮어쓴 틱은 "버려진 틱" 으로 센다
+# - run_stand_in_server: 테스트용 가짜 피드 서버 (랜덤 워크 가격을 초당 rate 개 전송)
+#
+# 틱 형식: {"symbol": "BTCUSDT", "price": 60123.5, "ts": 1700000000123.4}  (ts = 보낸 시각, epoch ms)
+#
+# GUI 스레드는 drain() 으로 최신값만 가져가면 되므로 피드가 아무리 빨라도 화면 갱신 횟수는 늘지 않는다.
+#
+# 사용 예:
+#   python -m tradingcore.feed serve --port 9100 --rate 1000            # 가짜 피드 서버
+#   python -m tradingcore.feed watch --port 9100 --symbol BTCUSDT       # 받은 틱 통계 출력
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9100
+
+
+def parse_tick(line):
+    # (symbol, price, ts) - 형식이 잘못되면 ValueError
+    try:
+        data = json.loads(line)
+        return str(data["symbol"]), float(data["price"]), float(data.get("ts", 0.0))
+    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"잘못된 틱: {line!r}") from e
+
+
+class LatestTicks:
+    # 종목별 최신 틱 (여러 스레드에서 사용)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = {}  # symbol -> (price, 보낸 시각 ms, 받은 시각 ms)
+        self.received = 0
+        self.dropped = 0       # 소비되기 전에 더 새로운 틱으로 덮어쓴 수
+        self.parse_errors = 0
+
+    def put(self, symbol, price, sent_ms, received_ms):
+        with self._lock:
+            self.received += 1
+            if symbol in self._latest:
+                self.dropped += 1
+            self._latest[symbol] = (price, sent_ms, received_ms)
+
+    def drain(self):
+        # 쌓인 최신 틱을 모두 가져가고 비운다
+        with self._lock:
+            latest, self._latest = self._latest, {}
+        return latest
+
+
+class LagStats:
+    # 지연 시간(ms) 누적 통계
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "last_ms": self.last,
+        }
+
+
+class FeedClient:
+    # 백그라운드 스레드에서 피드를 읽어 ticks 버퍼에 넣는다. 연결이 끊기면 reconnect_delay 후 재접속
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, symbols=None, reconnect_delay=1.0, ticks=None):
+        self.host = host
+        self.port = port
+        self.symbols = symbols  # None 이면 모든 종목
+        self.reconnect_delay = reconnect_delay
+        self.ticks = ticks if ticks is not None else LatestTicks()
+        self.connected = False
+        self.connects = 0
+        self.overruns = 0  # 스트림 한도보다 긴 줄 때문에 끊고 다시 접속한 횟수
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_thread, args=(ready,), name="price-feed", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout=2.0):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run_thread(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self.run())
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            self.connected = True
+            self.connects += 1
+            try:
+                if self.symbols:
+                    writer.write((json.dumps({"subscribe": list(self.symbols)}) + "\n").encode())
+                    await writer.drain()
+                await self._read(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                pass
+            except (ValueError, asyncio.LimitOverrunError):
+                # 한도보다 긴 줄은 readline 이 ValueError 로 알린다. 줄 경계를 잃었으므로 연결을 버리고 다시 접속
+                self.overruns += 1
+            finally:
+                self.connected = False
+                writer.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _read(self, reader):
+        ticks = self.ticks
+        symbols = set(self.symbols) if self.symbols else None
+        while True:
+            line = await reader.readline()
+            if not line:
+                return  # 서버가 연결을 닫음
+            try:
+                symbol, price, sent_ms = parse_tick(line)
+            except ValueError:
+                ticks.parse_errors += 1
+                continue
+            if symbols is None or symbol in symbols:
+                ticks.put(symbol, price, sent_ms, time.time() * 1000)
+
+
+# --- 테스트용 가짜 피드 서버 ---
+
+async def run_stand_in_server(host=DEFAULT_HOST, port=DEFAULT_PORT, symbols=("BTCUSDT",), rate=1000,
+                              start_price=100.0, volatility=0.0005, seed=None, ready=None):
+    # 접속한 클라이언트마다 종목별 초당 rate 개의 틱을 보낸다 (구독 메시지가 오면 그 종목만)
+    rng = random.Random(seed)
+
+    async def handle(reader, writer):
+        subscribed = list(symbols)
+        prices = {symbol: start_price for symbol in symbols}
+        interval = 0.01  # 10ms 마다 묶어서 전송
+        per_interval = max(1, int(rate * interval))
+        try:
+            try:
+                line = await asyncio.wait_for(reader.readline(), 0.2)
+                request = json.loads(line) if line else {}
+                if request.get("subscribe"):
+                    subscribed = list(request["subscribe"])
+                    for symbol in subscribed:
+                        prices.setdefault(symbol, start_price)
+            except (asyncio.TimeoutError, json.JSONDecodeError):
+                pass
+            next_time = time.perf_counter()
+            while True:
+                lines = []
+                for _ in range(per_interval):
+                    for symbol in subscribed:
+                        prices[symbol] *= 1 + rng.gauss(0, volatility)
+                        lines.append(json.dumps({"symbol": symbol, "price": round(prices[symbol], 4),
+                                                 "ts": time.time() * 1000}))
+                writer.write(("\n".join(lines) + "\n").encode())
+                await writer.drain()
+                next_time += interval
+                await asyncio.sleep(max(0.0, next_time - time.perf_counter()))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 가격 피드")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="테스트용 가짜 피드 서버 실행")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--symbol", action="append", help="보낼 종목 (여러 번 지정 가능)")
+    serve.add_argument("--rate", type=int, default=1000, help="종목별 초당 틱 수")
+    serve.add_argument("--price", type=float, default=100.0, help="시작 가격")
+    watch = sub.add_parser("watch", help="피드에 접속해 1초마다 통계 출력")
+    watch.add_argument("--host", default=DEFAULT_HOST)
+    watch.add_argument("--port", type=int, default=DEFAULT_PORT)
+    watch.add_argument("--symbol", action="append")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        print(f"가짜 피드: {args.host}:{args.port} (종목별 초당 {args.rate}틱)")
+        try:
+            asyncio.run(run_stand_in_server(args.host, args.port, args.symbol or ["BTCUSDT"],
+                                            args.rate, args.price))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    client = FeedClient(args.host, args.port, args.symbol)
+    client.start()
+    lag = LagStats()
+    try:
+        while True:
+            time.sleep(1.0)
+            now = time.time() * 1000
+            for symbol, (price, sent_ms, _) in sorted(client.ticks.drain().items()):
+                lag.add(now - sent_ms)
+                print(f"{symbol} {price:,.4f}", end="  ")
+            ticks = client.ticks
+            print(f"| 받은 틱 {ticks.received:,} · 버려진 틱 {ticks.dropped:,} · 오류 {ticks.parse_errors}"
+                  f" · 긴 줄 재접속 {client.overruns} · 지연 평균 {lag.summary()['mean_ms']:.1f}ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
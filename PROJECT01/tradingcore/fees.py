@@ -0,0 +1,117 @@
+# fees.py
+# 수수료 모델
+# fee_sides = 1: 진입 명목가치에 한 번만 부과 (codeman / MVC 구현)
+# fee_sides = 2: 진입 + 청산 두 번 부과 (claude / mk1.1 구현)
+from bisect import bisect_right
+
+DEFAULT_FEE_RATE = 0.0005  # 거래소 수수료 (0.05%)
+
+
+def fee_impact_percent(leverage, fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    # 증거금 대비 수수료 (%). fee_sides = 1 이면 leverage * fee_rate * 100 과 같은 값
+    return leverage * fee_rate * fee_sides * 100
+
+
+# --- 구간별 수수료표 (30일 거래량 VIP 구간, 메이커/테이커, 종목별 예외) ---
+#
+# 파일 형식 (JSON):
+#   {
+#     "default": [{"min_volume": 0, "maker": 0.0002, "taker": 0.0005}, ...],
+#     "symbols": {"ETHUSDT": [...], "XRPUSDT": {"maker": 0.0, "taker": 0.0004}}
+#   }
+# 종목 예외는 구간 목록 또는 구간 하나짜리 {"maker", "taker"} 로 적는다.
+#
+# 불러올 때 표마다 구간 하한을 정렬된 배열로 만들어 두므로 한 행 조회는 bisect 한 번이다.
+# 일괄 조회용으로는 모든 표의 구간 하한을 합친 정렬 배열 하나와 (표 x 구간) 수수료 행렬을 만들어
+# searchsorted 한 번 + 인덱싱으로 수백만 행을 처리한다.
+# json / os 는 load_fee_schedule 안에서만 가져온다 (이 모듈은 formula -> fees 로 항상 import 되는데
+# json 이 끌어오는 re/enum 만으로 import tradingcore 시간이 두세 배가 된다)
+DEFAULT_SCHEDULE_FILE = "fee_schedule.json"  # 이 패키지 폴더 안의 기본 수수료표
+
+
+def _parse_tiers(spec):
+    if isinstance(spec, dict):
+        spec = [dict(spec, min_volume=spec.get("min_volume", 0))]
+    tiers = sorted((float(t["min_volume"]), float(t["maker"]), float(t["taker"])) for t in spec)
+    if not tiers or tiers[0][0] > 0:
+        raise ValueError("수수료 구간은 거래량 0 부터 시작해야 합니다")
+    return tiers
+
+
+class FeeSchedule:
+    def __init__(self, default_tiers, symbol_tiers=None):
+        # 표 0 = 기본 표, 1.. = 종목 예외
+        tables = [_parse_tiers(default_tiers)]
+        self.symbol_index = {}
+        for symbol, spec in (symbol_tiers or {}).items():
+            self.symbol_index[symbol] = len(tables)
+            tables.append(_parse_tiers(spec))
+        self.floors = [[t[0] for t in tiers] for tiers in tables]
+        self.makers = [[t[1] for t in tiers] for tiers in tables]
+        self.takers = [[t[2] for t in tiers] for tiers in tables]
+        self._arrays = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["default"], data.get("symbols"))
+
+    def table_index(self, symbol):
+        # 예외가 없는 종목은 기본 표
+        return self.symbol_index.get(symbol, 0)
+
+    def tier_index(self, symbol=None, volume_30d=0.0):
+        table = self.table_index(symbol)
+        return table, max(bisect_right(self.floors[table], volume_30d) - 1, 0)
+
+    def rate(self, symbol=None, volume_30d=0.0, maker=False):
+        table, k = self.tier_index(symbol, volume_30d)
+        return self.makers[table][k] if maker else self.takers[table][k]
+
+    # --- 일괄 조회 (numpy) ---
+
+    def _table_arrays(self):
+        if self._arrays is None:
+            import numpy as np
+            # 모든 표의 구간 하한을 합친 정렬 배열 -> 각 칸마다 표별 수수료를 미리 채운다
+            breakpoints = np.array(sorted({floor for floors in self.floors for floor in floors}))
+            maker = np.empty((len(self.floors), breakpoints.size))
+            taker = np.empty((len(self.floors), breakpoints.size))
+            for table, floors in enumerate(self.floors):
+                k = np.searchsorted(np.array(floors), breakpoints, side="right") - 1
+                maker[table] = np.array(self.makers[table])[k]
+                taker[table] = np.array(self.takers[table])[k]
+            self._arrays = (breakpoints, maker, taker)
+        return self._arrays
+
+    def table_codes(self, symbols):
+        # 종목 문자열 배열 -> 표 번호 배열 (같은 종목이 반복되면 고유값만 사전 조회)
+        import numpy as np
+        symbols = np.asarray(symbols)
+        unique, inverse = np.unique(symbols, return_inverse=True)
+        codes = np.array([self.symbol_index.get(s, 0) for s in unique.tolist()], dtype=np.intp)
+        return codes[inverse].reshape(symbols.shape)
+
+    def rates_batch(self, symbols, volume_30d, maker=False):
+        # symbols: 종목 문자열 배열 또는 table_codes() 결과(정수 배열), None 이면 모두 기본 표
+        import numpy as np
+        breakpoints, maker_table, taker_table = self._table_arrays()
+        volume_30d = np.asarray(volume_30d, dtype=np.float64)
+        if symbols is None:
+            codes = np.zeros(volume_30d.shape, dtype=np.intp)
+        else:
+            codes = np.asarray(symbols)
+            if codes.dtype.kind not in "iu":
+                codes = self.table_codes(codes)
+        column = np.maximum(np.searchsorted(breakpoints, volume_30d, side="right") - 1, 0)
+        maker = np.asarray(maker, dtype=np.bool_)
+        return np.where(maker, maker_table[codes, column], taker_table[codes, column])
+
+
+def load_fee_schedule(path=None):
+    import json
+    import os
+
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_SCHEDULE_FILE)
+    with open(path, "r", encoding="utf-8") as f:
+        return FeeSchedule.from_dict(json.load(f))
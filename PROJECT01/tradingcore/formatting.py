@@ -0,0 +1,10 @@
+# formatting.py
+# 결과 표시용 문자열 (모든 GUI 구현이 같은 형식을 사용)
+
+
+def format_percent(value):
+    return f"{value:.2f}%"
+
+
+def format_money(usd, krw):
+    return f"${usd:,.2f} (₩{krw:,.0f})"
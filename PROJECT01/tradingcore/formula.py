@@ -0,0 +1,27 @@
+# formula.py
+# 레버리지/수수료를 반영한 손익 계산 (GUI 의존성 없음)
+from .fees import DEFAULT_FEE_RATE, fee_impact_percent
+
+
+def profit_percent(entry, target, position):
+    # 기본 수익률 (%)
+    if position == 'Long':
+        return ((target - entry) / entry * 100)
+    return ((entry - target) / entry * 100)
+
+
+def calculate(entry, target, leverage, capital, rate, position, fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    # mk1.1 의 TradingCalculatorModel.calculate 와 같은 인자 순서
+    # 반환: (수수료 반영 레버리지 수익률 %, 수익 USD, 수익 KRW)
+    # entry 가 0 이면 ZeroDivisionError
+    leveraged_percent = (profit_percent(entry, target, position) * leverage) - fee_impact_percent(
+        leverage, fee_rate, fee_sides)
+    profit_usd = capital * (leveraged_percent / 100)
+    profit_krw = profit_usd * rate
+    return leveraged_percent, profit_usd, profit_krw
+
+
+def final_capital(capital, profit_usd, rate):
+    # 최종 자산 (USD, KRW)
+    final_usd = capital + profit_usd
+    return final_usd, final_usd * rate
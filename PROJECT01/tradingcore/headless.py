@@ -0,0 +1,262 @@
+# headless.py
+# 화면 없이 CSV/JSONL 거래 파일을 스트리밍으로 계산하는 명령줄 모드
+#
+# 사용 예:
+#   python -m tradingcore.headless trades.csv -o results.csv
+#   python -m tradingcore.headless trades.jsonl -o results.jsonl --chunk-size 50000
+#   cat trades.csv | python -m tradingcore.headless - --input-format csv > results.csv
+#   python -m tradingcore.headless trades.csv -o results.csv --fee-schedule tradingcore/fee_schedule.json
+#   python -m tradingcore.headless trades.csv -o results.csv --book btcusdt_depth.json
+#
+# 입력 열: entry_price, target_price, leverage, position, capital_usd, exchange_rate
+# (capital_usd / exchange_rate 가 없으면 --capital / --exchange-rate 값을 사용)
+# --fee-schedule 을 주면 행마다 symbol, volume_30d, maker 열로 수수료를 정한다 (fees.FeeSchedule)
+# --book 을 주면 호가창 스냅샷의 슬리피지를 반영한 체결가로 계산한다 (slippage.OrderBook, 잔량 초과 행은 오류)
+# 출력 열: 입력 열 + leveraged_percent, profit_usd, profit_krw, error
+#
+# 입력은 chunk-size 행씩 읽어 계산하고 곧바로 출력하므로
+# 파일 크기와 관계없이 메모리 사용량이 일정하다.
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+
+from .fees import DEFAULT_FEE_RATE, load_fee_schedule
+from .formula import calculate
+from .margin import MAX_LEVERAGE, MIN_LEVERAGE
+from .slippage import calculate_with_slippage, load_order_book
+
+RESULT_FIELDS = ["leveraged_percent", "profit_usd", "profit_krw", "error"]
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def read_rows(stream, input_format):
+    # 한 행씩 dict 로 읽어오는 제너레이터 (파일 전체를 메모리에 올리지 않음)
+    if input_format == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                # 잘못된 줄(JSON 이 아니거나 객체가 아님)은 빈 행으로 넘겨 오류 행(error=1)으로 기록하고 순서를 유지
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = {}
+                yield row if isinstance(row, dict) else {}
+
+
+def iter_chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_row(row, default_capital, default_rate):
+    # 잘못된 값이 있으면 ValueError/TypeError
+    # 레버리지는 1~125 사이의 정수만 (10.9 를 10 으로 자르지 않음), 방향은 Long/Short 만 (대소문자 무시, 비어 있으면 Long)
+    capital = row.get("capital_usd")
+    rate = row.get("exchange_rate")
+    leverage = float(row["leverage"])
+    if not (MIN_LEVERAGE <= leverage <= MAX_LEVERAGE) or leverage != int(leverage):
+        raise ValueError("레버리지는 1~125 사이의 정수여야 합니다")
+    position = row.get("position")
+    position = str(position).strip().capitalize() if position not in (None, "") else "Long"
+    if position not in ("Long", "Short"):
+        raise ValueError("포지션은 Long 또는 Short 여야 합니다")
+    return (
+        float(row["entry_price"]),
+        float(row["target_price"]),
+        int(leverage),
+        float(capital) if capital not in (None, "") else default_capital,
+        float(rate) if rate not in (None, "") else default_rate,
+        position,
+    )
+
+
+def parse_fee_key(row):
+    # 수수료표 조회에 쓰는 (symbol, volume_30d, maker)
+    volume = row.get("volume_30d")
+    maker = str(row.get("maker", "")).strip().lower() in ("1", "true", "yes", "maker")
+    return str(row.get("symbol") or ""), float(volume) if volume not in (None, "") else 0.0, maker
+
+
+def calculate_chunk(chunk, default_capital, default_rate, vectorized, fee_rate=DEFAULT_FEE_RATE, fee_sides=1,
+                    fee_schedule=None, order_book=None):
+    # 한 묶음을 계산해 행마다 (pct, usd, krw) 또는 None(입력 오류) 목록을 반환
+    parsed = []
+    fee_keys = []
+    for row in chunk:
+        # 두 값을 모두 읽은 뒤에 한 번만 넣는다 (수수료 칸만 잘못돼도 parsed 와 fee_keys 길이가 같아야 함)
+        try:
+            values = parse_row(row, default_capital, default_rate)
+            fee_key = parse_fee_key(row) if fee_schedule is not None else None
+        except (KeyError, ValueError, TypeError):
+            parsed.append(None)
+            continue
+        parsed.append(values)
+        if fee_schedule is not None:
+            fee_keys.append(fee_key)
+
+    if vectorized:
+        valid = [p for p in parsed if p is not None]
+        if valid:
+            entry, target, leverage, capital, rate, position = zip(*valid)
+            from .batch import calculate_batch
+            if fee_schedule is not None:
+                symbols, volumes, makers = zip(*fee_keys)
+                fee_rate = fee_schedule.rates_batch(symbols, volumes, makers)
+            is_long = [p == "Long" for p in position]
+            if order_book is not None:
+                from .slippage import calculate_with_slippage_batch
+                pct, usd, krw, errors = calculate_with_slippage_batch(
+                    order_book, entry, target, leverage, is_long, capital, rate, fee_rate, fee_sides)[:4]
+            else:
+                pct, usd, krw, errors = calculate_batch(
+                    entry, target, leverage, is_long, capital, rate, fee_rate, fee_sides)
+            batch_results = iter(zip(pct.tolist(), usd.tolist(), krw.tolist(), errors.tolist()))
+        results = []
+        for p in parsed:
+            if p is None:
+                results.append(None)
+            else:
+                pct, usd, krw, error = next(batch_results)
+                results.append(None if error else (pct, usd, krw))
+        return results
+
+    results = []
+    fee_keys = iter(fee_keys)
+    for p in parsed:
+        if p is None:
+            results.append(None)
+            continue
+        if fee_schedule is not None:
+            fee_rate = fee_schedule.rate(*next(fee_keys))
+        try:
+            if order_book is not None:
+                results.append(calculate_with_slippage(order_book, *p, fee_rate=fee_rate, fee_sides=fee_sides)[:3])
+            else:
+                results.append(calculate(*p, fee_rate=fee_rate, fee_sides=fee_sides))
+        except (ZeroDivisionError, ValueError):
+            results.append(None)
+    return results
+
+
+class CsvResultWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = None
+
+    def write(self, row, result):
+        if self.writer is None:
+            # 첫 행의 열 순서를 유지하고 결과 열을 뒤에 붙인다
+            fieldnames = list(row.keys()) + [f for f in RESULT_FIELDS if f not in row]
+            self.writer = csv.DictWriter(self.stream, fieldnames=fieldnames, extrasaction="ignore")
+            self.writer.writeheader()
+        out = dict(row)
+        if result is None:
+            out.update(leveraged_percent="", profit_usd="", profit_krw="", error=1)
+        else:
+            out.update(leveraged_percent=result[0], profit_usd=result[1], profit_krw=result[2], error=0)
+        self.writer.writerow(out)
+
+
+class JsonlResultWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, row, result):
+        out = dict(row)
+        if result is None:
+            out.update(leveraged_percent=None, profit_usd=None, profit_krw=None, error=True)
+        else:
+            out.update(leveraged_percent=result[0], profit_usd=result[1], profit_krw=result[2], error=False)
+        self.stream.write(json.dumps(out, ensure_ascii=False))
+        self.stream.write("\n")
+
+
+def guess_format(path, explicit):
+    if explicit:
+        return explicit
+    if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def run(input_stream, output_stream, input_format, output_format, chunk_size=DEFAULT_CHUNK_SIZE,
+        fee_rate=DEFAULT_FEE_RATE, fee_sides=1, default_capital=1000.0, default_rate=1450.0, vectorized=None,
+        fee_schedule=None, order_book=None):
+    if vectorized is None:
+        # numpy 가 있으면 묶음 단위 벡터화 계산, 없으면 행 단위 계산
+        try:
+            import numpy  # noqa: F401
+            vectorized = True
+        except ImportError:
+            vectorized = False
+
+    writer = CsvResultWriter(output_stream) if output_format == "csv" else JsonlResultWriter(output_stream)
+
+    total = 0
+    errors = 0
+    for chunk in iter_chunks(read_rows(input_stream, input_format), chunk_size):
+        results = calculate_chunk(chunk, default_capital, default_rate, vectorized, fee_rate, fee_sides,
+                                  fee_schedule, order_book)
+        for row, result in zip(chunk, results):
+            writer.write(row, result)
+            if result is None:
+                errors += 1
+        output_stream.flush()
+        total += len(chunk)
+    return total, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="트레이딩 수익/손실 일괄 계산 (화면 없음)")
+    parser.add_argument("input", help="입력 파일 경로 (CSV/JSONL, '-' 는 표준 입력)")
+    parser.add_argument("-o", "--output", default="-", help="출력 파일 경로 ('-' 는 표준 출력)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--fee-rate", type=float, default=DEFAULT_FEE_RATE, help="거래소 수수료 (기본 0.0005)")
+    parser.add_argument("--fee-sides", type=int, choices=[1, 2], default=1,
+                        help="수수료 부과 횟수 (1: 진입 시 한 번, 2: 진입 + 청산)")
+    parser.add_argument("--fee-schedule", help="구간별 수수료표 JSON (지정하면 --fee-rate 대신 사용)")
+    parser.add_argument("--book", help="슬리피지를 반영할 호가창 스냅샷 JSON")
+    parser.add_argument("--capital", type=float, default=1000.0, help="capital_usd 열이 없을 때 사용할 투자금")
+    parser.add_argument("--exchange-rate", type=float, default=1450.0, help="exchange_rate 열이 없을 때 사용할 환율")
+    parser.add_argument("--no-vectorize", action="store_true", help="numpy 없이 행 단위로 계산")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size 는 1 이상이어야 합니다")
+
+    fee_schedule = load_fee_schedule(args.fee_schedule) if args.fee_schedule else None
+    order_book = load_order_book(args.book) if args.book else None
+    input_format = guess_format(args.input, args.input_format)
+    output_format = args.output_format or (guess_format(args.output, None) if args.output != "-" else input_format)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, "r", newline="", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        total, errors = run(input_stream, output_stream, input_format, output_format,
+                            chunk_size=args.chunk_size, fee_rate=args.fee_rate, fee_sides=args.fee_sides,
+                            default_capital=args.capital, default_rate=args.exchange_rate,
+                            vectorized=False if args.no_vectorize else None, fee_schedule=fee_schedule,
+                            order_book=order_book)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(f"{total}행 처리 완료 (오류 {errors}행)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+# history.py
+# SQLite 거래 기록 (종목 / 기간 / 방향 / 레버리지 구간별 조회와 일·주 단위 손익 집계)
+# - trades: 거래 한 건 = 한 행. 종목은 symbols 테이블의 정수 id 로 저장
+#   인덱스: (closed_ts), (symbol_id, closed_ts) - 기간 조회와 종목 + 기간 조회가 인덱스 범위 검색이 된다
+# - daily: (날짜, 종목, 방향, 레버리지 구간) 별 거래 수 / 이긴 수 / 손익 합계
+#   거래를 넣을 때 같은 트랜잭션에서 함께 갱신하므로 집계/누적 합계는 거래 수와 무관하게
+#   (일 수 x 조합 수) 행만 읽는다. 수천만 건이어도 파이썬으로 불러오지 않는다
+# - 넣기는 executemany 를 batch_size 건씩 묶어 한 트랜잭션에서 처리
+#   빈 테이블에 대량으로 넣을 때는 인덱스를 지웠다가 마지막에 한 번에 다시 만든다
+# - 조회 SQL 은 필터 조합마다 고정된 문자열이라 sqlite3 의 문장 캐시(cached_statements)에서 재사용된다
+#
+# 날짜 경계는 utc_offset_hours (DB 를 만들 때 정하고 meta 에 저장) 기준 자정, 주는 월요일 시작.
+#
+# 사용 예:
+#   python -m tradingcore.history history.db import trades.journal --symbol BTCUSDT
+#   python -m tradingcore.history history.db summary --period week --symbol BTCUSDT --from 2024-01-01
+import argparse
+import sqlite3
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+DAY_MS = 86400000
+DEFAULT_BATCH_SIZE = 50000
+
+# 레버리지 구간: 1-4, 5-9, 10-19, 20-49, 50-99, 100+
+LEVERAGE_BUCKETS = (1, 5, 10, 20, 50, 100)
+
+# add_trades 에 넘기는 튜플의 순서
+TRADE_FIELDS = ("symbol", "opened_ts", "closed_ts", "side", "leverage", "entry_price", "exit_price",
+                "capital_usd", "exchange_rate", "fee_rate", "leveraged_percent", "profit_usd", "profit_krw",
+                "reason")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS symbols (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    symbol_id INTEGER NOT NULL REFERENCES symbols(id),
+    opened_ts INTEGER NOT NULL,
+    closed_ts INTEGER NOT NULL,
+    side INTEGER NOT NULL,
+    leverage INTEGER NOT NULL,
+    entry_price REAL NOT NULL,
+    exit_price REAL NOT NULL,
+    capital_usd REAL NOT NULL,
+    exchange_rate REAL NOT NULL,
+    fee_rate REAL NOT NULL,
+    leveraged_percent REAL NOT NULL,
+    profit_usd REAL NOT NULL,
+    profit_krw REAL NOT NULL,
+    reason TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily (
+    day INTEGER NOT NULL,
+    symbol_id INTEGER NOT NULL,
+    side INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    profit_usd REAL NOT NULL,
+    profit_krw REAL NOT NULL,
+    PRIMARY KEY (day, symbol_id, side, bucket)
+) WITHOUT ROWID;
+"""
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS trades_closed ON trades (closed_ts)",
+    "CREATE INDEX IF NOT EXISTS trades_symbol_closed ON trades (symbol_id, closed_ts)",
+)
+INDEX_NAMES = ("trades_closed", "trades_symbol_closed")
+
+INSERT_TRADE = ("INSERT INTO trades (symbol_id, opened_ts, closed_ts, side, leverage, entry_price, exit_price, "
+                "capital_usd, exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw, reason) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+UPSERT_DAILY = ("INSERT INTO daily (day, symbol_id, side, bucket, count, wins, profit_usd, profit_krw) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (day, symbol_id, side, bucket) DO UPDATE SET "
+                "count = count + excluded.count, wins = wins + excluded.wins, "
+                "profit_usd = profit_usd + excluded.profit_usd, profit_krw = profit_krw + excluded.profit_krw")
+
+
+def leverage_bucket(leverage):
+    # LEVERAGE_BUCKETS 안의 위치 (1배 미만도 0)
+    return max(0, bisect_right(LEVERAGE_BUCKETS, leverage) - 1)
+
+
+def bucket_label(bucket):
+    low = LEVERAGE_BUCKETS[bucket]
+    if bucket + 1 < len(LEVERAGE_BUCKETS):
+        return f"{low}-{LEVERAGE_BUCKETS[bucket + 1] - 1}x"
+    return f"{low}x+"
+
+
+def _side_code(side):
+    # 'Long' / 'Short' 또는 1 / -1
+    if side in ('Long', 1):
+        return 1
+    if side in ('Short', -1):
+        return -1
+    raise ValueError(f"알 수 없는 포지션 방향: {side}")
+
+
+class TradeHistory:
+    def __init__(self, path=":memory:", utc_offset_hours=0):
+        self.path = path
+        self.conn = sqlite3.connect(path, cached_statements=256)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.conn.execute("PRAGMA cache_size = -65536")  # 64MB
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            for sql in INDEXES:
+                self.conn.execute(sql)
+            self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('utc_offset_hours', ?)", (str(utc_offset_hours),))
+        # 이미 있는 DB 는 만들 때의 기준 시간대를 따른다
+        stored = self.conn.execute("SELECT value FROM meta WHERE key = 'utc_offset_hours'").fetchone()[0]
+        self.utc_offset_hours = float(stored)
+        self.offset_ms = int(self.utc_offset_hours * 3600000)
+        self._symbol_ids = {name: symbol_id for symbol_id, name in self.conn.execute("SELECT id, name FROM symbols")}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # --- 넣기 ---
+
+    def day_of(self, ts_ms):
+        # 기준 시간대의 날짜 번호 (1970-01-01 = 0)
+        return (ts_ms + self.offset_ms) // DAY_MS
+
+    def add_trade(self, symbol, opened_ts, closed_ts, side, leverage, entry_price, exit_price, capital_usd,
+                  exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw, reason="manual"):
+        return self.add_trades([(symbol, opened_ts, closed_ts, side, leverage, entry_price, exit_price,
+                                 capital_usd, exchange_rate, fee_rate, leveraged_percent, profit_usd,
+                                 profit_krw, reason)])
+
+    def add_trades(self, trades, batch_size=DEFAULT_BATCH_SIZE, rebuild_indexes=None):
+        # trades: TRADE_FIELDS 순서의 튜플 iterable. 넣은 건수 반환
+        # 전체를 한 트랜잭션으로 처리하므로 중간에 잘못된 행이 있으면 아무것도 들어가지 않는다
+        # rebuild_indexes=None 이면 테이블이 비어 있을 때만 인덱스를 나중에 만든다
+        conn = self.conn
+        if rebuild_indexes is None:
+            rebuild_indexes = conn.execute("SELECT 1 FROM trades LIMIT 1").fetchone() is None
+        symbol_ids = dict(self._symbol_ids)
+        count = 0
+        try:
+            with conn:
+                if rebuild_indexes:
+                    for name in INDEX_NAMES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                rows = []
+                daily = {}
+                for trade in trades:
+                    (symbol, opened_ts, closed_ts, side, leverage, entry_price, exit_price, capital_usd,
+                     exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw, reason) = trade
+                    symbol_id = symbol_ids.get(symbol)
+                    if symbol_id is None:
+                        symbol_id = conn.execute("INSERT INTO symbols (name) VALUES (?)", (symbol,)).lastrowid
+                        symbol_ids[symbol] = symbol_id
+                    side = _side_code(side)
+                    closed_ts = int(closed_ts)
+                    rows.append((symbol_id, int(opened_ts), closed_ts, side, int(leverage), entry_price, exit_price,
+                                 capital_usd, exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw,
+                                 reason))
+                    key = ((closed_ts + self.offset_ms) // DAY_MS, symbol_id, side, leverage_bucket(leverage))
+                    totals = daily.get(key)
+                    if totals is None:
+                        daily[key] = [1, 1 if profit_usd > 0 else 0, profit_usd, profit_krw]
+                    else:
+                        totals[0] += 1
+                        if profit_usd > 0:
+                            totals[1] += 1
+                        totals[2] += profit_usd
+                        totals[3] += profit_krw
+                    if len(rows) >= batch_size:
+                        conn.executemany(INSERT_TRADE, rows)
+                        count += len(rows)
+                        rows = []
+                if rows:
+                    conn.executemany(INSERT_TRADE, rows)
+                    count += len(rows)
+                conn.executemany(UPSERT_DAILY, [key + tuple(totals) for key, totals in daily.items()])
+                if rebuild_indexes:
+                    for sql in INDEXES:
+                        conn.execute(sql)
+        except BaseException:
+            # 되돌려진 트랜잭션에서 만든 종목 id 는 버린다
+            self._symbol_ids = {name: symbol_id for symbol_id, name in conn.execute("SELECT id, name FROM symbols")}
+            raise
+        self._symbol_ids = symbol_ids
+        return count
+
+    def import_journal(self, reader, symbol, start_ms=None, end_ms=None, batch_size=DEFAULT_BATCH_SIZE):
+        # journal.JournalReader 의 종료된 거래(kind = trade)를 한 종목 이름으로 가져온다
+        from .journal import KIND_TRADE, REASON_CODES
+        reasons = {code: name for name, code in REASON_CODES.items()}
+        rows = reader.scan(start_ms, end_ms, kind=KIND_TRADE)
+
+        def trades():
+            # 묶음 단위로 tolist() 해서 파이썬 객체는 batch_size 건만 만든다
+            for lo in range(0, len(rows["ts"]), batch_size):
+                part = {name: values[lo:lo + batch_size].tolist() for name, values in rows.items()}
+                for i in range(len(part["ts"])):
+                    yield (symbol, part["opened_ts"][i], part["ts"][i], part["side"][i], part["leverage"][i],
+                           part["entry_price"][i], part["exit_price"][i], part["capital_usd"][i],
+                           part["exchange_rate"][i], part["fee_rate"][i], part["leveraged_percent"][i],
+                           part["profit_usd"][i], part["profit_krw"][i], reasons.get(part["reason"][i], ""))
+
+        return self.add_trades(trades(), batch_size)
+
+    # --- 조회 ---
+
+    def _filters(self, symbol, start_ms, end_ms, side, bucket, ts_column, day_based):
+        # (WHERE 절, 인자). 같은 필터 조합이면 SQL 문자열이 같아 캐시된 문장을 다시 쓴다
+        clauses = []
+        params = []
+        if symbol is not None:
+            symbol_id = self._symbol_ids.get(symbol)
+            clauses.append("symbol_id = ?")
+            params.append(-1 if symbol_id is None else symbol_id)
+        if start_ms is not None:
+            clauses.append(f"{ts_column} >= ?")
+            params.append(self.day_of(start_ms) if day_based else start_ms)
+        if end_ms is not None:
+            clauses.append(f"{ts_column} < ?")
+            params.append(self.day_of(end_ms) if day_based else end_ms)
+        if side is not None:
+            clauses.append("side = ?")
+            params.append(_side_code(side))
+        if bucket is not None:
+            if day_based:
+                clauses.append("bucket = ?")
+                params.append(bucket)
+            else:
+                low = LEVERAGE_BUCKETS[bucket]
+                high = LEVERAGE_BUCKETS[bucket + 1] if bucket + 1 < len(LEVERAGE_BUCKETS) else None
+                clauses.append("leverage >= ?" if high is None else "leverage >= ? AND leverage < ?")
+                params.extend([low] if high is None else [low, high])
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def trades(self, symbol=None, start_ms=None, end_ms=None, side=None, bucket=None, limit=1000):
+        # 조건에 맞는 거래를 종료 시각 역순으로 limit 건 (TRADE_FIELDS 순서의 튜플)
+        where, params = self._filters(symbol, start_ms, end_ms, side, bucket, "closed_ts", False)
+        sql = ("SELECT s.name, opened_ts, closed_ts, side, leverage, entry_price, exit_price, capital_usd, "
+               "exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw, reason "
+               "FROM trades JOIN symbols s ON s.id = symbol_id" + where + " ORDER BY closed_ts DESC LIMIT ?")
+        return self.conn.execute(sql, params + [limit]).fetchall()
+
+    def aggregate(self, period="day", symbol=None, start_ms=None, end_ms=None, side=None, bucket=None):
+        # 일/주 단위 손익 [(기간 시작 epoch ms, 거래 수, 이긴 수, 손익 USD, 손익 KRW), ...]
+        # daily 집계 테이블에서 계산하므로 start_ms / end_ms 는 그 시각이 속한 날짜로 내림된다
+        if period == "day":
+            group = "day"
+        elif period == "week":
+            group = "(day + 3) / 7 * 7 - 3"  # 1970-01-01 은 목요일 -> 월요일로 내림
+        else:
+            raise ValueError(f"알 수 없는 집계 단위: {period}")
+        where, params = self._filters(symbol, start_ms, end_ms, side, bucket, "day", True)
+        sql = (f"SELECT {group} AS period, SUM(count), SUM(wins), SUM(profit_usd), SUM(profit_krw) "
+               f"FROM daily{where} GROUP BY period ORDER BY period")
+        return [(period_day * DAY_MS - self.offset_ms, count, wins, usd, krw)
+                for period_day, count, wins, usd, krw in self.conn.execute(sql, params)]
+
+    def totals(self, symbol=None, start_ms=None, end_ms=None, side=None, bucket=None):
+        # 누적 합계 (daily 테이블만 읽음)
+        where, params = self._filters(symbol, start_ms, end_ms, side, bucket, "day", True)
+        sql = f"SELECT SUM(count), SUM(wins), SUM(profit_usd), SUM(profit_krw) FROM daily{where}"
+        count, wins, usd, krw = self.conn.execute(sql, params).fetchone()
+        count = count or 0
+        return {
+            "trades": count,
+            "wins": wins or 0,
+            "win_rate": (wins or 0) / count if count else 0.0,
+            "profit_usd": usd or 0.0,
+            "profit_krw": krw or 0.0,
+        }
+
+    def by_bucket(self, symbol=None, start_ms=None, end_ms=None, side=None):
+        # 레버리지 구간별 [(구간 이름, 거래 수, 이긴 수, 손익 USD, 손익 KRW), ...]
+        where, params = self._filters(symbol, start_ms, end_ms, side, None, "day", True)
+        sql = (f"SELECT bucket, SUM(count), SUM(wins), SUM(profit_usd), SUM(profit_krw) "
+               f"FROM daily{where} GROUP BY bucket ORDER BY bucket")
+        return [(bucket_label(bucket),) + tuple(rest) for bucket, *rest in self.conn.execute(sql, params)]
+
+    def rebuild_daily(self):
+        # daily 테이블을 trades 에서 다시 계산 (직접 trades 를 고친 뒤 사용)
+        with self.conn:
+            self.conn.execute("DELETE FROM daily")
+            case = " ".join(f"WHEN leverage >= {low} THEN {k}" for k, low in reversed(list(enumerate(LEVERAGE_BUCKETS))))
+            self.conn.execute(
+                f"INSERT INTO daily SELECT (closed_ts + ?) / {DAY_MS} AS d, symbol_id, side, "
+                f"CASE {case} ELSE 0 END AS b, COUNT(*), SUM(profit_usd > 0), SUM(profit_usd), SUM(profit_krw) "
+                f"FROM trades GROUP BY d, symbol_id, side, b", (self.offset_ms,))
+
+
+def parse_day(text):
+    # "2024-01-31" (UTC 자정) 또는 epoch ms
+    if text is None:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite 거래 기록")
+    parser.add_argument("db", help="SQLite 파일")
+    parser.add_argument("--utc-offset", type=float, default=0, help="새 DB 의 날짜 기준 시간대 (시간, 예: 9)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="거래 일지(tradingcore.journal)의 종료된 거래 가져오기")
+    imp.add_argument("journal")
+    imp.add_argument("--symbol", required=True)
+    summary = sub.add_parser("summary", help="기간별 손익 집계")
+    summary.add_argument("--period", choices=["day", "week"], default="day")
+    summary.add_argument("--symbol")
+    summary.add_argument("--from", dest="start")
+    summary.add_argument("--to", dest="end")
+    summary.add_argument("--side", choices=["Long", "Short"])
+    summary.add_argument("--leverage", type=int, help="이 레버리지가 속한 구간만")
+    args = parser.parse_args(argv)
+
+    with TradeHistory(args.db, args.utc_offset) as history:
+        if args.command == "import":
+            from .journal import JournalReader
+            start = time.perf_counter()
+            with JournalReader(args.journal) as reader:
+                count = history.import_journal(reader, args.symbol)
+            print(f"{count:,}건 가져옴 ({time.perf_counter() - start:.2f}초)")
+            return 0
+
+        bucket = None if args.leverage is None else leverage_bucket(args.leverage)
+        filters = (args.symbol, parse_day(args.start), parse_day(args.end), args.side, bucket)
+        start = time.perf_counter()
+        rows = history.aggregate(args.period, *filters)
+        totals = history.totals(*filters)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for period_ms, count, wins, usd, krw in rows:
+            day = datetime.fromtimestamp((period_ms + history.offset_ms) / 1000, timezone.utc).strftime("%Y-%m-%d")
+            print(f"{day}  {count:>8,}건  승률 {wins / count * 100:6.2f}%  ${usd:>14,.2f}  ₩{krw:>18,.0f}")
+        print(f"합계: {totals['trades']:,}건 (승률 {totals['win_rate'] * 100:.2f}%) "
+              f"${totals['profit_usd']:,.2f} (₩{totals['profit_krw']:,.0f})  [{elapsed_ms:.1f}ms]")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
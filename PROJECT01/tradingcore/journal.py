@@ -0,0 +1,402 @@
+# journal.py
+# 계산한 시나리오와 종료된 거래를 쌓는 추가 전용(append-only) 바이너리 일지
+# - 열(column)마다 고정 폭 파일 하나: <일지 디렉터리>/<열 이름>.col  +  meta.json (스키마, 바이트 순서)
+#   행 i 의 값은 각 열 파일의 i * itemsize 위치에 있으므로 행 수 = 파일 크기 / itemsize
+# - 쓰기(JournalWriter)는 numpy 없이 array 모듈로 버퍼에 모았다가 열 파일 끝에 덧붙인다
+#   중간에 끊겨 열 길이가 어긋나면 다음에 열 때 가장 짧은 열 길이로 잘라 복구한다
+# - 읽기(JournalReader)는 열 파일을 mmap 하고 np.frombuffer 로 복사 없이 배열 뷰를 만든다
+#   수천만 행이라도 여는 데 드는 시간은 파일 크기와 무관하고, 실제로 읽은 페이지만 메모리에 올라온다
+# - ts(epoch ms) 가 줄어들지 않게 쌓이는 동안(meta 의 sorted) 시간 범위 조회는
+#   ts 열에 searchsorted 두 번 + 슬라이스 (역시 복사 없음). 순서가 깨진 일지는 마스크로 골라낸다
+#
+# 사용 예:
+#   python -m tradingcore.journal info history.journal
+#   python -m tradingcore.journal scan history.journal --from 2024-01-01 --to 2024-02-01
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+
+from .fees import DEFAULT_FEE_RATE
+from .formula import calculate
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+DEFAULT_BUFFER_ROWS = 4096
+
+# (열 이름, array 타입 코드, numpy 타입)
+COLUMNS = (
+    ("ts", "q", "i8"),               # 기록 시각 (거래는 종료 시각), epoch ms
+    ("opened_ts", "q", "i8"),        # 진입 시각 (시나리오는 ts 와 같음)
+    ("kind", "b", "i1"),             # KIND_*
+    ("side", "b", "i1"),             # 1 = 롱, -1 = 숏
+    ("reason", "b", "i1"),           # REASON_* (거래 종료 사유)
+    ("leverage", "i", "i4"),
+    ("entry_price", "d", "f8"),
+    ("exit_price", "d", "f8"),       # 시나리오는 목표 가격
+    ("capital_usd", "d", "f8"),
+    ("exchange_rate", "d", "f8"),
+    ("fee_rate", "d", "f8"),
+    ("leveraged_percent", "d", "f8"),
+    ("profit_usd", "d", "f8"),
+    ("profit_krw", "d", "f8"),
+)
+COLUMN_NAMES = tuple(name for name, _, _ in COLUMNS)
+
+KIND_SCENARIO, KIND_TRADE = 0, 1
+KIND_NAMES = {KIND_SCENARIO: "scenario", KIND_TRADE: "trade"}
+
+REASON_NONE, REASON_TARGET, REASON_STOP, REASON_LIQUIDATION, REASON_MANUAL = 0, 1, 2, 3, 4
+REASON_CODES = {"target": REASON_TARGET, "stop": REASON_STOP, "liquidation": REASON_LIQUIDATION,
+                "manual": REASON_MANUAL}
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def _column_path(path, name):
+    return os.path.join(path, name + ".col")
+
+
+def _read_meta(path):
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        raise ValueError(f"일지가 아닙니다: {path}")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 일지 형식입니다: {meta.get('version')}")
+    if [column[0] for column in meta["columns"]] != list(COLUMN_NAMES):
+        raise ValueError("일지의 열 구성이 다릅니다")
+    return meta
+
+
+def _write_meta(path, meta):
+    meta_path = os.path.join(path, META_FILE)
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _stored_rows(path):
+    # 모든 열에 온전히 기록된 행 수
+    rows = None
+    for name, code, _ in COLUMNS:
+        try:
+            size = os.path.getsize(_column_path(path, name))
+        except FileNotFoundError:
+            size = 0
+        count = size // array(code).itemsize
+        rows = count if rows is None else min(rows, count)
+    return rows
+
+
+class JournalWriter:
+    # 행을 버퍼에 모았다가 buffer_rows 개마다 (또는 flush/close 때) 열 파일에 덧붙인다
+    def __init__(self, path, buffer_rows=DEFAULT_BUFFER_ROWS):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        if os.path.exists(os.path.join(path, META_FILE)):
+            self.meta = _read_meta(path)
+            if self.meta["byteorder"] != sys.byteorder:
+                raise ValueError("다른 바이트 순서로 기록된 일지에는 덧붙일 수 없습니다")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.meta = {"version": FORMAT_VERSION, "byteorder": sys.byteorder, "sorted": True, "last_ts": None,
+                         "columns": [[name, dtype] for name, _, dtype in COLUMNS]}
+            _write_meta(path, self.meta)
+
+        # 덜 쓰인 꼬리(열마다 길이가 다름)는 잘라낸다
+        self.rows = _stored_rows(path)
+        self._files = []
+        for name, code, _ in COLUMNS:
+            f = open(_column_path(path, name), "ab")
+            f.truncate(self.rows * array(code).itemsize)
+            self._files.append(f)
+        self._buffers = [array(code) for _, code, _ in COLUMNS]
+        self._pending = 0
+        self._sorted = self.meta["sorted"]
+        self._last_ts = self.meta["last_ts"]
+
+    def __len__(self):
+        return self.rows + self._pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, ts=None, opened_ts=None, kind=KIND_SCENARIO, side=1, reason=REASON_NONE, leverage=1,
+               entry_price=0.0, exit_price=0.0, capital_usd=0.0, exchange_rate=0.0, fee_rate=0.0,
+               leveraged_percent=0.0, profit_usd=0.0, profit_krw=0.0):
+        if ts is None:
+            ts = now_ms()
+        if opened_ts is None:
+            opened_ts = ts
+        values = (ts, opened_ts, kind, side, reason, leverage, entry_price, exit_price, capital_usd,
+                  exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw)
+        appended = 0
+        try:
+            for buffer, value in zip(self._buffers, values):
+                buffer.append(value)
+                appended += 1
+        except (TypeError, OverflowError, ValueError):
+            # 열 하나라도 값을 거부하면 이미 넣은 열을 되돌려 행 정렬을 유지한다
+            for buffer in self._buffers[:appended]:
+                buffer.pop()
+            raise
+        self._track_order(ts, ts)
+        self._pending += 1
+        if self._pending >= self.buffer_rows:
+            self.flush()
+
+    def append_scenario(self, entry_price, target_price, leverage, capital_usd, exchange_rate, position="Long",
+                        fee_rate=DEFAULT_FEE_RATE, fee_sides=2, ts=None):
+        # formula.calculate 로 계산한 결과를 함께 기록. 입력이 잘못되면 ValueError
+        leveraged_percent, profit_usd, profit_krw = calculate(entry_price, target_price, leverage, capital_usd,
+                                                              exchange_rate, position, fee_rate, fee_sides)
+        self.append(ts, None, KIND_SCENARIO, 1 if position == 'Long' else -1, REASON_NONE, leverage,
+                    entry_price, target_price, capital_usd, exchange_rate, fee_rate,
+                    leveraged_percent, profit_usd, profit_krw)
+
+    def append_trade(self, opened_ts, closed_ts, entry_price, exit_price, leverage, capital_usd, exchange_rate,
+                     position, fee_rate, leveraged_percent, profit_usd, profit_krw, reason="manual"):
+        self.append(closed_ts, opened_ts, KIND_TRADE, 1 if position == 'Long' else -1,
+                    REASON_CODES.get(reason, REASON_NONE), leverage, entry_price, exit_price, capital_usd,
+                    exchange_rate, fee_rate, leveraged_percent, profit_usd, profit_krw)
+
+    def append_columns(self, columns):
+        # 여러 행을 열 단위로 한 번에 기록 (columns: 열 이름 -> 같은 길이의 numpy 배열/시퀀스)
+        # 빠진 열은 0, opened_ts 가 없으면 ts 를 쓴다
+        import numpy as np
+        unknown = set(columns) - set(COLUMN_NAMES)
+        if unknown:
+            raise ValueError(f"알 수 없는 열: {', '.join(sorted(unknown))}")
+        if "ts" not in columns:
+            raise ValueError("ts 열이 필요합니다")
+        ts = np.asarray(columns["ts"], dtype=np.int64)
+        n = len(ts)
+        if n == 0:
+            return 0
+        self.flush()
+        order = "<" if sys.byteorder == "little" else ">"
+        prepared = []
+        for name, _, dtype in COLUMNS:
+            if name in columns:
+                values = np.asarray(columns[name], dtype=order + dtype)
+            elif name == "opened_ts":
+                values = ts.astype(order + dtype)
+            else:
+                values = np.zeros(n, dtype=order + dtype)
+            if values.shape != (n,):
+                raise ValueError(f"{name} 열의 길이가 다릅니다")
+            prepared.append(values)
+        self._track_order(int(ts[0]), int(ts[-1]), bool(np.all(ts[1:] >= ts[:-1])))
+        for f, values in zip(self._files, prepared):
+            f.write(values.tobytes())
+        self.rows += n
+        self._commit()
+        return n
+
+    def _track_order(self, first_ts, last_ts, ordered=True):
+        if self._sorted and (not ordered or (self._last_ts is not None and first_ts < self._last_ts)):
+            self._sorted = False
+        if self._last_ts is None or last_ts > self._last_ts:
+            self._last_ts = last_ts
+
+    def flush(self):
+        if self._pending:
+            for f, buffer in zip(self._files, self._buffers):
+                buffer.tofile(f)
+                del buffer[:]
+            self.rows += self._pending
+            self._pending = 0
+        self._commit()
+
+    def _commit(self):
+        for f in self._files:
+            f.flush()
+        if self._sorted != self.meta["sorted"] or self._last_ts != self.meta["last_ts"]:
+            self.meta["sorted"] = self._sorted
+            self.meta["last_ts"] = self._last_ts
+            _write_meta(self.path, self.meta)
+
+    def close(self):
+        if self._files:
+            self.flush()
+            for f in self._files:
+                f.close()
+            self._files = []
+
+
+class JournalReader:
+    # 열 파일을 mmap 해 numpy 배열 뷰로 노출 (읽기 전용, 복사 없음)
+    def __init__(self, path):
+        self.path = path
+        self._maps = []
+        self.columns = {}
+        self.refresh()
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def refresh(self):
+        # 다시 매핑해 그 사이 덧붙은 행까지 보이게 한다
+        import numpy as np
+        self.meta = _read_meta(self.path)
+        order = "<" if self.meta["byteorder"] == "little" else ">"
+        self.close()
+        self.rows = _stored_rows(self.path)
+        self.sorted = self.meta["sorted"]
+        for name, _, dtype in COLUMNS:
+            dtype = np.dtype(order + dtype)
+            if self.rows == 0:
+                self.columns[name] = np.empty(0, dtype=dtype)
+                continue
+            with open(_column_path(self.path, name), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), self.rows * dtype.itemsize, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            self.columns[name] = np.frombuffer(mapped, dtype=dtype, count=self.rows)
+
+    def close(self):
+        # 바깥에 남은 뷰가 있으면 mmap 은 그 뷰가 사라질 때 함께 닫힌다
+        self.columns = {}
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+        self._maps = []
+
+    def range_slice(self, start_ms=None, end_ms=None):
+        # start_ms <= ts < end_ms 인 행의 [시작, 끝) 위치 (정렬된 일지 전용)
+        if not self.sorted:
+            raise ValueError("시간 순서가 아닌 일지는 위치 범위로 나눌 수 없습니다")
+        ts = self.columns["ts"]
+        lo = 0 if start_ms is None else int(ts.searchsorted(start_ms, side="left"))
+        hi = self.rows if end_ms is None else int(ts.searchsorted(end_ms, side="left"))
+        return lo, max(lo, hi)
+
+    def scan(self, start_ms=None, end_ms=None, kind=None, columns=None):
+        # start_ms <= ts < end_ms 인 행을 {열 이름: 배열} 로 반환
+        # 정렬된 일지에서 kind 조건이 없으면 모든 배열이 mmap 위의 슬라이스 (복사 없음)
+        names = COLUMN_NAMES if columns is None else columns
+        if self.sorted:
+            lo, hi = self.range_slice(start_ms, end_ms)
+            selected = {name: self.columns[name][lo:hi] for name in names}
+            if kind is None:
+                return selected
+            mask = self.columns["kind"][lo:hi] == kind
+            return {name: values[mask] for name, values in selected.items()}
+        import numpy as np
+        ts = self.columns["ts"]
+        mask = np.ones(self.rows, dtype=np.bool_) if start_ms is None else ts >= start_ms
+        if end_ms is not None:
+            mask &= ts < end_ms
+        if kind is not None:
+            mask &= self.columns["kind"] == kind
+        return {name: self.columns[name][mask] for name in names}
+
+
+def summarize(rows):
+    # scan 결과의 요약 (거래 수, 승률, 누적 손익)
+    count = len(rows["ts"])
+    if count == 0:
+        return {"rows": 0, "trades": 0, "win_rate": 0.0, "total_profit_usd": 0.0, "total_profit_krw": 0.0,
+                "first_ts": None, "last_ts": None}
+    trades = rows["kind"] == KIND_TRADE
+    n_trades = int(trades.sum())
+    profit_usd = rows["profit_usd"][trades]
+    return {
+        "rows": count,
+        "trades": n_trades,
+        "win_rate": float((profit_usd > 0).sum() / n_trades) if n_trades else 0.0,
+        "total_profit_usd": float(profit_usd.sum()),
+        "total_profit_krw": float(rows["profit_krw"][trades].sum()),
+        "first_ts": int(rows["ts"].min()),
+        "last_ts": int(rows["ts"].max()),
+    }
+
+
+def parse_time(text):
+    # "2024-01-31", "2024-01-31T12:00" (UTC) 또는 epoch ms 숫자
+    if text is None:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError as e:
+        raise ValueError(f"시각 형식을 알 수 없습니다: {text}") from e
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def format_time(ms):
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="거래 일지 조회")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="행 수와 기간 출력")
+    info.add_argument("journal")
+    scan = sub.add_parser("scan", help="기간 안의 거래 요약")
+    scan.add_argument("journal")
+    scan.add_argument("--from", dest="start", help="시작 시각 (포함, UTC ISO 날짜 또는 epoch ms)")
+    scan.add_argument("--to", dest="end", help="끝 시각 (제외)")
+    scan.add_argument("--kind", choices=sorted(KIND_NAMES.values()))
+    scan.add_argument("--show", type=int, default=0, metavar="N", help="마지막 N 행 출력")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with JournalReader(args.journal) as reader:
+        opened_ms = (time.perf_counter() - start) * 1000
+        if args.command == "info":
+            print(f"행 수: {len(reader):,} (열기 {opened_ms:.2f}ms)")
+            if len(reader):
+                ts = reader["ts"]
+                first, last = (int(ts[0]), int(ts[-1])) if reader.sorted else (int(ts.min()), int(ts.max()))
+                print(f"기간: {format_time(first)} ~ {format_time(last)} UTC")
+            print(f"시간 순서: {'예' if reader.sorted else '아니오'}")
+            return 0
+
+        kind = None
+        if args.kind is not None:
+            kind = {name: code for code, name in KIND_NAMES.items()}[args.kind]
+        start = time.perf_counter()
+        rows = reader.scan(parse_time(args.start), parse_time(args.end), kind)
+        s = summarize(rows)
+        scan_ms = (time.perf_counter() - start) * 1000
+        print(f"행 수: {s['rows']:,} (조회 {scan_ms:.2f}ms)")
+        print(f"거래 수: {s['trades']:,} (승률 {s['win_rate'] * 100:.2f}%)")
+        print(f"누적 손익: ${s['total_profit_usd']:,.2f} (₩{s['total_profit_krw']:,.0f})")
+        for i in range(max(0, s["rows"] - args.show), s["rows"]):
+            side = "롱" if rows["side"][i] > 0 else "숏"
+            print(f"{format_time(int(rows['ts'][i]))} {KIND_NAMES.get(int(rows['kind'][i]), '?')} {side} "
+                  f"x{int(rows['leverage'][i])} {rows['entry_price'][i]:,.4f} → {rows['exit_price'][i]:,.4f} "
+                  f"{rows['leveraged_percent'][i]:.2f}% ${rows['profit_usd'][i]:,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
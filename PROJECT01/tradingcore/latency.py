@@ -0,0 +1,255 @@
+# latency.py
+# 단계별 지연 시간 히스토그램과 프로파일링 보조 (GUI / 서비스 계측용, 외부 패키지 없음)
+# - LatencyHistogram: HDR 히스토그램 방식. 값(ns)을 2배 구간마다 같은 개수의 하위 구간으로 나눠 센다
+#   (기본 하위 구간 128개 -> 상대 오차 1% 미만). 기록은 정수 연산과 리스트 한 칸 증가뿐이고
+#   메모리는 값의 범위와 무관하게 수천 칸으로 고정. 백분위수는 구간 경계로 근사한다
+# - LatencyRecorder: 이름별 히스토그램 묶음. stage() 컨텍스트 매니저 또는 wrap() 으로 메서드를 감싸 잰다
+#   wrap 은 인스턴스 속성만 바꾸므로 unwrap_all() 하면 원래대로 돌아가고, 감싸지 않으면 비용이 없다
+# - ProfileSession: cProfile + tracemalloc 을 함께 켜고 끌 때 파일로 저장 (prefix.prof, prefix.txt)
+#
+# 사용 예:
+#   recorder = LatencyRecorder(budget_ms=16)
+#   recorder.wrap(model, "calculate_profit", "model")
+#   with recorder.stage("view"): ...
+#   print(recorder.report())
+import functools
+import time
+
+NS_PER_MS = 1_000_000
+
+
+class LatencyHistogram:
+    def __init__(self, sub_bucket_bits=8):
+        # 값 v < 2^bits 는 그대로, 그 위는 2배 구간마다 2^(bits-1) 개의 하위 구간
+        self.bits = sub_bucket_bits
+        self.half = 1 << (sub_bucket_bits - 1)
+        self.counts = [0] * (1 << sub_bucket_bits)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        shift = value.bit_length() - self.bits
+        if shift <= 0:
+            return value
+        return shift * self.half + (value >> shift)
+
+    def _upper(self, index):
+        # 구간에 들어가는 가장 큰 값
+        if index < 2 * self.half:
+            return index
+        shift = index // self.half - 1
+        return ((index - shift * self.half + 1) << shift) - 1
+
+    def record(self, value):
+        value = int(value)
+        if value < 0:
+            value = 0
+        index = self._index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        # p(0~100) 백분위수. 구간 상한으로 근사하되 실제 최댓값을 넘지 않는다
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))  # 올림
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def count_above(self, value):
+        # value 를 넘는 기록 수 (value 가 든 구간은 제외하므로 구간 폭만큼 적게 셀 수 있음)
+        return sum(self.counts[self._index(int(value)) + 1:])
+
+    def merge(self, other):
+        if other.bits != self.bits:
+            raise ValueError("하위 구간 수가 다른 히스토그램은 합칠 수 없습니다")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+
+    def reset(self):
+        self.counts = [0] * (1 << self.bits)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+
+class LatencyRecorder:
+    def __init__(self, budget_ms=16.0, clock=time.perf_counter_ns):
+        self.budget_ms = budget_ms
+        self.clock = clock
+        self.histograms = {}  # 이름 -> LatencyHistogram (처음 기록한 순서 유지)
+        self._active = set()  # 지금 재고 있는 wrap 단계 (재귀/중첩 호출은 바깥 한 번만 기록)
+        self._wrapped = []    # (객체, 속성 이름)
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def record(self, name, elapsed_ns):
+        self.histogram(name).record(elapsed_ns)
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def wrap(self, obj, attr, name):
+        # obj.attr 호출 시간을 name 단계로 기록. 인스턴스 속성으로 덮어쓰므로 다른 인스턴스에는 영향이 없다
+        func = getattr(obj, attr)
+        histogram = self.histogram(name)
+        clock = self.clock
+        active = self._active
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if name in active:
+                return func(*args, **kwargs)
+            active.add(name)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+                active.discard(name)
+
+        return self.replace(obj, attr, timed)
+
+    def replace(self, obj, attr, func):
+        # 측정용으로 obj.attr 를 func 로 바꾸고 원래 값을 반환 (unwrap_all 에서 되돌림)
+        original = getattr(obj, attr)
+        setattr(obj, attr, func)
+        self._wrapped.append((obj, attr))
+        return original
+
+    def unwrap_all(self):
+        for obj, attr in reversed(self._wrapped):
+            try:
+                delattr(obj, attr)  # 인스턴스 속성을 지우면 클래스 메서드가 다시 보인다
+            except AttributeError:
+                pass
+        self._wrapped = []
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def to_dict(self):
+        # 이름 -> 통계 (ms)
+        budget_ns = self.budget_ms * NS_PER_MS
+        stats = {}
+        for name, h in self.histograms.items():
+            stats[name] = {
+                "count": h.count,
+                "mean_ms": h.mean / NS_PER_MS,
+                "p50_ms": h.percentile(50) / NS_PER_MS,
+                "p90_ms": h.percentile(90) / NS_PER_MS,
+                "p99_ms": h.percentile(99) / NS_PER_MS,
+                "p999_ms": h.percentile(99.9) / NS_PER_MS,
+                "max_ms": h.max / NS_PER_MS,
+                "over_budget": h.count_above(budget_ns),
+            }
+        return stats
+
+    def report(self):
+        # 표 머리글은 열 맞춤을 위해 영문 (한글은 터미널에서 두 칸을 차지)
+        lines = [f"{'stage':<10}{'count':>8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}{'max':>9}"
+                 f"{f'>{self.budget_ms:g}ms':>9}  (ms)"]
+        for name, s in self.to_dict().items():
+            lines.append(f"{name:<10}{s['count']:>8}{s['mean_ms']:>9.3f}{s['p50_ms']:>9.3f}{s['p90_ms']:>9.3f}"
+                         f"{s['p99_ms']:>9.3f}{s['p999_ms']:>9.3f}{s['max_ms']:>9.3f}{s['over_budget']:>9}")
+        return "\n".join(lines)
+
+
+class _Stage:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.recorder.clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, self.recorder.clock() - self.start)
+        return False
+
+
+class ProfileSession:
+    # cProfile (함수별 시간) + tracemalloc (줄별 메모리 할당) 을 함께 켜고, 멈출 때 파일로 저장
+    def __init__(self, prefix="profile", top=30):
+        self.prefix = prefix
+        self.top = top
+        self.profiler = None
+        self._snapshot = None
+
+    @property
+    def running(self):
+        return self.profiler is not None
+
+    def start(self):
+        import cProfile
+        import tracemalloc
+
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._snapshot = tracemalloc.take_snapshot()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        # (cProfile 파일 경로, 요약 텍스트 파일 경로) - 실행 중이 아니면 None
+        import io
+        import pstats
+        import tracemalloc
+
+        if not self.running:
+            return None
+        self.profiler.disable()
+        profiler, self.profiler = self.profiler, None
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        prof_path = self.prefix + ".prof"
+        text_path = self.prefix + ".txt"
+        profiler.dump_stats(prof_path)
+        out = io.StringIO()
+        out.write("# cProfile (누적 시간 순)\n")
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.top)
+        out.write("\n# tracemalloc (시작 이후 늘어난 할당, 줄 단위)\n")
+        for stat in snapshot.compare_to(self._snapshot, "lineno")[:self.top]:
+            out.write(f"{stat}\n")
+        self._snapshot = None
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        return prof_path, text_path
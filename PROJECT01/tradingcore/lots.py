@@ -0,0 +1,290 @@
+# lots.py
+# 거래소 체결 내역(fill)을 한 번 훑으며 포지션 로트를 맞춰 실현 손익을 계산
+# - 종목마다 열린 로트를 deque 로 들고 있다: [수량, 가격, 진입 시각]
+#   fifo: 가장 오래된 로트부터 (popleft) / lifo: 가장 최근 로트부터 (pop)
+#   average: 로트 하나에 평균 단가로 합쳐 둔다
+# - 열린 방향과 반대인 체결은 로트를 닫고, 남는 수량은 반대 방향의 새 포지션이 된다 (롱 -> 숏 전환)
+# - 각 로트는 한 번 들어가고 한 번 나가므로 전체 시간은 체결 수에 비례하고,
+#   메모리는 아직 열린 로트 수만큼만 쓴다 (실현 손익은 만들어지는 대로 내보낸다)
+#
+# 수수료는 formula.calculate 와 같은 모델: 진입 명목가치 x fee_rate x fee_sides
+#   (claude 구현처럼 진입 + 청산이면 fee_sides=2)
+#
+# 체결 형식: (시각 epoch ms, 종목, 방향 "BUY"/"SELL", 수량, 가격) - 시각 순서대로
+#
+# 사용 예:
+#   python -m tradingcore.lots fills.csv --method fifo --exchange-rate 1450
+#   python -m tradingcore.lots fills.csv --method average --history history.db
+import argparse
+import csv
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from .fees import DEFAULT_FEE_RATE
+
+METHODS = ("fifo", "lifo", "average")
+QTY_EPSILON = 1e-12  # 이보다 작게 남은 수량은 0 으로 본다 (부동소수점 나머지)
+
+# 체결 CSV 헤더에서 인정하는 열 이름 (거래소 내보내기 형식마다 다름)
+FILL_COLUMNS = {
+    "ts": ("ts", "time", "timestamp", "date(utc)", "date", "time(utc)"),
+    "symbol": ("symbol", "pair", "market"),
+    "side": ("side", "type"),
+    "qty": ("qty", "quantity", "executed", "amount", "size"),
+    "price": ("price", "avg price", "fill price"),
+}
+
+
+class Realized:
+    # 닫힌 로트 하나 (부분 체결이면 닫힌 만큼만)
+    __slots__ = ("symbol", "position", "qty", "opened_ts", "closed_ts", "entry_price", "exit_price",
+                 "fee_usd", "profit_usd", "profit_krw")
+
+    def __init__(self, symbol, position, qty, opened_ts, closed_ts, entry_price, exit_price,
+                 fee_usd, profit_usd, profit_krw):
+        self.symbol = symbol
+        self.position = position  # 닫힌 포지션 방향 'Long' / 'Short'
+        self.qty = qty
+        self.opened_ts = opened_ts
+        self.closed_ts = closed_ts
+        self.entry_price = entry_price
+        self.exit_price = exit_price
+        self.fee_usd = fee_usd
+        self.profit_usd = profit_usd  # 수수료 차감 후
+        self.profit_krw = profit_krw
+
+    @property
+    def leveraged_percent(self):
+        # 진입 명목가치 대비 수익률 (레버리지 1배 기준)
+        notional = self.qty * self.entry_price
+        return self.profit_usd / notional * 100 if notional else 0.0
+
+    def history_row(self, exchange_rate, fee_rate):
+        # history.TradeHistory.add_trades 형식 (체결 내역에는 레버리지가 없으므로 1배, 투자금 = 진입 명목가치)
+        return (self.symbol, self.opened_ts, self.closed_ts, self.position, 1, self.entry_price, self.exit_price,
+                self.qty * self.entry_price, exchange_rate, fee_rate, self.leveraged_percent,
+                self.profit_usd, self.profit_krw, "fill")
+
+
+class SymbolTotals:
+    def __init__(self):
+        self.closed = 0
+        self.wins = 0
+        self.qty = 0.0
+        self.fee_usd = 0.0
+        self.profit_usd = 0.0
+        self.profit_krw = 0.0
+
+
+class LotMatcher:
+    def __init__(self, method="fifo", fee_rate=DEFAULT_FEE_RATE, fee_sides=2, exchange_rate=1450.0):
+        if method not in METHODS:
+            raise ValueError(f"알 수 없는 매칭 방식: {method}")
+        self.method = method
+        self.fee_rate = fee_rate
+        self.fee_sides = fee_sides
+        self.exchange_rate = exchange_rate
+        self.lots = {}        # symbol -> deque([[수량, 가격, 진입 시각], ...])
+        self.direction = {}   # symbol -> 1 (롱) / -1 (숏), 로트가 없으면 없음
+        self.totals = {}      # symbol -> SymbolTotals
+        self.fills = 0
+        self._last_ts = None
+
+    def fill(self, ts, symbol, side, qty, price):
+        # 체결 하나를 반영하고 이번에 실현된 Realized 목록을 반환
+        if qty <= 0 or price <= 0:
+            raise ValueError("체결 수량과 가격은 0보다 커야 합니다")
+        if self._last_ts is not None and ts < self._last_ts:
+            raise ValueError("체결은 시각 순서대로 넣어야 합니다")
+        self._last_ts = ts
+        self.fills += 1
+        sign = _side_sign(side)
+
+        lots = self.lots.get(symbol)
+        if lots is None:
+            lots = self.lots[symbol] = deque()
+        realized = []
+        direction = self.direction.get(symbol)
+        if direction is not None and direction != sign:
+            qty = self._close(lots, symbol, direction, ts, qty, price, realized)
+            if not lots:
+                del self.direction[symbol]
+        if qty > QTY_EPSILON:
+            self._open(lots, ts, qty, price)
+            self.direction[symbol] = sign
+        return realized
+
+    def _open(self, lots, ts, qty, price):
+        if self.method == "average" and lots:
+            lot = lots[0]
+            total = lot[0] + qty
+            lot[1] = (lot[0] * lot[1] + qty * price) / total
+            lot[0] = total
+        else:
+            lots.append([qty, price, ts])
+
+    def _close(self, lots, symbol, direction, ts, qty, price, realized):
+        # 반대 방향 체결로 로트를 닫고 남은 체결 수량을 반환
+        lifo = self.method == "lifo"
+        position = 'Long' if direction > 0 else 'Short'
+        fee_factor = self.fee_rate * self.fee_sides
+        totals = self.totals.get(symbol)
+        if totals is None:
+            totals = self.totals[symbol] = SymbolTotals()
+        while qty > QTY_EPSILON and lots:
+            lot = lots[-1] if lifo else lots[0]
+            matched = lot[0] if lot[0] <= qty else qty
+            entry_price = lot[1]
+            fee_usd = matched * entry_price * fee_factor
+            profit_usd = (price - entry_price) * matched * direction - fee_usd
+            profit_krw = profit_usd * self.exchange_rate
+            realized.append(Realized(symbol, position, matched, lot[2], ts, entry_price, price,
+                                     fee_usd, profit_usd, profit_krw))
+            totals.closed += 1
+            if profit_usd > 0:
+                totals.wins += 1
+            totals.qty += matched
+            totals.fee_usd += fee_usd
+            totals.profit_usd += profit_usd
+            totals.profit_krw += profit_krw
+
+            qty -= matched
+            lot[0] -= matched
+            if lot[0] <= QTY_EPSILON:
+                if lifo:
+                    lots.pop()
+                else:
+                    lots.popleft()
+        return qty
+
+    def process(self, fills):
+        # fills: (시각, 종목, 방향, 수량, 가격) iterable -> Realized 를 하나씩 내보내는 제너레이터
+        fill = self.fill
+        for ts, symbol, side, qty, price in fills:
+            yield from fill(ts, symbol, side, qty, price)
+
+    def open_positions(self):
+        # {종목: (방향, 수량, 평균 단가)}
+        positions = {}
+        for symbol, lots in self.lots.items():
+            if not lots:
+                continue
+            qty = sum(lot[0] for lot in lots)
+            cost = sum(lot[0] * lot[1] for lot in lots)
+            positions[symbol] = ('Long' if self.direction[symbol] > 0 else 'Short', qty, cost / qty)
+        return positions
+
+    def open_lot_count(self):
+        return sum(len(lots) for lots in self.lots.values())
+
+
+def _side_sign(side):
+    side = side.upper() if isinstance(side, str) else side
+    if side in ("BUY", "B", "LONG", 1):
+        return 1
+    if side in ("SELL", "S", "SHORT", -1):
+        return -1
+    raise ValueError(f"알 수 없는 체결 방향: {side}")
+
+
+def parse_time(text):
+    # epoch ms / epoch 초 / "2024-01-31 12:00:00" (UTC)
+    text = text.strip()
+    try:
+        value = float(text)
+    except ValueError:
+        moment = datetime.fromisoformat(text)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return int(moment.timestamp() * 1000)
+    return int(value if value > 1e11 else value * 1000)
+
+
+def _number(text):
+    # "1,234.5" / "0.01 BTC" 같은 거래소 표기
+    return float(text.replace(",", "").split()[0])
+
+
+def read_fills_csv(path, reverse=False):
+    # 헤더가 있는 체결 CSV 를 (시각, 종목, 방향, 수량, 가격) 으로 읽는 제너레이터
+    # reverse=True 면 최신순으로 내보낸 파일을 뒤집어 읽는다 (파일 전체를 메모리에 올림)
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader)]
+        index = {}
+        for key, names in FILL_COLUMNS.items():
+            found = [header.index(name) for name in names if name in header]
+            if not found:
+                raise ValueError(f"체결 파일에 {key} 열이 없습니다")
+            index[key] = found[0]
+        ts_i, symbol_i, side_i, qty_i, price_i = (index[key] for key in ("ts", "symbol", "side", "qty", "price"))
+
+        def rows():
+            for row in reader:
+                if row:
+                    yield (parse_time(row[ts_i]), row[symbol_i].strip(), row[side_i].strip(),
+                           _number(row[qty_i]), _number(row[price_i]))
+
+        if reverse:
+            yield from reversed(list(rows()))
+        else:
+            yield from rows()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="체결 내역 실현 손익 (로트 매칭)")
+    parser.add_argument("fills", help="체결 CSV (시각, 종목, 방향, 수량, 가격 열)")
+    parser.add_argument("--method", choices=METHODS, default="fifo")
+    parser.add_argument("--fee-rate", type=float, default=DEFAULT_FEE_RATE)
+    parser.add_argument("--fee-sides", type=int, choices=[1, 2], default=2,
+                        help="수수료 부과 횟수 (기본 2: 진입 + 청산)")
+    parser.add_argument("--exchange-rate", type=float, default=1450.0)
+    parser.add_argument("--reverse", action="store_true", help="최신순으로 정렬된 파일")
+    parser.add_argument("--history", metavar="DB", help="실현 손익을 넣을 SQLite 거래 기록 (tradingcore.history)")
+    parser.add_argument("--out", metavar="CSV", help="실현 손익을 한 줄씩 쓸 CSV")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    matcher = LotMatcher(args.method, args.fee_rate, args.fee_sides, args.exchange_rate)
+    realized = matcher.process(read_fills_csv(args.fills, args.reverse))
+
+    out = None
+    if args.out:
+        out = open(args.out, "w", newline="")
+        writer = csv.writer(out)
+        writer.writerow(["symbol", "position", "qty", "opened_ts", "closed_ts", "entry_price", "exit_price",
+                         "fee_usd", "profit_usd", "profit_krw"])
+        realized = _tee_csv(realized, writer)
+    try:
+        if args.history:
+            from .history import TradeHistory
+            with TradeHistory(args.history) as history:
+                history.add_trades(r.history_row(args.exchange_rate, args.fee_rate) for r in realized)
+        else:
+            for _ in realized:
+                pass
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"체결 {matcher.fills:,}건 ({elapsed:.2f}초, {args.method})")
+    for symbol, totals in sorted(matcher.totals.items()):
+        win_rate = totals.wins / totals.closed * 100 if totals.closed else 0.0
+        print(f"{symbol}: 청산 {totals.closed:,}건 (승률 {win_rate:.2f}%) 수수료 ${totals.fee_usd:,.2f} "
+              f"실현 손익 ${totals.profit_usd:,.2f} (₩{totals.profit_krw:,.0f})")
+    for symbol, (position, qty, price) in sorted(matcher.open_positions().items()):
+        print(f"{symbol}: 미청산 {position} {qty:,.6f} @ {price:,.4f}")
+    return 0
+
+
+def _tee_csv(realized, writer):
+    for r in realized:
+        writer.writerow([r.symbol, r.position, r.qty, r.opened_ts, r.closed_ts, r.entry_price, r.exit_price,
+                         r.fee_usd, r.profit_usd, r.profit_krw])
+        yield r
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
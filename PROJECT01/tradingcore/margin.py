@@ -0,0 +1,146 @@
+# margin.py
+# 격리 마진(isolated) 청산 가격 / 유지증거금 구간 / 마진 비율 계산
+#
+# 청산 가격 (수수료 제외, 바이낸스 USDT-M 격리 마진 공식):
+#   롱: LP = (Q*EP - M - cum) / (Q * (1 - mmr))
+#   숏: LP = (Q*EP + M + cum) / (Q * (1 + mmr))
+#   Q = 수량 (= 명목가치 / EP), M = 증거금 (= 투자금), cum = 구간 유지증거금 보정액
+#
+# 명목가치 = 투자금 x 레버리지 로 유지증거금 구간을 찾고,
+# 레버리지 1~125 와 모든 구간의 계수를 미리 표로 만들어 두어
+# GUI 와 일괄 계산 모두 표를 읽기만 하면 되도록 한다.
+from bisect import bisect_right
+
+MIN_LEVERAGE = 1
+MAX_LEVERAGE = 125
+
+# (명목가치 하한 USD, 최대 레버리지, 유지증거금률) - BTCUSDT 무기한 선물 기준
+DEFAULT_TIERS = [
+    (0, 125, 0.004),
+    (50000, 100, 0.005),
+    (250000, 50, 0.01),
+    (3000000, 20, 0.025),
+    (15000000, 10, 0.05),
+    (30000000, 5, 0.1),
+    (80000000, 4, 0.125),
+    (100000000, 3, 0.15),
+    (200000000, 2, 0.25),
+    (300000000, 1, 0.5),
+]
+
+
+class MarginEngine:
+    def __init__(self, tiers=DEFAULT_TIERS):
+        tiers = sorted(tiers)
+        self.floors = [float(floor) for floor, _, _ in tiers]
+        self.max_leverages = [max_leverage for _, max_leverage, _ in tiers]
+        self.mmrs = [float(mmr) for _, _, mmr in tiers]
+
+        # 구간 보정액: cum_k = cum_(k-1) + floor_k * (mmr_k - mmr_(k-1))
+        self.cums = [0.0]
+        for k in range(1, len(tiers)):
+            self.cums.append(self.cums[k - 1] + self.floors[k] * (self.mmrs[k] - self.mmrs[k - 1]))
+
+        # 레버리지 x 구간 계수 표 (인덱스 = 레버리지, 0 은 사용하지 않음)
+        #   롱 LP = EP * long_a[L][k] - (cum_k / Q) * long_b[k]
+        #   숏 LP = EP * short_a[L][k] + (cum_k / Q) * short_b[k]
+        # 구간 최대 레버리지를 넘는 조합은 None
+        self.long_b = [1 / (1 - mmr) for mmr in self.mmrs]
+        self.short_b = [1 / (1 + mmr) for mmr in self.mmrs]
+        self.long_a = [None]
+        self.short_a = [None]
+        for leverage in range(MIN_LEVERAGE, MAX_LEVERAGE + 1):
+            self.long_a.append([(1 - 1 / leverage) * b if leverage <= max_lev else None
+                                for b, max_lev in zip(self.long_b, self.max_leverages)])
+            self.short_a.append([(1 + 1 / leverage) * b if leverage <= max_lev else None
+                                 for b, max_lev in zip(self.short_b, self.max_leverages)])
+
+        self._arrays = None
+
+    def tier_index(self, notional):
+        return max(bisect_right(self.floors, notional) - 1, 0)
+
+    def tier(self, notional):
+        # (구간 번호, 최대 레버리지, 유지증거금률, 보정액)
+        k = self.tier_index(notional)
+        return k, self.max_leverages[k], self.mmrs[k], self.cums[k]
+
+    def max_leverage(self, notional):
+        return self.max_leverages[self.tier_index(notional)]
+
+    def liquidation_price(self, entry_price, leverage, capital_usd, position):
+        # 레버리지가 해당 구간의 최대치를 넘으면 ValueError
+        if entry_price <= 0 or capital_usd <= 0:
+            raise ValueError("진입 가격과 투자금은 0보다 커야 합니다")
+        if not (MIN_LEVERAGE <= leverage <= MAX_LEVERAGE) or leverage != int(leverage):
+            raise ValueError("레버리지는 1~125 사이의 정수여야 합니다")
+        leverage = int(leverage)
+        notional = capital_usd * leverage
+        k = self.tier_index(notional)
+        cum_per_unit = self.cums[k] * entry_price / notional  # cum / Q
+        if position == 'Long':
+            a = self.long_a[leverage][k]
+            if a is None:
+                raise ValueError("레버리지가 구간 최대치를 초과합니다")
+            return max(entry_price * a - cum_per_unit * self.long_b[k], 0.0)
+        a = self.short_a[leverage][k]
+        if a is None:
+            raise ValueError("레버리지가 구간 최대치를 초과합니다")
+        return entry_price * a + cum_per_unit * self.short_b[k]
+
+    def maintenance_margin(self, notional):
+        k = self.tier_index(notional)
+        return notional * self.mmrs[k] - self.cums[k]
+
+    def margin_ratio(self, entry_price, mark_price, leverage, capital_usd, position):
+        # 유지증거금 / (증거금 + 미실현 손익). 1 이상이면 청산
+        quantity = capital_usd * leverage / entry_price
+        if position == 'Long':
+            unrealized = (mark_price - entry_price) * quantity
+        else:
+            unrealized = (entry_price - mark_price) * quantity
+        balance = capital_usd + unrealized
+        maintenance = self.maintenance_margin(mark_price * quantity)
+        if balance <= 0:
+            return float("inf")
+        return maintenance / balance
+
+    # --- 일괄 계산 (numpy) ---
+
+    def _table_arrays(self):
+        # 계수 표를 numpy 배열로 한 번만 변환 (사용 불가 조합은 nan)
+        if self._arrays is None:
+            import numpy as np
+            nan = float("nan")
+            long_a = np.array([[nan] * len(self.floors)] + [
+                [nan if a is None else a for a in row] for row in self.long_a[1:]])
+            short_a = np.array([[nan] * len(self.floors)] + [
+                [nan if a is None else a for a in row] for row in self.short_a[1:]])
+            self._arrays = (np.array(self.floors), np.array(self.cums), long_a, short_a,
+                            np.array(self.long_b), np.array(self.short_b))
+        return self._arrays
+
+    def liquidation_price_batch(self, entry_price, leverage, capital_usd, is_long):
+        # 잘못된 입력 / 구간 최대 레버리지 초과 행은 nan
+        import numpy as np
+        floors, cums, long_a, short_a, long_b, short_b = self._table_arrays()
+        entry_price = np.asarray(entry_price, dtype=np.float64)
+        leverage = np.asarray(leverage)
+        capital_usd = np.asarray(capital_usd, dtype=np.float64)
+        is_long = np.asarray(is_long, dtype=np.bool_)
+
+        valid_leverage = (leverage >= MIN_LEVERAGE) & (leverage <= MAX_LEVERAGE) & (leverage == np.floor(leverage))
+        lev_index = np.where(valid_leverage, leverage, 0).astype(np.intp)
+        notional = capital_usd * leverage
+        k = np.maximum(np.searchsorted(floors, notional, side="right") - 1, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cum_per_unit = cums[k] * entry_price / notional
+            long_price = np.maximum(entry_price * long_a[lev_index, k] - cum_per_unit * long_b[k], 0.0)
+            short_price = entry_price * short_a[lev_index, k] + cum_per_unit * short_b[k]
+        result = np.where(is_long, long_price, short_price)
+        result[(entry_price <= 0) | (capital_usd <= 0)] = np.nan
+        return result
+
+
+# 모델/일괄 계산이 같이 쓰는 기본 엔진 (표는 모듈을 불러올 때 한 번만 만든다)
+default_engine = MarginEngine()
@@ -0,0 +1,235 @@
+# montecarlo.py
+# 진입 가격에서 출발하는 가격 경로를 N 개 시뮬레이션해 레버리지 손익 분포를 구한다.
+# - 경로 생성: GBM(기하 브라운 운동) 또는 로컬 캔들 파일의 수익률 부트스트랩
+# - 경로 중 청산 가격을 건드리면 청산(증거금 전액 손실)으로 처리. 청산 가격은 backtest 와 같은
+#   margin 엔진(유지증거금 구간표)으로 구하고, --mmr 을 주면 고정 유지증거금률 + 수수료 모델을 쓴다
+# - 최종 손익은 batch.calculate_batch (formula.calculate 와 같은 수수료 모델) 로 계산
+# - 경로는 묶음(chunk) 단위로 프로세스 풀에 나눠 계산하고, 결과는 공유 메모리 배열에 바로 기록
+#
+# 사용 예:
+#   python -m tradingcore.montecarlo --entry 100 --leverage 20 --paths 10000000 --steps 96 --sigma 0.004
+#   python -m tradingcore.montecarlo --entry 100 --leverage 20 --candles btc_1m.csv --steps 60
+import argparse
+import csv
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .batch import calculate_batch
+from .fees import DEFAULT_FEE_RATE
+from .margin import default_engine
+
+DEFAULT_CHUNK_SIZE = 250000  # 작업 하나가 맡는 경로 수
+BLOCK_SIZE = 20000           # 작업 안에서 한 번에 만드는 경로 수 (메모리 상한: BLOCK_SIZE x n_steps)
+
+
+def liquidation_price(entry_price, leverage, position, fee_rate, maintenance_margin_rate=0.0):
+    # 고정 유지증거금률 모델: 수수료를 포함한 레버리지 수익률이 -(100 - 유지증거금)% 가 되는 가격
+    # (구간표를 쓰지 않으므로 margin 엔진 / backtest 의 청산 가격과 다르다. simulate 는 mmr 을 줄 때만 사용)
+    # leveraged_percent = profit_percent * L - L * fee_rate * 100
+    limit_percent = -100 + maintenance_margin_rate * leverage * 100
+    profit_percent = (limit_percent + leverage * fee_rate * 100) / leverage
+    if position == "Long":
+        return entry_price * (1 + profit_percent / 100)
+    return entry_price * (1 - profit_percent / 100)
+
+
+def load_returns(path, column="close"):
+    # 캔들 CSV 의 종가로부터 로그 수익률을 만든다 (한 행씩 읽음)
+    closes = array('d')
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            closes.append(float(row[column]))
+    closes = np.frombuffer(closes, dtype=np.float64)
+    if closes.size < 2:
+        raise ValueError("수익률을 만들려면 캔들이 2개 이상 필요합니다")
+    return np.diff(np.log(closes))
+
+
+def _log_paths(rng, n_paths, n_steps, drift, sigma, returns):
+    # (n_paths, n_steps) 누적 로그 수익률
+    if returns is None:
+        steps = rng.standard_normal((n_paths, n_steps))
+        steps *= sigma
+        steps += drift - 0.5 * sigma * sigma
+    else:
+        steps = returns[rng.integers(0, returns.size, (n_paths, n_steps))]
+    return np.cumsum(steps, axis=1, out=steps)
+
+
+def _simulate_range(params, start, stop, seed, shm_names):
+    # 작업 프로세스: [start, stop) 구간의 경로를 계산해 공유 메모리에 기록
+    shms = [shared_memory.SharedMemory(name=name) for name in shm_names]
+    try:
+        n_total = params["n_paths"]
+        final_price = np.ndarray((n_total,), dtype=np.float64, buffer=shms[0].buf)
+        liquidated = np.ndarray((n_total,), dtype=np.bool_, buffer=shms[1].buf)
+        _fill_range(params, start, stop, seed, final_price, liquidated)
+    finally:
+        for shm in shms:
+            shm.close()
+    return stop - start
+
+
+def _fill_range(params, start, stop, seed, final_price, liquidated):
+    rng = np.random.default_rng(seed)
+    returns = params["returns"]
+    entry_price = params["entry_price"]
+    # 청산 가격을 로그 수익률 기준선으로 변환
+    liq_price = params["liq_price"]
+    liq_log = np.log(liq_price / entry_price) if liq_price > 0 else -np.inf
+    is_long = params["position"] == "Long"
+
+    for block_start in range(start, stop, BLOCK_SIZE):
+        block_stop = min(block_start + BLOCK_SIZE, stop)
+        paths = _log_paths(rng, block_stop - block_start, params["n_steps"],
+                           params["drift"], params["sigma"], returns)
+        if is_long:
+            liquidated[block_start:block_stop] = paths.min(axis=1) <= liq_log
+        else:
+            liquidated[block_start:block_stop] = paths.max(axis=1) >= liq_log
+        final_price[block_start:block_stop] = entry_price * np.exp(paths[:, -1])
+
+
+class MonteCarloResult:
+    def __init__(self, final_price, liquidated, leveraged_percent, profit_usd, profit_krw, liq_price,
+                 liq_model="tiers"):
+        self.final_price = final_price
+        self.liquidated = liquidated
+        self.leveraged_percent = leveraged_percent
+        self.profit_usd = profit_usd
+        self.profit_krw = profit_krw
+        self.liquidation_price = liq_price
+        self.liquidation_model = liq_model  # "tiers" (margin 엔진) 또는 "flat" (고정 유지증거금률)
+
+    def summary(self, percentiles=(1, 5, 25, 50, 75, 95, 99)):
+        pct = self.leveraged_percent
+        return {
+            "paths": int(pct.size),
+            "liquidation_probability": float(self.liquidated.mean()),
+            "profit_probability": float((pct > 0).mean()),
+            "mean_percent": float(pct.mean()),
+            "mean_profit_usd": float(self.profit_usd.mean()),
+            "mean_profit_krw": float(self.profit_krw.mean()),
+            "percentiles": {p: float(v) for p, v in zip(percentiles, np.percentile(pct, percentiles))},
+            "liquidation_price": self.liquidation_price,
+            "liquidation_model": self.liquidation_model,
+        }
+
+
+def simulate(entry_price, leverage, position="Long", capital_usd=1000.0, exchange_rate=1450.0,
+             fee_rate=DEFAULT_FEE_RATE, n_paths=100000, n_steps=96, sigma=0.004, drift=0.0,
+             returns=None, maintenance_margin_rate=None, seed=None,
+             workers=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, margin_engine=default_engine):
+    # sigma 는 스텝당 로그 수익률 표준편차, drift 는 스텝당 기대 수익률. returns 를 주면 GBM 대신 부트스트랩
+    # progress(완료 비율) 는 묶음이 끝날 때마다 호출된다 (예외를 던지면 시뮬레이션 중단)
+    # 청산 가격은 margin_engine 의 구간표로 구한다 (backtest.Order 와 같은 값, 정수 레버리지만).
+    # maintenance_margin_rate 를 주면 대신 고정 유지증거금률 + 수수료 모델(liquidation_price)을 쓴다
+    if entry_price <= 0 or leverage <= 0 or n_paths <= 0 or n_steps <= 0:
+        raise ValueError("진입 가격, 레버리지, 경로 수, 스텝 수는 0보다 커야 합니다")
+
+    if maintenance_margin_rate is None:
+        liq_model = "tiers"
+        liq_price = margin_engine.liquidation_price(entry_price, leverage, capital_usd, position)
+    else:
+        liq_model = "flat"
+        liq_price = liquidation_price(entry_price, leverage, position, fee_rate, maintenance_margin_rate)
+    params = {
+        "n_paths": n_paths,
+        "n_steps": n_steps,
+        "entry_price": float(entry_price),
+        "position": position,
+        "liq_price": liq_price,
+        "drift": drift,
+        "sigma": sigma,
+        "returns": None if returns is None else np.ascontiguousarray(returns, dtype=np.float64),
+    }
+
+    # 묶음마다 독립된 난수열 (작업 수와 관계없이 같은 seed 면 같은 결과)
+    ranges = [(start, min(start + chunk_size, n_paths)) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(ranges))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(ranges))
+
+    if workers <= 1:
+        final_price = np.empty(n_paths)
+        liquidated = np.empty(n_paths, dtype=np.bool_)
+        for (start, stop), child_seed in zip(ranges, seeds):
+            _fill_range(params, start, stop, child_seed, final_price, liquidated)
+            if progress is not None:
+                progress(stop / n_paths)
+    else:
+        shm_price = shared_memory.SharedMemory(create=True, size=n_paths * 8)
+        shm_liq = shared_memory.SharedMemory(create=True, size=n_paths)
+        try:
+            names = (shm_price.name, shm_liq.name)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_simulate_range, params, start, stop, child_seed, names)
+                           for (start, stop), child_seed in zip(ranges, seeds)]
+                for future in futures:
+                    future.result()
+                    if progress is not None:
+                        progress(sum(f.done() for f in futures) / len(futures))
+            final_price = np.ndarray((n_paths,), dtype=np.float64, buffer=shm_price.buf).copy()
+            liquidated = np.ndarray((n_paths,), dtype=np.bool_, buffer=shm_liq.buf).copy()
+        finally:
+            for shm in (shm_price, shm_liq):
+                shm.close()
+                shm.unlink()
+
+    leveraged_percent, profit_usd, profit_krw, _ = calculate_batch(
+        entry_price, final_price, leverage, position == "Long", capital_usd, exchange_rate, fee_rate)
+    # 청산된 경로는 증거금 전액 손실
+    leveraged_percent[liquidated] = -100.0
+    profit_usd[liquidated] = -capital_usd
+    profit_krw[liquidated] = -capital_usd * exchange_rate
+    return MonteCarloResult(final_price, liquidated, leveraged_percent, profit_usd, profit_krw, liq_price,
+                            liq_model)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="레버리지 손익 몬테카를로 시뮬레이션")
+    parser.add_argument("--entry", type=float, required=True, help="진입 가격")
+    parser.add_argument("--leverage", type=int, default=10)
+    parser.add_argument("--position", choices=["Long", "Short"], default="Long")
+    parser.add_argument("--capital", type=float, default=1000.0)
+    parser.add_argument("--exchange-rate", type=float, default=1450.0)
+    parser.add_argument("--fee-rate", type=float, default=DEFAULT_FEE_RATE)
+    parser.add_argument("--paths", type=int, default=1000000)
+    parser.add_argument("--steps", type=int, default=96)
+    parser.add_argument("--sigma", type=float, default=0.004, help="스텝당 로그 수익률 표준편차 (GBM)")
+    parser.add_argument("--drift", type=float, default=0.0, help="스텝당 기대 수익률 (GBM 드리프트)")
+    parser.add_argument("--candles", help="부트스트랩에 사용할 캔들 CSV (close 열)")
+    parser.add_argument("--mmr", type=float,
+                        help="고정 유지증거금률 (지정하면 구간표 대신 사용, 청산 가격이 backtest 와 달라짐)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    returns = load_returns(args.candles) if args.candles else None
+    result = simulate(args.entry, args.leverage, args.position, args.capital, args.exchange_rate,
+                      args.fee_rate, args.paths, args.steps, args.sigma, args.drift, returns,
+                      args.mmr, args.seed, args.workers, args.chunk_size)
+    s = result.summary()
+    print(f"경로 수: {s['paths']:,}")
+    if s["liquidation_model"] == "tiers":
+        model = "유지증거금 구간표 (backtest 와 같음)"
+    else:
+        model = f"고정 유지증거금률 {args.mmr:g} + 수수료 (구간표 아님)"
+    print(f"청산 가격: {s['liquidation_price']:,.4f} [{model}]")
+    print(f"청산 확률: {s['liquidation_probability'] * 100:.2f}%")
+    print(f"수익 확률: {s['profit_probability'] * 100:.2f}%")
+    print(f"평균 수익률: {s['mean_percent']:.2f}% (${s['mean_profit_usd']:,.2f} / ₩{s['mean_profit_krw']:,.0f})")
+    for p, v in s["percentiles"].items():
+        print(f"  {p:>2}% 분위: {v:.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,220 @@
+# portfolio.py
+# 여러 포지션을 열(column) 배열로 들고 있는 포트폴리오 저장소
+# - 포지션마다 dict/객체를 만들지 않고 array('d') 열에 한 칸씩 저장 (포지션 수천 개도 가볍게)
+# - 추가는 맨 뒤에 붙이고, 삭제는 마지막 행을 빈 자리로 옮겨 O(1)
+# - 가격이 바뀐 포지션의 손익/노출만 다시 계산하고 합계에는 차이만 더한다 (전체를 다시 더하지 않음)
+# - 손익 공식은 formula.calculate 와 같다 (fee_sides 로 수수료 1회/2회 선택)
+#
+#   book = Portfolio(exchange_rate=1450)
+#   pid = book.add(100.0, 10, "Long", 1000.0, symbol="BTCUSDT")
+#   book.set_symbol_price("BTCUSDT", 105.0)
+#   book.totals()
+import math
+from array import array
+
+from .fees import DEFAULT_FEE_RATE
+from .formula import calculate
+from .margin import MAX_LEVERAGE, MIN_LEVERAGE
+
+
+class Portfolio:
+    def __init__(self, exchange_rate=1450.0, fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+        self.exchange_rate = exchange_rate
+        self.fee_rate = fee_rate
+        self.fee_sides = fee_sides
+
+        # 열 배열 (같은 인덱스 = 같은 포지션)
+        self.ids = []
+        self.symbols = []
+        self.entry_price = array('d')
+        self.mark_price = array('d')
+        self.leverage = array('d')
+        self.is_long = array('b')
+        self.capital_usd = array('d')
+        self.pnl_usd = array('d')     # 현재 가격 기준 손익 (수수료 반영)
+        self.exposure = array('d')    # 현재 가격 기준 명목가치 (수량 x 가격)
+
+        self._rows = {}       # 포지션 id -> 행 번호
+        self._by_symbol = {}  # 종목 -> 포지션 id 집합
+        self._next_id = 1
+
+        # 합계 (차이만 반영해 갱신)
+        self._total_pnl = 0.0
+        self._total_exposure = 0.0
+        self._total_margin = 0.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, position_id):
+        return position_id in self._rows
+
+    def __iter__(self):
+        return iter(list(self.ids))
+
+    # --- 추가 / 삭제 ---
+
+    def add(self, entry_price, leverage, position="Long", capital_usd=1000.0, mark_price=None, symbol=""):
+        if entry_price <= 0 or capital_usd <= 0:
+            raise ValueError("진입 가격과 투자금은 0보다 커야 합니다")
+        if not (MIN_LEVERAGE <= leverage <= MAX_LEVERAGE):
+            raise ValueError("레버리지는 1~125 사이여야 합니다")
+        if position not in ("Long", "Short"):
+            raise ValueError("포지션은 Long 또는 Short 여야 합니다")
+        if mark_price is None:
+            mark_price = entry_price
+        elif not mark_price > 0:
+            raise ValueError("현재 가격은 0보다 커야 합니다")
+
+        position_id = self._next_id
+        self._next_id += 1
+        self._rows[position_id] = len(self.ids)
+        self.ids.append(position_id)
+        self.symbols.append(symbol)
+        self.entry_price.append(entry_price)
+        self.mark_price.append(mark_price)
+        self.leverage.append(leverage)
+        self.is_long.append(position == "Long")
+        self.capital_usd.append(capital_usd)
+        pnl, exposure = self._evaluate(entry_price, mark_price, leverage, position == "Long", capital_usd)
+        self.pnl_usd.append(pnl)
+        self.exposure.append(exposure)
+        self._by_symbol.setdefault(symbol, set()).add(position_id)
+
+        self._total_pnl += pnl
+        self._total_exposure += exposure
+        self._total_margin += capital_usd
+        return position_id
+
+    def remove(self, position_id):
+        row = self._rows.pop(position_id)  # 없는 id 면 KeyError
+        self._total_pnl -= self.pnl_usd[row]
+        self._total_exposure -= self.exposure[row]
+        self._total_margin -= self.capital_usd[row]
+        symbol_ids = self._by_symbol[self.symbols[row]]
+        symbol_ids.discard(position_id)
+        if not symbol_ids:
+            del self._by_symbol[self.symbols[row]]
+
+        # 마지막 행을 빈 자리로 옮긴다
+        last = len(self.ids) - 1
+        if row != last:
+            moved_id = self.ids[last]
+            self._rows[moved_id] = row
+            for column in self._columns():
+                column[row] = column[last]
+        for column in self._columns():
+            column.pop()
+        if not self.ids:
+            # 비었으면 누적 오차도 함께 버린다
+            self._total_pnl = self._total_exposure = self._total_margin = 0.0
+
+    def _columns(self):
+        return (self.ids, self.symbols, self.entry_price, self.mark_price, self.leverage,
+                self.is_long, self.capital_usd, self.pnl_usd, self.exposure)
+
+    # --- 가격 변경 ---
+
+    def _evaluate(self, entry_price, mark_price, leverage, is_long, capital_usd):
+        _, pnl, _ = calculate(entry_price, mark_price, leverage, capital_usd, 1.0,
+                              'Long' if is_long else 'Short', self.fee_rate, self.fee_sides)
+        return pnl, capital_usd * leverage / entry_price * mark_price
+
+    def _set_row_price(self, row, price):
+        pnl, exposure = self._evaluate(self.entry_price[row], price, self.leverage[row],
+                                       self.is_long[row], self.capital_usd[row])
+        self._total_pnl += pnl - self.pnl_usd[row]
+        self._total_exposure += exposure - self.exposure[row]
+        self.mark_price[row] = price
+        self.pnl_usd[row] = pnl
+        self.exposure[row] = exposure
+
+    def set_mark(self, position_id, price):
+        self._set_row_price(self._rows[position_id], price)
+
+    def set_symbol_price(self, symbol, price):
+        # 같은 종목의 포지션만 다시 계산. 갱신한 포지션 수를 반환
+        position_ids = self._by_symbol.get(symbol, ())
+        rows = self._rows
+        for position_id in position_ids:
+            self._set_row_price(rows[position_id], price)
+        return len(position_ids)
+
+    def set_exchange_rate(self, rate):
+        # KRW 합계는 USD 합계 x 환율로 계산하므로 행을 다시 볼 필요가 없다
+        self.exchange_rate = rate
+
+    def set_fee_rate(self, fee_rate):
+        # 수수료는 모든 포지션의 손익에 들어가므로 행 전체를 다시 계산하고 손익 합계를 새로 맞춘다
+        if fee_rate == self.fee_rate:
+            return
+        self.fee_rate = fee_rate
+        for row in range(len(self.ids)):
+            self.pnl_usd[row] = self._evaluate(self.entry_price[row], self.mark_price[row], self.leverage[row],
+                                               self.is_long[row], self.capital_usd[row])[0]
+        self._total_pnl = math.fsum(self.pnl_usd)
+
+    # --- 조회 ---
+
+    def get(self, position_id):
+        row = self._rows[position_id]
+        pnl = self.pnl_usd[row]
+        return {
+            "id": position_id,
+            "symbol": self.symbols[row],
+            "entry_price": self.entry_price[row],
+            "mark_price": self.mark_price[row],
+            "leverage": self.leverage[row],
+            "position": "Long" if self.is_long[row] else "Short",
+            "capital_usd": self.capital_usd[row],
+            "pnl_usd": pnl,
+            "pnl_krw": pnl * self.exchange_rate,
+            "leveraged_percent": pnl / self.capital_usd[row] * 100,
+            "exposure": self.exposure[row],
+        }
+
+    @property
+    def total_pnl_usd(self):
+        return self._total_pnl
+
+    @property
+    def total_pnl_krw(self):
+        return self._total_pnl * self.exchange_rate
+
+    @property
+    def total_exposure(self):
+        return self._total_exposure
+
+    @property
+    def total_margin(self):
+        return self._total_margin
+
+    def totals(self):
+        return {
+            "positions": len(self.ids),
+            "pnl_usd": self.total_pnl_usd,
+            "pnl_krw": self.total_pnl_krw,
+            "exposure": self.total_exposure,
+            "margin": self.total_margin,
+        }
+
+    def resum(self):
+        # 차이를 계속 더하면 부동소수 오차가 조금씩 쌓이므로, 필요할 때 열 전체로 다시 맞춘다
+        self._total_pnl = math.fsum(self.pnl_usd)
+        self._total_exposure = math.fsum(self.exposure)
+        self._total_margin = math.fsum(self.capital_usd)
+        return self.totals()
+
+    def columns_numpy(self):
+        # numpy 로 열을 복사 없이 읽기
+        # 뷰가 살아 있는 동안 array 는 크기를 바꿀 수 없으므로(BufferError) add/remove 전에 버릴 것
+        import numpy as np
+        return {
+            "entry_price": np.frombuffer(self.entry_price, dtype=np.float64),
+            "mark_price": np.frombuffer(self.mark_price, dtype=np.float64),
+            "leverage": np.frombuffer(self.leverage, dtype=np.float64),
+            "is_long": np.frombuffer(self.is_long, dtype=np.int8).view(np.bool_),
+            "capital_usd": np.frombuffer(self.capital_usd, dtype=np.float64),
+            "pnl_usd": np.frombuffer(self.pnl_usd, dtype=np.float64),
+            "exposure": np.frombuffer(self.exposure, dtype=np.float64),
+        }
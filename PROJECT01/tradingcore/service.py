@@ -0,0 +1,402 @@
+# service.py
+# 로컬 HTTP/JSON 계산 서비스 (asyncio, 외부 패키지 없음)
+# 다른 스크립트가 공식을 다시 구현하지 않고 GUI 와 같은 값을 받아 가도록 한다.
+#
+#   GET  /health                      -> {"ok": true}
+#   GET  /stats                       -> 요청 수, 계산 행 수, 연결 수
+#   GET  /calculate?entry_price=100&target_price=110&leverage=10&position=Long
+#   POST /calculate   {"entry_price": 100, "target_price": 110, "leverage": 10, "position": "Long", ...}
+#        -> {"leveraged_percent": ..., "profit_usd": ..., "profit_krw": ..., "error": false}
+#   POST /batch       {"rows": [{...}, ...]}  -> {"results": [{...}, ...]}
+#   POST /batch       NDJSON 본문 (Content-Type: application/x-ndjson, 한 줄 = 한 행)
+#        -> NDJSON 응답 (Transfer-Encoding: chunked). 요청 본문을 다 받기 전에 chunk_size 행씩 계산해 흘려보낸다
+#
+# 행 형식과 기본값은 headless 와 같다 (capital_usd / exchange_rate 가 없으면 서버 기본값).
+# 수수료는 서버 설정(--fee-rate, --fee-sides, --fee-schedule)을 따르고, 묶음 계산은 numpy 가 있으면 벡터화한다.
+# HTTP/1.1 keep-alive: 한 연결에서 요청을 계속 처리하므로 짧은 요청을 반복해도 연결 비용이 들지 않는다.
+#
+# 사용 예:
+#   python -m tradingcore.service --port 8765
+#   curl -s localhost:8765/calculate -d '{"entry_price": 100, "target_price": 110, "leverage": 10}'
+#   curl -s localhost:8765/batch -H 'Content-Type: application/x-ndjson' --data-binary @trades.jsonl
+import argparse
+import asyncio
+import json
+from math import isfinite
+from urllib.parse import parse_qsl, urlsplit
+
+from .fees import DEFAULT_FEE_RATE, load_fee_schedule
+from .formula import calculate
+from .headless import DEFAULT_CHUNK_SIZE, calculate_chunk, parse_fee_key, parse_row
+from .slippage import calculate_with_slippage, load_order_book
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_HEADER_BYTES = 65536
+MAX_JSON_BODY = 64 * 1024 * 1024  # NDJSON 이 아닌 본문은 한 번에 읽으므로 상한을 둔다
+IDLE_TIMEOUT = 60.0
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def result_json(result):
+    # 결과 한 행의 JSON. 묶음에서 행마다 json.dumps 를 부르면 인코딩이 계산보다 느리므로 직접 만든다
+    # (유한한 float 의 repr 은 곧 JSON 숫자. inf/nan 은 JSON 이 아니므로 오류 행으로 보낸다)
+    if result is None or not all(map(isfinite, result)):
+        return '{"leveraged_percent": null, "profit_usd": null, "profit_krw": null, "error": true}'
+    return '{"leveraged_percent": %r, "profit_usd": %r, "profit_krw": %r, "error": false}' % result
+
+
+def result_dict(result):
+    if result is None or not all(map(isfinite, result)):
+        return {"leveraged_percent": None, "profit_usd": None, "profit_krw": None, "error": True}
+    return {"leveraged_percent": result[0], "profit_usd": result[1], "profit_krw": result[2], "error": False}
+
+
+class CalculatorService:
+    def __init__(self, fee_rate=DEFAULT_FEE_RATE, fee_sides=1, fee_schedule=None, default_capital=1000.0,
+                 default_rate=1450.0, chunk_size=DEFAULT_CHUNK_SIZE, vectorized=None, order_book=None):
+        self.fee_rate = fee_rate
+        self.fee_sides = fee_sides
+        self.fee_schedule = fee_schedule
+        self.order_book = order_book
+        self.default_capital = default_capital
+        self.default_rate = default_rate
+        self.chunk_size = chunk_size
+        if vectorized is None:
+            try:
+                import numpy  # noqa: F401
+                vectorized = True
+            except ImportError:
+                vectorized = False
+        self.vectorized = vectorized
+        self.server = None
+
+        # 통계
+        self.connections = 0
+        self.open_connections = 0
+        self.requests = 0
+        self.rows = 0
+
+    # --- 계산 ---
+
+    def calculate_one(self, row):
+        # 단건은 묶음 경로를 거치지 않고 formula.calculate 를 바로 호출
+        try:
+            entry, target, leverage, capital, rate, position = parse_row(row, self.default_capital,
+                                                                         self.default_rate)
+            fee_rate = self.fee_rate
+            if self.fee_schedule is not None:
+                fee_rate = self.fee_schedule.rate(*parse_fee_key(row))
+            if self.order_book is not None:
+                return calculate_with_slippage(self.order_book, entry, target, leverage, capital, rate, position,
+                                               fee_rate, self.fee_sides)[:3]
+            return calculate(entry, target, leverage, capital, rate, position, fee_rate, self.fee_sides)
+        except (KeyError, ValueError, TypeError, ZeroDivisionError):
+            return None
+
+    def calculate_rows(self, rows):
+        return calculate_chunk(rows, self.default_capital, self.default_rate, self.vectorized and len(rows) > 16,
+                               self.fee_rate, self.fee_sides, self.fee_schedule, self.order_book)
+
+    # --- HTTP ---
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        return self.server
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        self.open_connections += 1
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                # 유휴 시간 초과는 타이머 하나로 처리 (요청마다 wait_for 로 태스크를 만들면 단건 처리량이 크게 준다)
+                idle = loop.call_later(IDLE_TIMEOUT, writer.transport.abort)
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return  # 연결 종료 또는 유휴 시간 초과
+                except asyncio.LimitOverrunError:
+                    await self._send_error(writer, 413, "헤더가 너무 깁니다", keep_alive=False)
+                    return
+                finally:
+                    idle.cancel()
+                try:
+                    method, target, version, headers = _parse_head(head)
+                except ValueError as e:
+                    await self._send_error(writer, 400, str(e), keep_alive=False)
+                    return
+                keep_alive = _wants_keep_alive(version, headers)
+                self.requests += 1
+                try:
+                    await self.dispatch(method, target, headers, reader, writer, keep_alive)
+                except HttpError as e:
+                    # 본문을 다 읽지 못했을 수 있으므로 연결을 닫는다
+                    await self._send_error(writer, e.status, str(e), keep_alive=False)
+                    return
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # 계산 중 예상하지 못한 오류도 응답 없이 연결이 끊기지 않도록 500 으로 알린다
+                    await self._send_error(writer, 500, f"{type(e).__name__}: {e}", keep_alive=False)
+                    return
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    async def dispatch(self, method, target, headers, reader, writer, keep_alive):
+        url = urlsplit(target)
+        path = url.path
+        if path == "/calculate":
+            if method == "GET":
+                row = dict(parse_qsl(url.query))
+            elif method == "POST":
+                row = await _read_json(reader, headers)
+                if not isinstance(row, dict):
+                    raise HttpError(400, "JSON 객체가 필요합니다")
+            else:
+                raise HttpError(405, "GET 또는 POST 만 지원합니다")
+            self.rows += 1
+            await _send_json(writer, 200, result_dict(self.calculate_one(row)), keep_alive)
+        elif path == "/batch":
+            if method != "POST":
+                raise HttpError(405, "POST 만 지원합니다")
+            content_type = headers.get("content-type", "")
+            if "ndjson" in content_type or "jsonlines" in content_type:
+                await self._stream_batch(reader, writer, headers, keep_alive)
+            else:
+                body = await _read_json(reader, headers)
+                rows = body.get("rows") if isinstance(body, dict) else body
+                if not isinstance(rows, list):
+                    raise HttpError(400, "rows 배열이 필요합니다")
+                # 객체가 아닌 항목은 NDJSON 경로와 같이 오류 행으로 두어 결과 순서를 입력과 맞춘다
+                rows = [row if isinstance(row, dict) else {} for row in rows]
+                parts = []
+                for start in range(0, len(rows), self.chunk_size):
+                    parts.extend(map(result_json, self.calculate_rows(rows[start:start + self.chunk_size])))
+                self.rows += len(rows)
+                await _send_body(writer, 200, ('{"results": [' + ", ".join(parts) + "]}").encode(), keep_alive)
+        elif path == "/health":
+            await _send_json(writer, 200, {"ok": True}, keep_alive)
+        elif path == "/stats":
+            await _send_json(writer, 200, self.stats(), keep_alive)
+        else:
+            raise HttpError(404, f"없는 경로입니다: {path}")
+
+    async def _stream_batch(self, reader, writer, headers, keep_alive):
+        # 요청 본문을 줄 단위로 읽으면서 chunk_size 행마다 계산해 chunked 응답으로 보낸다
+        # 한 번에 메모리에 있는 행은 chunk_size 개뿐이다
+        started = False
+        chunk = []
+        try:
+            async for line in _body_lines(reader, headers):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:  # JSONDecodeError, UnicodeDecodeError
+                    row = {}  # 잘못된 줄은 오류 행으로 결과 순서를 유지
+                chunk.append(row if isinstance(row, dict) else {})
+                if len(chunk) >= self.chunk_size:
+                    if not started:
+                        writer.write(_chunked_head(keep_alive))
+                        started = True
+                    await self._write_results(writer, chunk)
+                    chunk = []
+        except Exception as e:
+            if started:
+                # 응답을 이미 보내는 중이면 상태 코드를 바꿀 수 없으므로 연결을 끊는다 (클라이언트는 잘린 응답을 받음)
+                raise ConnectionError("일괄 계산 응답 중 오류") from e
+            raise
+        if not started:
+            writer.write(_chunked_head(keep_alive))
+        if chunk:
+            await self._write_results(writer, chunk)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _write_results(self, writer, chunk):
+        results = self.calculate_rows(chunk)
+        self.rows += len(chunk)
+        data = ("\n".join(map(result_json, results)) + "\n").encode()
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+
+    async def _send_error(self, writer, status, message, keep_alive):
+        try:
+            await _send_json(writer, status, {"error": message}, keep_alive)
+        except ConnectionError:
+            pass
+
+    def stats(self):
+        return {
+            "connections": self.connections,
+            "open_connections": self.open_connections,
+            "requests": self.requests,
+            "rows": self.rows,
+            "vectorized": self.vectorized,
+        }
+
+
+def _parse_head(head):
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise ValueError("잘못된 요청 줄입니다") from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _wants_keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+async def _read_body(reader, headers, limit):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        parts = []
+        size = 0
+        async for part in _chunked_parts(reader):
+            size += len(part)
+            if size > limit:
+                raise HttpError(413, "본문이 너무 큽니다")
+            parts.append(part)
+        return b"".join(parts)
+    length = _content_length(headers)
+    if length > limit:
+        raise HttpError(413, "본문이 너무 큽니다")
+    return await reader.readexactly(length)
+
+
+async def _read_json(reader, headers):
+    body = await _read_body(reader, headers, MAX_JSON_BODY)
+    try:
+        return json.loads(body or b"{}")
+    except ValueError as e:  # JSONDecodeError, UnicodeDecodeError
+        raise HttpError(400, f"잘못된 JSON: {e}") from None
+
+
+def _content_length(headers):
+    length = headers.get("content-length")
+    if length is None:
+        raise HttpError(411, "Content-Length 가 필요합니다")
+    if not (length.isascii() and length.isdigit()):  # 음수, 부호, 숫자가 아닌 값
+        raise HttpError(400, f"잘못된 Content-Length: {length}")
+    return int(length)
+
+
+async def _chunked_parts(reader):
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";")[0], 16)
+        except ValueError:
+            size = -1
+        if size < 0:
+            raise HttpError(400, "잘못된 chunked 본문입니다")
+        if size == 0:
+            # 트레일러 헤더는 무시
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return
+        yield await reader.readexactly(size)
+        await reader.readexactly(2)
+
+
+async def _body_lines(reader, headers):
+    # 본문을 받는 대로 줄 단위로 내보낸다 (Content-Length 또는 chunked)
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        parts = _chunked_parts(reader)
+    else:
+        parts = _fixed_parts(reader, _content_length(headers))
+    pending = b""
+    async for part in parts:
+        lines = (pending + part).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def _fixed_parts(reader, length, block=1 << 16):
+    while length > 0:
+        part = await reader.read(min(block, length))
+        if not part:
+            raise HttpError(400, "본문이 Content-Length 보다 짧습니다")
+        length -= len(part)
+        yield part
+
+
+def _chunked_head(keep_alive):
+    return (b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n"
+            + (b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n"))
+
+
+async def _send_json(writer, status, payload, keep_alive):
+    await _send_body(writer, status, json.dumps(payload, ensure_ascii=False).encode(), keep_alive)
+
+
+async def _send_body(writer, status, body, keep_alive):
+    writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n%s"
+                 % (status, REASONS[status].encode(), len(body), b"keep-alive" if keep_alive else b"close", body))
+    await writer.drain()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    server = await service.start(host, port)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 HTTP/JSON 계산 서비스")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fee-rate", type=float, default=DEFAULT_FEE_RATE)
+    parser.add_argument("--fee-sides", type=int, choices=[1, 2], default=1,
+                        help="수수료 부과 횟수 (1: 진입 시 한 번, 2: 진입 + 청산)")
+    parser.add_argument("--fee-schedule", help="구간별 수수료표 JSON (지정하면 --fee-rate 대신 사용)")
+    parser.add_argument("--book", help="슬리피지를 반영할 호가창 스냅샷 JSON")
+    parser.add_argument("--capital", type=float, default=1000.0, help="capital_usd 가 없을 때 사용할 투자금")
+    parser.add_argument("--exchange-rate", type=float, default=1450.0, help="exchange_rate 가 없을 때 사용할 환율")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="묶음 계산/스트리밍 단위 (행)")
+    parser.add_argument("--no-vectorize", action="store_true", help="numpy 없이 행 단위로 계산")
+    args = parser.parse_args(argv)
+
+    fee_schedule = load_fee_schedule(args.fee_schedule) if args.fee_schedule else None
+    order_book = load_order_book(args.book) if args.book else None
+    service = CalculatorService(args.fee_rate, args.fee_sides, fee_schedule, args.capital, args.exchange_rate,
+                                args.chunk_size, False if args.no_vectorize else None, order_book)
+    print(f"계산 서비스: http://{args.host}:{args.port} (벡터화 {'켜짐' if service.vectorized else '꺼짐'})")
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+# slippage.py
+# 호가창(order book) 스냅샷으로 시장가 체결 평균 가격(VWAP)과 슬리피지를 계산
+# - 방향별로 가격 순서대로 누적 수량 / 누적 명목가치(가격 x 수량) 배열을 한 번만 만든다
+# - 명목가치 N 의 체결은 누적 명목가치에서 N 이 들어갈 호가 단계를 이진 탐색으로 찾고
+#   그 단계는 일부만 체결한다:  수량 = 이전 단계까지 누적 수량 + (N - 이전 누적 명목가치) / 단계 가격
+#   VWAP = N / 수량.  호가 수와 무관하게 O(log 호가 수)
+# - *_batch 는 같은 누적 배열에 np.searchsorted 한 번으로 주문 크기 수백만 개를 계산 (호가 잔량 초과는 nan)
+#
+# 손익 계산(calculate_with_slippage)은 스냅샷의 "모양"을 빌려 쓴다:
+#   진입/목표 가격은 지금 호가와 다른 가상의 가격이므로 최우선 호가 대비 슬리피지 비율을
+#   진입 가격과 목표 가격에 그대로 적용한다.
+#   롱 = 매수(매도 호가 소진) 후 매도(매수 호가 소진), 숏 = 반대. 청산 명목가치 = 진입 수량 x 목표 가격
+#
+# 스냅샷 형식 (거래소 depth API 와 같음, 문자열 숫자도 허용):
+#   {"bids": [["59990.5", "1.2"], ...], "asks": [["60000.0", "0.8"], ...]}
+import json
+from bisect import bisect_left
+
+from .fees import DEFAULT_FEE_RATE
+from .formula import calculate
+
+BUY, SELL = "buy", "sell"
+
+
+class _BookSide:
+    # 한쪽 호가: 체결 순서(매도 호가는 낮은 가격부터, 매수 호가는 높은 가격부터)로 정렬된 누적 배열
+    def __init__(self, levels, descending):
+        levels = sorted(((float(price), float(qty)) for price, qty in levels if float(qty) > 0),
+                        reverse=descending)
+        if not levels or levels[0][0] <= 0:
+            raise ValueError("호가가 비어 있거나 가격이 0 이하입니다")
+        self.prices = [price for price, _ in levels]
+        self.cum_qty = []
+        self.cum_notional = []
+        qty_total = notional_total = 0.0
+        for price, qty in levels:
+            qty_total += qty
+            notional_total += price * qty
+            self.cum_qty.append(qty_total)
+            self.cum_notional.append(notional_total)
+        self._arrays = None
+
+    @property
+    def best(self):
+        return self.prices[0]
+
+    @property
+    def depth_notional(self):
+        return self.cum_notional[-1]
+
+    def vwap_for_notional(self, notional):
+        k = bisect_left(self.cum_notional, notional)
+        if k == len(self.prices):
+            raise ValueError(f"호가 잔량(${self.depth_notional:,.0f})보다 큰 주문입니다")
+        prev_qty = self.cum_qty[k - 1] if k else 0.0
+        prev_notional = self.cum_notional[k - 1] if k else 0.0
+        qty = prev_qty + (notional - prev_notional) / self.prices[k]
+        return notional / qty
+
+    def vwap_for_qty(self, qty):
+        k = bisect_left(self.cum_qty, qty)
+        if k == len(self.prices):
+            raise ValueError(f"호가 잔량({self.cum_qty[-1]:,.6f})보다 큰 주문입니다")
+        prev_qty = self.cum_qty[k - 1] if k else 0.0
+        prev_notional = self.cum_notional[k - 1] if k else 0.0
+        return (prev_notional + (qty - prev_qty) * self.prices[k]) / qty
+
+    def arrays(self):
+        # (가격, 앞에 0 을 붙인 누적 수량, 앞에 0 을 붙인 누적 명목가치) numpy 배열 - 처음 쓸 때 한 번 만든다
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = (np.array(self.prices), np.array([0.0] + self.cum_qty),
+                            np.array([0.0] + self.cum_notional))
+        return self._arrays
+
+    def vwap_for_notional_batch(self, notional):
+        import numpy as np
+        prices, cum_qty, cum_notional = self.arrays()
+        notional = np.asarray(notional, dtype=np.float64)
+        # cum_notional[0] = 0 이므로 k = (첫 누적값 >= N 인 단계) + 1
+        k = np.searchsorted(cum_notional, notional, side="left")
+        inside = (k >= 1) & (k <= len(prices)) & (notional > 0)
+        k = np.clip(k, 1, len(prices))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            qty = cum_qty[k - 1] + (notional - cum_notional[k - 1]) / prices[k - 1]
+            vwap = notional / qty
+        return np.where(inside, vwap, np.nan)
+
+
+class OrderBook:
+    def __init__(self, bids, asks):
+        # bids / asks: (가격, 수량) 목록 (순서 무관)
+        self.bids = _BookSide(bids, descending=True)
+        self.asks = _BookSide(asks, descending=False)
+        if self.bids.best >= self.asks.best:
+            raise ValueError("매수 최우선 호가가 매도 최우선 호가보다 높습니다")
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot["bids"], snapshot["asks"])
+
+    @property
+    def mid(self):
+        return (self.bids.best + self.asks.best) / 2
+
+    def _side(self, side):
+        # 매수는 매도 호가를, 매도는 매수 호가를 소진한다
+        if side == BUY:
+            return self.asks
+        if side == SELL:
+            return self.bids
+        raise ValueError(f"알 수 없는 주문 방향: {side}")
+
+    def fill_price(self, side, notional=None, qty=None):
+        # 시장가 주문의 평균 체결 가격 (명목가치 USD 또는 수량 중 하나)
+        if (notional is None) == (qty is None):
+            raise ValueError("notional 과 qty 중 하나만 지정하세요")
+        book = self._side(side)
+        if notional is not None:
+            if notional <= 0:
+                raise ValueError("주문 금액은 0보다 커야 합니다")
+            return book.vwap_for_notional(notional)
+        if qty <= 0:
+            raise ValueError("주문 수량은 0보다 커야 합니다")
+        return book.vwap_for_qty(qty)
+
+    def slippage(self, side, notional):
+        # 최우선 호가 대비 불리한 정도 (0.001 = 0.1%, 항상 0 이상)
+        book = self._side(side)
+        vwap = book.vwap_for_notional(notional)
+        return vwap / book.best - 1 if side == BUY else 1 - vwap / book.best
+
+    def fill_price_batch(self, side, notional):
+        return self._side(side).vwap_for_notional_batch(notional)
+
+    def slippage_batch(self, side, notional):
+        book = self._side(side)
+        vwap = book.vwap_for_notional_batch(notional)
+        return vwap / book.best - 1 if side == BUY else 1 - vwap / book.best
+
+
+def load_order_book(path):
+    with open(path) as f:
+        return OrderBook.from_snapshot(json.load(f))
+
+
+def slipped_prices(book, entry_price, target_price, leverage, capital_usd, position="Long"):
+    # (진입 체결가, 청산 체결가) - 스냅샷의 슬리피지 비율을 진입/목표 가격에 적용
+    if entry_price <= 0 or target_price <= 0 or leverage <= 0 or capital_usd <= 0:
+        raise ValueError("값은 0보다 커야 합니다")
+    notional = capital_usd * leverage
+    if position == 'Long':
+        entry_fill = entry_price * (1 + book.slippage(BUY, notional))
+        exit_notional = notional / entry_fill * target_price
+        exit_fill = target_price * (1 - book.slippage(SELL, exit_notional))
+    else:
+        entry_fill = entry_price * (1 - book.slippage(SELL, notional))
+        exit_notional = notional / entry_fill * target_price
+        exit_fill = target_price * (1 + book.slippage(BUY, exit_notional))
+    return entry_fill, exit_fill
+
+
+def calculate_with_slippage(book, entry_price, target_price, leverage, capital_usd, exchange_rate,
+                            position="Long", fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    # formula.calculate 결과 + (진입 체결가, 청산 체결가). 호가 잔량을 넘는 주문은 ValueError
+    entry_fill, exit_fill = slipped_prices(book, entry_price, target_price, leverage, capital_usd, position)
+    leveraged_percent, profit_usd, profit_krw = calculate(entry_fill, exit_fill, leverage, capital_usd,
+                                                          exchange_rate, position, fee_rate, fee_sides)
+    return leveraged_percent, profit_usd, profit_krw, entry_fill, exit_fill
+
+
+def calculate_with_slippage_batch(book, entry_price, target_price, leverage, position, capital_usd,
+                                  exchange_rate, fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    # batch.calculate_batch 와 같은 반환값 + 진입/청산 체결가 배열. 호가 잔량 초과 행은 오류(nan)
+    import numpy as np
+    from .batch import _as_long_mask, calculate_batch
+
+    entry_price = np.asarray(entry_price, dtype=np.float64)
+    target_price = np.asarray(target_price, dtype=np.float64)
+    notional = np.asarray(capital_usd, dtype=np.float64) * np.asarray(leverage, dtype=np.float64)
+    is_long = _as_long_mask(position)
+    notional, entry_price, target_price, is_long = np.broadcast_arrays(notional, entry_price, target_price, is_long)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entry_fill = np.where(is_long, entry_price * (1 + book.slippage_batch(BUY, notional)),
+                              entry_price * (1 - book.slippage_batch(SELL, notional)))
+        exit_notional = notional / entry_fill * target_price
+        exit_fill = np.where(is_long, target_price * (1 - book.slippage_batch(SELL, exit_notional)),
+                             target_price * (1 + book.slippage_batch(BUY, exit_notional)))
+    leveraged_percent, profit_usd, profit_krw, error = calculate_batch(
+        entry_fill, exit_fill, leverage, is_long, capital_usd, exchange_rate, fee_rate, fee_sides)
+    error = error | np.isnan(entry_fill) | np.isnan(exit_fill)
+    return leveraged_percent, profit_usd, profit_krw, error, entry_fill, exit_fill
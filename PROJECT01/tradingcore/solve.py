@@ -0,0 +1,143 @@
+# solve.py
+# 손익 공식을 거꾸로 푸는 계산 (반복 탐색 없이 닫힌 식)
+#
+# formula.calculate:
+#   leveraged_percent = profit_percent * L - fee_impact_percent(L, fee_rate, fee_sides)
+#   profit_percent = (T - E) / E * 100  (롱)  /  (E - T) / E * 100  (숏)
+# 이므로 원하는 leveraged_percent 에 대한 목표 가격은
+#   profit_percent = (leveraged_percent + fee_impact) / L
+#   T = E * (1 + profit_percent / 100)  (롱)  /  E * (1 - profit_percent / 100)  (숏)
+#
+# 최대 레버리지는 margin.MarginEngine 의 청산 가격 공식(유지증거금 구간 포함)을 레버리지에 대해 푼다.
+#   롱: 가격이 m 만큼 내려도 청산되지 않으려면  L < (1 + cum / 투자금) / (1 - (1 - m)(1 - mmr))
+#   숏: 가격이 m 만큼 올라도 청산되지 않으려면  L < (1 + cum / 투자금) / ((1 + m)(1 + mmr) - 1)
+# 구간마다 이 상한과 구간 범위(명목가치, 최대 레버리지)를 겹쳐 가장 큰 정수 레버리지를 고른다.
+#
+# 스칼라 함수는 잘못된 입력에 ValueError, *_batch 함수는 해당 행을 nan (최대 레버리지는 0) 으로 둔다.
+import math
+
+from .fees import DEFAULT_FEE_RATE, fee_impact_percent
+from .margin import MAX_LEVERAGE, MIN_LEVERAGE, default_engine
+
+
+def target_for_percent(entry_price, leverage, percent, position="Long", fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    # 수수료 반영 레버리지 수익률이 percent(%) 가 되는 목표 가격
+    if entry_price <= 0 or leverage <= 0:
+        raise ValueError("진입 가격과 레버리지는 0보다 커야 합니다")
+    profit_percent = (percent + fee_impact_percent(leverage, fee_rate, fee_sides)) / leverage
+    if position == 'Long':
+        target = entry_price * (1 + profit_percent / 100)
+    else:
+        target = entry_price * (1 - profit_percent / 100)
+    if target <= 0:
+        raise ValueError("도달할 수 없는 수익률입니다")
+    return target
+
+
+def target_for_profit_usd(entry_price, leverage, capital_usd, profit_usd, position="Long",
+                          fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    # 수익이 profit_usd 달러가 되는 목표 가격
+    if capital_usd <= 0:
+        raise ValueError("투자금은 0보다 커야 합니다")
+    return target_for_percent(entry_price, leverage, profit_usd / capital_usd * 100, position, fee_rate, fee_sides)
+
+
+def break_even_price(entry_price, position="Long", fee_rate=DEFAULT_FEE_RATE, fee_sides=2):
+    # 수수료까지 포함해 손익이 0 이 되는 가격 (레버리지와 무관)
+    if entry_price <= 0:
+        raise ValueError("진입 가격은 0보다 커야 합니다")
+    move = fee_rate * fee_sides
+    return entry_price * (1 + move) if position == 'Long' else entry_price * (1 - move)
+
+
+def _tier_bounds(engine, capital_usd):
+    # 구간별 (레버리지 하한, 상한) - 명목가치 = 투자금 x 레버리지 가 구간 안에 들어오는 정수 범위
+    bounds = []
+    floors = engine.floors
+    for k in range(len(floors)):
+        low = max(MIN_LEVERAGE, math.ceil(floors[k] / capital_usd))
+        high = min(MAX_LEVERAGE, engine.max_leverages[k])
+        if k + 1 < len(floors):
+            high = min(high, math.ceil(floors[k + 1] / capital_usd) - 1)
+        bounds.append((low, high))
+    return bounds
+
+
+def max_leverage(adverse_move_percent, capital_usd=1000.0, position="Long", margin_engine=default_engine):
+    # 가격이 adverse_move_percent(%) 만큼 불리하게 움직여도 청산되지 않는 최대 정수 레버리지
+    # 1배로도 버틸 수 없으면 0
+    if capital_usd <= 0 or adverse_move_percent < 0:
+        raise ValueError("투자금은 0보다 커야 하고 가격 변동폭은 0 이상이어야 합니다")
+    m = adverse_move_percent / 100
+    best = 0
+    for k, (low, high) in enumerate(_tier_bounds(margin_engine, capital_usd)):
+        if low > high:
+            continue
+        mmr = margin_engine.mmrs[k]
+        if position == 'Long':
+            denominator = 1 - (1 - m) * (1 - mmr)
+        else:
+            denominator = (1 + m) * (1 + mmr) - 1
+        if denominator <= 0:
+            limit = high
+        else:
+            bound = (1 + margin_engine.cums[k] / capital_usd) / denominator
+            limit = min(high, math.ceil(bound) - 1)  # 등호(청산가에 정확히 닿음)는 청산으로 본다
+        if limit >= low and limit > best:
+            best = limit
+    return best
+
+
+# --- 일괄 계산 (numpy) ---
+
+def target_for_percent_batch(entry_price, leverage, percent, is_long, fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    import numpy as np
+    entry_price = np.asarray(entry_price, dtype=np.float64)
+    leverage = np.asarray(leverage, dtype=np.float64)
+    percent = np.asarray(percent, dtype=np.float64)
+    side = np.where(np.asarray(is_long, dtype=np.bool_), 1.0, -1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_percent = (percent + leverage * fee_rate * fee_sides * 100) / leverage
+        target = entry_price * (1 + side * profit_percent / 100)
+    invalid = (entry_price <= 0) | (leverage <= 0) | ~(target > 0)
+    return np.where(invalid, np.nan, target)
+
+
+def target_for_profit_usd_batch(entry_price, leverage, capital_usd, profit_usd, is_long,
+                                fee_rate=DEFAULT_FEE_RATE, fee_sides=1):
+    import numpy as np
+    capital_usd = np.asarray(capital_usd, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(capital_usd > 0, np.asarray(profit_usd, dtype=np.float64) / capital_usd * 100, np.nan)
+    return target_for_percent_batch(entry_price, leverage, percent, is_long, fee_rate, fee_sides)
+
+
+def break_even_price_batch(entry_price, is_long, fee_rate=DEFAULT_FEE_RATE, fee_sides=2):
+    import numpy as np
+    entry_price = np.asarray(entry_price, dtype=np.float64)
+    move = fee_rate * fee_sides
+    price = np.where(np.asarray(is_long, dtype=np.bool_), entry_price * (1 + move), entry_price * (1 - move))
+    return np.where(entry_price > 0, price, np.nan)
+
+
+def max_leverage_batch(adverse_move_percent, capital_usd, is_long, margin_engine=default_engine):
+    # 구간 수(K) 만큼만 열이 늘어나므로 (n, K) 배열 한 번으로 계산
+    import numpy as np
+    m = np.asarray(adverse_move_percent, dtype=np.float64)[..., None] / 100
+    capital_usd = np.asarray(capital_usd, dtype=np.float64)[..., None]
+    is_long = np.asarray(is_long, dtype=np.bool_)[..., None]
+    floors = np.array(margin_engine.floors)
+    mmrs = np.array(margin_engine.mmrs)
+    cums = np.array(margin_engine.cums)
+    next_floors = np.append(floors[1:], np.inf)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        low = np.maximum(MIN_LEVERAGE, np.ceil(floors / capital_usd))
+        high = np.minimum(np.minimum(MAX_LEVERAGE, margin_engine.max_leverages), np.ceil(next_floors / capital_usd) - 1)
+        denominator = np.where(is_long, 1 - (1 - m) * (1 - mmrs), (1 + m) * (1 + mmrs) - 1)
+        bound = np.ceil((1 + cums / capital_usd) / denominator) - 1
+        limit = np.where(denominator <= 0, high, np.minimum(high, bound))
+    limit = np.where((limit >= low) & (low <= high), limit, 0)
+    result = limit.max(axis=-1)
+    invalid = (capital_usd[..., 0] <= 0) | ~(m[..., 0] >= 0)
+    return np.where(invalid, 0, result).astype(np.int64)